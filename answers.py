@@ -0,0 +1,150 @@
+"""
+Answer Cache
+
+Opt-in, disk-backed cache of agent answers for send_message and
+send_conversation_message. Repeated FAQ-style prompts to the same agent are
+answered locally instead of spending a query credit.
+
+Entries are keyed by API key fingerprint, agent, normalised prompt and the
+options that change an answer (persona, model, response source, language).
+Matching is exact after normalisation (case, whitespace and trailing
+punctuation are ignored); there is no embedding-based similarity.
+
+Writes that change what an agent knows or how it answers (settings, sources,
+pages) invalidate that agent's answers: the cut-off is recorded in memory at
+once, so no stale answer is served, and the rows are deleted in the
+background.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from transcripts import SQLiteStore
+
+DEFAULT_DB_PATH = Path.home() / ".cache" / "customgpt-mcp" / "answers.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    tenant TEXT NOT NULL,
+    key TEXT NOT NULL,
+    project_id INTEGER NOT NULL,
+    prompt TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tenant, key)
+);
+CREATE INDEX IF NOT EXISTS answers_project ON answers (tenant, project_id);
+CREATE INDEX IF NOT EXISTS answers_expiry ON answers (expires_at);
+"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", prompt.casefold()).strip().rstrip("?!.。？！ ")
+
+
+def answer_key(project_id: int, prompt: str, custom_persona: Optional[str] = None,
+               chatbot_model: Optional[str] = None, response_source: Optional[str] = None,
+               lang: Optional[str] = None) -> str:
+    parts = [project_id, normalize_prompt(prompt), custom_persona, chatbot_model, response_source, lang]
+    return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+
+class AnswerCache(SQLiteStore):
+    """Answers by (tenant, agent, normalised prompt, options) with a TTL."""
+
+    schema = SCHEMA
+    default_path = DEFAULT_DB_PATH
+
+    def __init__(self, path: Optional[str] = None, enabled: bool = False, ttl: float = 86400):
+        super().__init__(path)
+        self.enabled = enabled
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._cutoffs: Dict[Tuple[str, int], float] = {}
+        self._deletes: set = set()
+
+    @classmethod
+    def from_env(cls) -> "AnswerCache":
+        """Read ANSWER_CACHE, ANSWER_CACHE_TTL_SECONDS and ANSWER_CACHE_PATH."""
+        return cls(os.getenv("ANSWER_CACHE_PATH") or None,
+                   enabled=os.getenv("ANSWER_CACHE", "false").lower() == "true",
+                   ttl=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400")))
+
+    async def get(self, tenant: str, project_id: int, key: str,
+                  max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Cached response and its age, or None. ``max_age`` tightens the TTL for this lookup."""
+        now = time.time()
+        oldest = max(self._cutoffs.get((tenant, project_id), 0.0),
+                     now - max_age if max_age is not None else 0.0)
+
+        def read(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            row = conn.execute(
+                "SELECT response, created_at FROM answers WHERE tenant = ? AND key = ?"
+                " AND expires_at > ? AND created_at > ?", (tenant, key, now, oldest)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE answers SET hits = hits + 1 WHERE tenant = ? AND key = ?", (tenant, key))
+            return {"response": json.loads(row["response"]), "age_seconds": round(now - row["created_at"], 1)}
+        found = await self.run(read)
+        if found is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return found
+
+    async def put(self, tenant: str, project_id: int, key: str, prompt: str,
+                  response: Dict[str, Any]) -> None:
+        now = time.time()
+        row = (tenant, key, project_id, prompt, json.dumps(response, default=str), now, now + self.ttl)
+
+        def write(conn: sqlite3.Connection) -> None:
+            conn.execute("DELETE FROM answers WHERE expires_at <= ?", (now,))
+            conn.execute("INSERT OR REPLACE INTO answers (tenant, key, project_id, prompt, response,"
+                         " created_at, expires_at) VALUES (?,?,?,?,?,?,?)", row)
+        await self.run(write)
+
+    def invalidate(self, tenant: str, project_id: int) -> None:
+        """Stop serving one agent's answers now and delete them in the background."""
+        now = time.time()
+        self._cutoffs[(tenant, project_id)] = now
+        self.invalidations += 1
+        if not (self.enabled or self._conn is not None):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.run(lambda conn: conn.execute(
+            "DELETE FROM answers WHERE tenant = ? AND project_id = ? AND created_at <= ?",
+            (tenant, project_id, now))))
+        self._deletes.add(task)
+        task.add_done_callback(self._deletes.discard)
+
+    async def clear(self, tenant: str) -> int:
+        return await self.run(lambda conn: conn.execute(
+            "DELETE FROM answers WHERE tenant = ?", (tenant,)).rowcount)
+
+    async def stats(self, tenant: str) -> Dict[str, Any]:
+        def read(conn: sqlite3.Connection) -> Dict[str, Any]:
+            row = conn.execute("SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM answers"
+                               " WHERE tenant = ? AND expires_at > ?", (tenant, time.time())).fetchone()
+            return {"entries": row[0], "stored_hits": row[1]}
+        used = self.enabled or self._conn is not None or Path(self.path).exists()
+        stored = await self.run(read) if used else {"entries": 0, "stored_hits": 0}
+        lookups = self.hits + self.misses
+        return {"enabled": self.enabled, "path": self.path, "ttl_seconds": self.ttl, **stored,
+                "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations}
@@ -0,0 +1,237 @@
+"""
+CustomGPT API request models.
+
+Generated by openapi_codegen.py from docs/openapi.json - do not edit by
+hand; run ``python openapi_codegen.py`` after updating the spec.
+"""
+
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class APIModel(BaseModel):
+    """Base of the generated models. Fields the spec does not list are rejected."""
+
+    model_config = ConfigDict(extra="forbid", populate_by_name=True)
+
+    def payload(self) -> Dict[str, Any]:
+        """Wire-format dict of the fields that are set (None means unset)."""
+        return self.model_dump(by_alias=True, exclude_none=True)
+
+
+# Enumerated values of the spec, shared with the tool signatures
+ResponseSource = Literal['default', 'own_content', 'openai_content']
+ChatbotMsgLang = Literal[
+    'sq', 'ar', 'hy', 'az', 'ba', 'eu', 'be', 'bn', 'bh', 'bs', 'pt-BR', 'bg', 'yue', 'ca',
+    'hne', 'hr', 'cs', 'da', 'doi', 'nl', 'en', 'et', 'fo', 'fi', 'fr', 'gl', 'ka', 'de', 'el',
+    'gu', 'hry', 'he', 'hi', 'hu', 'id', 'ga', 'it', 'ja', 'jv', 'kn', 'ks', 'kk', 'kok', 'ko',
+    'ky', 'lv', 'lt', 'mk', 'mai', 'ms', 'mt', 'cmn', 'mr', 'mwr', 'nan', 'mo', 'mn', 'me',
+    'ne', 'no', 'or', 'ps', 'fa', 'pl', 'pt', 'pa', 'raj', 'ro', 'ru', 'sa', 'sat', 'sr', 'sd',
+    'si', 'sk', 'sl', 'es', 'sw', 'sv', 'tg', 'ta', 'tt', 'te', 'th', 'tr', 'tk', 'uk', 'ur',
+    'uz', 'vi', 'cy', 'wuu'
+]
+EnableCitations = Literal[0, 1, 2, 3]
+CitationsViewType = Literal['user', 'show', 'hide']
+ImageCitationDisplay = Literal['default', 'first_only']
+ChatbotModel = Literal[
+    'gpt-4-o', 'gpt-4-1', 'gpt-4o-mini', 'gpt-4-1-mini', 'claude-3-sonnet', 'claude-3.5-sonnet',
+    'gpt-o4-mini-low', 'gpt-o4-mini-medium', 'gpt-o4-mini-high'
+]
+AgentCapability = Literal[
+    'fastest-responses', 'optimal-choice', 'advanced-reasoning', 'complex-tasks'
+]
+SpotlightAvatarShape = Literal['circle', 'rectangle']
+SpotlightAvatarType = Literal['default', 'image']
+UserAvatarOrientation = Literal[
+    'agent-left-user-right', 'agent-right-user-right', 'agent-right-user-left',
+    'agent-left-user-left'
+]
+ConversationRetentionPeriod = Literal['custom', 'year', 'never']
+Reaction = Literal['neutral', 'disliked', 'liked']
+DataRefreshFrequency = Literal['never', 'daily', 'weekly', 'monthly', 'advanced']
+RefreshExistingPages = Literal['never', 'always', 'if_updated']
+
+
+class PostProjectsBody(APIModel):
+    """multipart/form-data body of: Create a new agent."""
+
+    project_name: Optional[str] = None
+    sitemap_path: Optional[str] = None
+    file_data_retension: Optional[bool] = None
+    is_ocr_enabled: Optional[bool] = None
+    is_anonymized: Optional[bool] = None
+    file: Optional[Any] = None
+
+
+class PostProjectsByIdBody(APIModel):
+    """multipart/form-data body of: Update a certain agent."""
+
+    project_name: Optional[str] = None
+    is_shared: Optional[bool] = None
+    sitemap_path: Optional[str] = None
+    file_data_retension: Optional[bool] = None
+    is_ocr_enabled: Optional[bool] = None
+    is_anonymized: Optional[bool] = None
+    file: Optional[Any] = None
+    are_licenses_allowed: Optional[bool] = None
+
+
+class PostProjectsChatCompletionsBody(APIModel):
+    """application/json body of: Send a message to a conversation in openai format."""
+
+    messages: Optional[List[Dict[str, Any]]] = None
+    model: Optional[str] = None
+    stream: Optional[bool] = None
+    lang: Optional[str] = None
+    external_id: Optional[str] = None
+    is_inline_citation: Optional[bool] = None
+
+
+class PutProjectsPagesMetadataBody(APIModel):
+    """application/json body of: Update metadata for a certain page."""
+
+    title: Optional[str] = None
+    url: Optional[str] = None
+    description: Optional[str] = None
+    image: Optional[str] = None
+
+
+class PostProjectsSettingsBody(APIModel):
+    """multipart/form-data body of: Update agent settings."""
+
+    chat_bot_avatar: Optional[Any] = None
+    chat_bot_bg: Optional[Any] = None
+    default_prompt: Optional[str] = None
+    example_questions: Optional[List[str]] = Field(None, alias="example_questions[]")
+    response_source: Optional[ResponseSource] = None
+    chatbot_msg_lang: Optional[ChatbotMsgLang] = None
+    chatbot_color: Optional[str] = None
+    chatbot_toolbar_color: Optional[str] = None
+    persona_instructions: Optional[str] = None
+    citations_answer_source_label_msg: Optional[str] = None
+    citations_sources_label_msg: Optional[str] = None
+    hang_in_there_msg: Optional[str] = None
+    chatbot_siesta_msg: Optional[str] = None
+    is_loading_indicator_enabled: Optional[bool] = None
+    enable_citations: Optional[EnableCitations] = None
+    enable_feedbacks: Optional[bool] = None
+    citations_view_type: Optional[CitationsViewType] = None
+    image_citation_display: Optional[ImageCitationDisplay] = None
+    no_answer_message: Optional[str] = None
+    ending_message: Optional[str] = None
+    try_asking_questions_msg: Optional[str] = None
+    view_more_msg: Optional[str] = None
+    view_less_msg: Optional[str] = None
+    remove_branding: Optional[bool] = None
+    enable_recaptcha_for_public_chatbots: Optional[bool] = None
+    chatbot_model: Optional[ChatbotModel] = None
+    is_selling_enabled: Optional[bool] = None
+    can_share_conversation: Optional[bool] = None
+    can_export_conversation: Optional[bool] = None
+    hide_sources_from_responses: Optional[bool] = None
+    agent_capability: Optional[AgentCapability] = None
+    input_field_addendum: Optional[str] = None
+    user_avatar_enabled: Optional[bool] = None
+    user_avatar: Optional[Any] = None
+    spotlight_avatar_enabled: Optional[bool] = None
+    spotlight_avatar: Optional[Any] = None
+    spotlight_avatar_shape: Optional[SpotlightAvatarShape] = None
+    spotlight_avatar_type: Optional[SpotlightAvatarType] = None
+    user_avatar_orientation: Optional[UserAvatarOrientation] = None
+    chatbot_title: Optional[str] = None
+    chatbot_title_color: Optional[str] = None
+    enable_inline_citations_api: Optional[bool] = None
+    conversation_time_window: Optional[bool] = None
+    conversation_retention_period: Optional[ConversationRetentionPeriod] = None
+    conversation_retention_days: Optional[int] = None
+    use_context_aware_starter_question: Optional[bool] = None
+    enable_agent_knowledge_base_awareness: Optional[bool] = None
+    markdown_enabled: Optional[bool] = None
+
+
+class PostProjectsPluginsBody(APIModel):
+    """application/json body of: Create a plugin."""
+
+    model_name_: Optional[str] = Field(None, alias="model_name")
+    human_name: Optional[str] = None
+    keywords: Optional[str] = None
+    description: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
+class PutProjectsPluginsBody(APIModel):
+    """application/json body of: Update a plugin."""
+
+    model_name_: Optional[str] = Field(None, alias="model_name")
+    human_name: Optional[str] = None
+    keywords: Optional[str] = None
+    description: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
+class PostProjectsConversationsBody(APIModel):
+    """application/json body of: Create a new conversation."""
+
+    name: Optional[str] = None
+
+
+class PutProjectsConversationsByIdBody(APIModel):
+    """application/json body of: Update a conversation."""
+
+    name: Optional[str] = None
+
+
+class PostProjectsConversationsMessagesBody(APIModel):
+    """application/json body of: Send a message to a conversation."""
+
+    prompt: Optional[str] = None
+    custom_persona: Optional[str] = None
+    chatbot_model: Optional[ChatbotModel] = None
+    response_source: Optional[ResponseSource] = None
+
+
+class PutProjectsConversationsMessagesFeedbackBody(APIModel):
+    """application/json body of: Update the reaction for a specific message"""
+
+    reaction: Optional[Reaction] = None
+
+
+class PostProjectsSourcesBody(APIModel):
+    """multipart/form-data body of: Create a new agent source."""
+
+    sitemap_path: Optional[str] = None
+    file_data_retension: Optional[bool] = None
+    is_ocr_enabled: Optional[bool] = None
+    is_anonymized: Optional[bool] = None
+    file: Optional[Any] = None
+
+
+class PutProjectsSourcesByIdBody(APIModel):
+    """application/json body of: Update agent source settings."""
+
+    executive_js: Optional[bool] = None
+    data_refresh_frequency: Optional[DataRefreshFrequency] = None
+    create_new_pages: Optional[bool] = None
+    remove_unexist_pages: Optional[bool] = None
+    refresh_existing_pages: Optional[RefreshExistingPages] = None
+    refresh_schedule: Optional[List[Dict[str, Any]]] = None
+
+
+class PostProjectsLicensesBody(APIModel):
+    """application/json body of: Create a new license for an agent"""
+
+    name: Optional[str] = None
+
+
+class PutProjectsLicensesByIdBody(APIModel):
+    """application/json body of: Update a license for an agent"""
+
+    name: Optional[str] = None
+
+
+class PostUserBody(APIModel):
+    """multipart/form-data body of: Update the user's profile."""
+
+    profile_photo: Optional[Any] = None
+    name: Optional[str] = None
@@ -0,0 +1,121 @@
+"""
+Response decoding benchmark.
+
+Builds a synthetic list_pages body and reports, per decoding strategy, the
+median CPU time and the peak Python heap (tracemalloc) of turning it into
+the item list a bulk tool needs:
+
+- ``str + json.loads``: the previous path (decode bytes to str, then parse);
+- ``loads(bytes)``: jsondecode.loads straight from bytes (orjson if installed);
+- ``iter_array``: streaming the item array in 64 KiB chunks;
+- ``iter_array + fields``: the same, keeping only ``--fields`` of each item.
+
+Run from the repository root:
+
+    python benchmarks/decode.py --items 20000
+    python benchmarks/decode.py --items 5000 --fields id,page_url --json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import jsondecode  # noqa: E402
+from jsondecode import iter_array, iter_bytes, loads  # noqa: E402
+
+
+def make_body(items: int) -> bytes:
+    pages = [{
+        "id": i,
+        "page_url": f"https://example.com/docs/section-{i % 97}/page-{i}",
+        "page_url_hash": f"{i:064x}",
+        "project_id": 1,
+        "s3_path": None,
+        "crawl_status": "ok",
+        "index_status": "ok" if i % 5 else "queued",
+        "is_file": False,
+        "is_refreshable": True,
+        "is_file_kept": True,
+        "filename": None,
+        "filesize": 10_000 + i,
+        "created_at": "2026-01-01T00:00:00.000000Z",
+        "updated_at": "2026-01-02T00:00:00.000000Z",
+        "metadata": {"title": f"Page {i} — résumé", "description": "x" * 200},
+    } for i in range(items)]
+    body = {"status": "success",
+            "data": {"project": {"id": 1}, "pages": {"current_page": 1, "data": pages, "per_page": items,
+                                                     "last_page": 1, "total": items}}}
+    return json.dumps(body, ensure_ascii=False).encode()
+
+
+def strategies(fields):
+    def legacy(raw):
+        return json.loads(raw.decode("utf-8"))["data"]["pages"]["data"]
+
+    def from_bytes(raw):
+        return loads(raw)["data"]["pages"]["data"]
+
+    def streamed(raw, keep=None):
+        async def run():
+            items = []
+            async for item in iter_array(iter_bytes(raw), "data.pages.data"):
+                items.append({k: item[k] for k in keep if k in item} if keep else item)
+            return items
+        return asyncio.run(run())
+
+    return [
+        ("str + json.loads", legacy),
+        ("loads(bytes)", from_bytes),
+        ("iter_array", streamed),
+        ("iter_array + fields", lambda raw: streamed(raw, fields)),
+    ]
+
+
+def measure(fn, raw: bytes, runs: int) -> dict:
+    fn(raw)  # warm up
+    times = []
+    for _ in range(runs):
+        started = time.process_time()
+        fn(raw)
+        times.append(time.process_time() - started)
+    tracemalloc.start()
+    result = fn(raw)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return {"cpu_ms": round(statistics.median(times) * 1000, 1), "peak_heap_mb": round(peak / 2**20, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--fields", default="id,page_url,index_status")
+    parser.add_argument("--json", action="store_true", help="print raw JSON instead of a table")
+    args = parser.parse_args()
+
+    raw = make_body(args.items)
+    fields = [f for f in args.fields.split(",") if f]
+    results = [{"strategy": name, **measure(fn, raw, args.runs)} for name, fn in strategies(fields)]
+    meta = {"items": args.items, "body_mb": round(len(raw) / 2**20, 1),
+            "orjson": jsondecode.orjson is not None}
+    if args.json:
+        print(json.dumps({**meta, "results": results}, indent=2))
+        return
+
+    print(f"{meta['items']} items, {meta['body_mb']} MB body, orjson={meta['orjson']}")
+    print(f"{'strategy':<24}{'cpu_ms':>12}{'peak_heap_mb':>16}")
+    for row in results:
+        print(f"{row['strategy']:<24}{row['cpu_ms']:>12}{row['peak_heap_mb']:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Load-test harness for the MCP server.
+
+Drives server.py tools at a target rate (open loop: calls are started on
+schedule whether or not earlier ones have finished) and reports throughput
+and p50/p95/p99 latency overall and per tool. By default the CustomGPT API
+is replaced by the in-process mock from benchmarks/mock_server.py, so no
+quota is spent. Run from the repository root:
+
+    python benchmarks/load.py --rps 50 --duration 30
+    python benchmarks/load.py --tools get_agent,list_pages --latency lognormal:0.1:0.5
+    python benchmarks/load.py --error-rate 0.05 --rate-limit-rate 0.02 --json
+
+Every registered tool is exercised unless --tools/--exclude narrow the mix.
+Arguments are synthesised from each tool's input schema; tools whose
+required arguments cannot be synthesised are reported as skipped. Latency
+is measured from the scheduled start, so time spent queued behind
+--max-in-flight counts against the tool.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import mock_server  # noqa: E402
+
+# Arguments that cannot be derived from a parameter's name and type
+ARGUMENTS: Dict[str, Dict[str, Any]] = {
+    "batch": {"operations": [{"tool": "get_agent", "args": {"project_id": 1}},
+                             {"tool": "list_pages", "args": {"project_id": 1}}]},
+    "chat_completion": {"messages": [{"role": "user", "content": "What are your opening hours?"}]},
+    "chat_completion_batch": {"requests": [{"prompt": "What are your opening hours?"},
+                                           {"prompt": "Do you ship abroad?"}]},
+    "fan_out_query": {"project_ids": [1, 2, 3]},
+    "run_eval": {"prompts": ["What are your opening hours?"]},
+    "update_message_feedback": {"reaction": "liked"},
+}
+
+VALUES_BY_NAME: Dict[str, Any] = {
+    "session_id": "f1b9aaf0-5e4e-11eb-ae93-0242ac130002",
+    "message": "What are your opening hours?",
+    "prompt": "What are your opening hours?",
+    "query": "opening hours",
+    "sitemap_path": "https://www.example.com/sitemap.xml",
+    "email": "user@example.com",
+    "license_id": "1",
+    "preview_id": "1",
+    "handle": "0123456789abcdef",
+}
+
+
+def synthesise(name: str, schema: Dict[str, Any]) -> Any:
+    """Value for one parameter, or raise KeyError if nothing sensible fits."""
+    if name in VALUES_BY_NAME:
+        return VALUES_BY_NAME[name]
+    options = schema.get("anyOf") or [schema]
+    schema = next((o for o in options if o.get("type") != "null"), options[0])
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if kind == "integer":
+        return 1
+    if kind == "number":
+        return 1.0
+    if kind == "boolean":
+        return False
+    if kind == "string":
+        return "benchmark"
+    if kind == "array" and (schema.get("items") or {}).get("type") in ("integer", "string"):
+        return [1, 2] if schema["items"]["type"] == "integer" else ["benchmark"]
+    raise KeyError(name)
+
+
+def tool_arguments(tool: Any) -> Dict[str, Any]:
+    schema = tool.inputSchema or {}
+    properties = schema.get("properties") or {}
+    arguments = dict(ARGUMENTS.get(tool.name, {}))
+    for name in schema.get("required") or []:
+        if name not in arguments:
+            arguments[name] = synthesise(name, properties.get(name) or {})
+    return arguments
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, max(0, int(round(q * len(samples))) - 1))]
+
+
+def describe(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+    }
+
+
+def failed(result: Any) -> bool:
+    data = getattr(result, "structured_content", None)
+    return getattr(result, "is_error", False) or (
+        isinstance(data, dict) and (data.get("success") is False or data.get("valid") is False))
+
+
+async def drive(client: Any, plan: List[Dict[str, Any]], rps: float, duration: float,
+                max_in_flight: int) -> Dict[str, Any]:
+    """Start calls every 1/rps seconds, round-robin over the plan, and collect latencies."""
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    messages: Dict[str, str] = {}
+    gate = asyncio.Semaphore(max_in_flight)
+
+    async def call(entry: Dict[str, Any], scheduled: float) -> None:
+        name = entry["tool"]
+        async with gate:
+            try:
+                result = await client.call_tool(name, entry["arguments"], raise_on_error=False)
+                if failed(result):
+                    errors[name] += 1
+                    data = getattr(result, "structured_content", None) or {}
+                    messages.setdefault(name, str(data.get("error", ""))[:200])
+            except Exception as e:
+                errors[name] += 1
+                messages.setdefault(name, str(e)[:200])
+        latencies[name].append(time.perf_counter() - scheduled)
+
+    total = max(1, int(rps * duration))
+    started = time.perf_counter()
+    tasks = []
+    for i, entry in zip(range(total), itertools.cycle(plan)):
+        scheduled = started + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(call(entry, scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    every = [value for values in latencies.values() for value in values]
+    return {
+        "target_rps": rps,
+        "elapsed_s": round(elapsed, 2),
+        "overall": describe(every, sum(errors.values()), elapsed),
+        "tools": {name: describe(latencies[name], errors[name], elapsed) for name in sorted(latencies)},
+        "first_errors": messages,
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    runner = None
+    mock_config = mock_server.config_from_args(args)
+    if args.url is None:
+        base_url = args.api_base
+        if base_url is None:
+            runner, base_url = await mock_server.start(mock_config)
+        workdir = tempfile.mkdtemp(prefix="customgpt-load-")
+        os.environ.update({
+            "CUSTOMGPT_API_BASE": base_url,
+            "CUSTOMGPT_API_KEY": os.getenv("CUSTOMGPT_API_KEY", "load-test-key"),
+            "TRANSCRIPT_DB_PATH": os.path.join(workdir, "transcripts.db"),
+            "ANSWER_CACHE_PATH": os.path.join(workdir, "answers.db"),
+            "EVAL_DIR": os.path.join(workdir, "evals"),
+        })
+        if args.no_rate_limit:
+            os.environ["RATE_LIMIT_ENABLED"] = "false"
+        logging.disable(logging.INFO)
+        from fastmcp import Client
+
+        import server
+        client = Client(server.mcp)
+    else:
+        from fastmcp import Client
+        from fastmcp.client.transports import StreamableHttpTransport
+        client = Client(StreamableHttpTransport(args.url))
+
+    try:
+        async with client:
+            tools = await client.list_tools()
+            wanted = set(args.tools.split(",")) if args.tools else None
+            excluded = set(args.exclude.split(",")) if args.exclude else set()
+            plan, skipped = [], []
+            for tool in tools:
+                if (wanted is not None and tool.name not in wanted) or tool.name in excluded:
+                    continue
+                try:
+                    plan.append({"tool": tool.name, "arguments": tool_arguments(tool)})
+                except KeyError as missing:
+                    skipped.append(f"{tool.name} (needs {missing})")
+            if not plan:
+                raise SystemExit("No tools selected")
+            report = await drive(client, plan, args.rps, args.duration, args.max_in_flight)
+            report["skipped"] = skipped
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+    if runner is not None:
+        report["mock"] = {key: mock_config.counters.get(key, 0)
+                          for key in ("requests", "injected_429", "injected_500", "streams", "unmatched")}
+    return report
+
+
+def print_table(report: Dict[str, Any]) -> None:
+    columns = ("calls", "errors", "throughput_rps", "mean_ms", "p50_ms", "p95_ms", "p99_ms")
+    print(f"target {report['target_rps']} rps for {report['elapsed_s']} s")
+    print(f"{'tool':<32}" + "".join(f"{c:>16}" for c in columns))
+    for name, row in [("ALL", report["overall"])] + list(report["tools"].items()):
+        print(f"{name:<32}" + "".join(f"{str(row[c]):>16}" for c in columns))
+    if "mock" in report:
+        print("mock: " + ", ".join(f"{k}={v}" for k, v in report["mock"].items()))
+    if report["skipped"]:
+        print("skipped: " + ", ".join(report["skipped"]))
+    for name, message in report["first_errors"].items():
+        print(f"first error from {name}: {message}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rps", type=float, default=20.0, help="target tool calls per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to keep starting calls")
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--tools", help="comma-separated tools to call (default: all)")
+    parser.add_argument("--exclude", help="comma-separated tools to leave out")
+    parser.add_argument("--url", help="load an already running MCP server over HTTP instead")
+    parser.add_argument("--api-base", help="CustomGPT API base URL (default: start the mock)")
+    parser.add_argument("--no-rate-limit", action="store_true",
+                        help="disable the client-side rate limiter to measure server overhead")
+    parser.add_argument("--json", action="store_true", help="print raw JSON instead of a table")
+    mock_server.add_arguments(parser)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Offline CustomGPT mock server for load testing.
+
+Serves every operation in docs/openapi.json with a fake response built from
+the documented schema (examples where present, type-based values otherwise),
+so the MCP server can be exercised without spending quota. Pagination
+envelopes follow the ``page`` query parameter and list items get distinct ids.
+
+Fault injection:
+
+- latency drawn from a distribution, separately for chat endpoints;
+- a share of requests answered with the documented 500 body;
+- 429 responses with Retry-After, at random and/or past an RPS ceiling
+  per API key;
+- SSE streaming for ``messages?stream=1`` and streamed chat completions.
+
+Run it standalone and point the MCP server at it:
+
+    python benchmarks/mock_server.py --port 8089 --latency lognormal:0.15:0.5
+    CUSTOMGPT_API_BASE=http://127.0.0.1:8089 python server.py
+
+Latency specs are ``fixed:S``, ``uniform:LOW:HIGH``, ``normal:MEAN:SD``,
+``lognormal:MEDIAN:SIGMA`` or ``exp:MEAN`` (seconds). ``GET /_mock/stats``
+returns request and injection counters.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from aiohttp import web
+
+ROOT = Path(__file__).resolve().parent.parent
+SPEC_PATH = ROOT / "docs" / "openapi.json"
+CHAT_PATHS = ("/messages", "/chat/completions")
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Build a sampler (seconds, never negative) from a ``kind:arg:arg`` spec."""
+    kind, *args = spec.split(":")
+    values = [float(a) for a in args]
+    samplers = {
+        "fixed": lambda rng: values[0],
+        "uniform": lambda rng: rng.uniform(values[0], values[1]),
+        "normal": lambda rng: rng.gauss(values[0], values[1]),
+        "lognormal": lambda rng: values[0] * math.exp(rng.gauss(0.0, values[1])),
+        "exp": lambda rng: rng.expovariate(1.0 / values[0]) if values[0] > 0 else 0.0,
+    }
+    if kind not in samplers:
+        raise ValueError(f"Unknown latency distribution '{kind}'; use one of {', '.join(samplers)}")
+    sampler = samplers[kind]
+    sampler(random.Random(0))  # fail fast on missing arguments
+    return lambda rng: max(0.0, sampler(rng))
+
+
+@dataclass
+class MockConfig:
+    latency: str = "fixed:0"
+    chat_latency: str = "lognormal:1.0:0.4"
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    rps_limit: float = 0.0
+    retry_after: int = 1
+    list_size: int = 10
+    pages: int = 3
+    stream_chunks: int = 20
+    chunk_interval: float = 0.02
+    seed: Optional[int] = None
+    spec_path: Path = SPEC_PATH
+    counters: Counter = field(default_factory=Counter)
+
+
+class SchemaFaker:
+    """Produces JSON values that conform to OpenAPI 3 schemas."""
+
+    def __init__(self, spec: Dict[str, Any], list_size: int, rng: random.Random):
+        self.spec = spec
+        self.list_size = list_size
+        self.rng = rng
+
+    def resolve(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        while "$ref" in node:
+            target: Any = self.spec
+            for part in node["$ref"].lstrip("#/").split("/"):
+                target = target[part]
+            node = target
+        return node
+
+    def fake(self, schema: Dict[str, Any], name: str = "", nested: bool = False) -> Any:
+        """Fake value; arrays inside list items get at most three entries."""
+        schema = self.resolve(schema)
+        kind = schema.get("type")
+        if kind == "object" or "properties" in schema:
+            return {key: self.fake(value, key, nested)
+                    for key, value in (schema.get("properties") or {}).items()}
+        if kind == "array":
+            size = min(3, self.list_size) if nested else self.list_size
+            items = [self.fake(schema.get("items") or {}, name, True) for _ in range(size)]
+            for index, item in enumerate(items, 1):
+                if isinstance(item, dict) and isinstance(item.get("id"), int):
+                    item["id"] = index
+            return items
+        if "example" in schema:
+            return schema["example"]
+        if "enum" in schema:
+            return self.rng.choice(schema["enum"])
+        if "default" in schema:
+            return schema["default"]
+        if kind == "integer":
+            return self.rng.randint(1, 1000)
+        if kind == "number":
+            return round(self.rng.uniform(0, 1000), 2)
+        if kind == "boolean":
+            return self.rng.random() < 0.5
+        fmt = schema.get("format")
+        if fmt == "date-time":
+            return time.strftime("%Y-%m-%d %H:%M:%S")
+        if fmt == "uuid":
+            return str(uuid.uuid4())
+        if fmt == "email":
+            return "user@example.com"
+        if fmt == "url":
+            return "https://example.com/"
+        return f"{name or 'value'}-{self.rng.randint(1, 9999)}"
+
+    def response(self, operation: Dict[str, Any], status: str) -> Tuple[int, Any]:
+        """Fake body of the documented response with this status (or the first 2xx)."""
+        responses = operation.get("responses") or {}
+        if status not in responses:
+            status = next((code for code in responses if code.startswith("2")), "200")
+        documented = self.resolve(responses.get(status) or {})
+        media = (documented.get("content") or {}).get("application/json") or {}
+        body = self.fake(media["schema"]) if "schema" in media else {}
+        return int(status), body
+
+
+def paginate(body: Any, page: int, config: MockConfig) -> None:
+    """Point every paginator envelope at the requested page and offset list ids."""
+    if isinstance(body, dict):
+        if "current_page" in body and "last_page" in body:
+            body.update(current_page=page, last_page=config.pages, per_page=config.list_size,
+                        total=config.pages * config.list_size)
+            for item in body.get("data") or []:
+                if isinstance(item, dict) and isinstance(item.get("id"), int):
+                    item["id"] += (page - 1) * config.list_size
+        for value in body.values():
+            paginate(value, page, config)
+    elif isinstance(body, list):
+        for value in body:
+            paginate(value, page, config)
+
+
+class RateLimiter:
+    """Token bucket per API key; a zero rate disables it."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.buckets: Dict[str, Tuple[float, float]] = {}
+
+    def allow(self, key: str) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        tokens, updated = self.buckets.get(key, (self.rate, now))
+        tokens = min(self.rate, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self.buckets[key] = (tokens, now)
+            return False
+        self.buckets[key] = (tokens - 1, now)
+        return True
+
+
+def create_app(config: MockConfig) -> web.Application:
+    spec = json.loads(Path(config.spec_path).read_text())
+    rng = random.Random(config.seed)
+    faker = SchemaFaker(spec, config.list_size, rng)
+    latency = parse_latency(config.latency)
+    chat_latency = parse_latency(config.chat_latency)
+    limiter = RateLimiter(config.rps_limit)
+    counters = config.counters
+
+    def fail(operation: Dict[str, Any], status: str, message: str) -> web.Response:
+        code, body = faker.response(operation, status) if status in operation["responses"] else (int(status), {})
+        body = body if isinstance(body, dict) else {}
+        body.update(status="error", message=message)
+        headers = {"Retry-After": str(config.retry_after)} if code == 429 else None
+        return web.json_response(body, status=code, headers=headers)
+
+    async def stream_message(request: web.Request, operation: Dict[str, Any]) -> web.StreamResponse:
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await resp.prepare(request)
+        _, message = faker.response(operation, "200")
+        answer = (message.get("data") or {}) if isinstance(message, dict) else {}
+        words = (answer.get("openai_response") or "Mock streamed answer").split(" ")
+        chunks = max(1, config.stream_chunks)
+        for i in range(chunks):
+            text = " ".join(words[i * len(words) // chunks:(i + 1) * len(words) // chunks])
+            event = {"status": "progress", "message": (" " if i else "") + text}
+            await resp.write(f"data: {json.dumps(event)}\n\n".encode())
+            await asyncio.sleep(config.chunk_interval)
+        finish = {"status": "finish", "prompt_id": answer.get("id"), "citations": answer.get("citations") or []}
+        await resp.write(f"data: {json.dumps(finish)}\n\n".encode())
+        await resp.write_eof()
+        return resp
+
+    async def stream_completion(request: web.Request) -> web.StreamResponse:
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await resp.prepare(request)
+        for i in range(max(1, config.stream_chunks)):
+            delta = {"choices": [{"index": 0, "delta": {"content": f"token{i} "}, "finish_reason": None}]}
+            await resp.write(f"data: {json.dumps(delta)}\n\n".encode())
+            await asyncio.sleep(config.chunk_interval)
+        await resp.write(b"data: [DONE]\n\n")
+        await resp.write_eof()
+        return resp
+
+    def handler_for(path: str, method: str, operation: Dict[str, Any]):
+        route = f"{method.upper()} {path}"
+        is_chat = path.endswith(CHAT_PATHS)
+
+        async def handle(request: web.Request) -> web.StreamResponse:
+            counters[route] += 1
+            counters["requests"] += 1
+            key = request.headers.get("Authorization", "")
+            if not limiter.allow(key) or rng.random() < config.rate_limit_rate:
+                counters["injected_429"] += 1
+                return fail(operation, "429", "Too many requests (injected)")
+            await asyncio.sleep((chat_latency if is_chat else latency)(rng))
+            if rng.random() < config.error_rate:
+                counters["injected_500"] += 1
+                return fail(operation, "500", "Internal server error (injected)")
+
+            if is_chat and method == "post":
+                stream = request.query.get("stream", "").lower() in ("1", "true")
+                if path.endswith("/chat/completions") and request.can_read_body:
+                    stream = bool((await request.json()).get("stream"))
+                if stream:
+                    counters["streams"] += 1
+                    if path.endswith("/messages"):
+                        return await stream_message(request, operation)
+                    return await stream_completion(request)
+
+            status, body = faker.response(operation, "201" if method == "post" else "200")
+            paginate(body, max(1, int(request.query.get("page", 1))), config)
+            return web.json_response(body, status=status)
+        return handle
+
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response(dict(counters))
+
+    app = web.Application()
+    app.router.add_get("/_mock/stats", stats)
+    for path, operations in spec["paths"].items():
+        for method, operation in operations.items():
+            if method in ("get", "post", "put", "delete", "patch"):
+                app.router.add_route(method.upper(), path, handler_for(path, method, operation))
+
+    async def not_found(request: web.Request) -> web.Response:
+        counters["unmatched"] += 1
+        return web.json_response({"status": "error", "message": f"No mock for {request.path}"}, status=404)
+    app.router.add_route("*", "/{tail:.*}", not_found)
+    return app
+
+
+async def start(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> Tuple[web.AppRunner, str]:
+    """Start the mock in the running loop; returns the runner and its base URL."""
+    runner = web.AppRunner(create_app(config), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound}"
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Mock options, shared with the load-test harness."""
+    defaults = MockConfig()
+    parser.add_argument("--latency", default=defaults.latency, help="latency of non-chat endpoints")
+    parser.add_argument("--chat-latency", default=defaults.chat_latency,
+                        help="latency of message and chat completion endpoints")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--rps-limit", type=float, default=0.0, help="429 past this many requests/second per key")
+    parser.add_argument("--retry-after", type=int, default=defaults.retry_after)
+    parser.add_argument("--list-size", type=int, default=defaults.list_size, help="items per list page")
+    parser.add_argument("--pages", type=int, default=defaults.pages, help="pages per paginated list")
+    parser.add_argument("--stream-chunks", type=int, default=defaults.stream_chunks)
+    parser.add_argument("--chunk-interval", type=float, default=defaults.chunk_interval)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(latency=args.latency, chat_latency=args.chat_latency, error_rate=args.error_rate,
+                      rate_limit_rate=args.rate_limit_rate, rps_limit=args.rps_limit,
+                      retry_after=args.retry_after, list_size=args.list_size, pages=args.pages,
+                      stream_chunks=args.stream_chunks, chunk_interval=args.chunk_interval, seed=args.seed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    add_arguments(parser)
+    args = parser.parse_args()
+    config = config_from_args(args)
+    print(f"🧪 Mock CustomGPT API on http://{args.host}:{args.port} (spec: {config.spec_path})")
+    web.run_app(create_app(config), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
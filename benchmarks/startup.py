@@ -0,0 +1,103 @@
+"""
+Cold-start benchmark for the MCP server.
+
+Spawns fresh interpreters and reports, per configuration, the median cost of
+importing FastMCP, importing server.py (which includes tool registration),
+the share of that spent building tool schemas, and the first tools/list
+call. Run from the repository root:
+
+    python benchmarks/startup.py --runs 5
+    python benchmarks/startup.py --groups agents,conversations,utilities
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = r"""
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+import fastmcp
+from fastmcp import FastMCP
+t1 = time.perf_counter()
+
+registration = [0.0]
+original_tool = FastMCP.tool
+
+def timed_tool(self, *args, **kwargs):
+    decorator = original_tool(self, *args, **kwargs)
+    def register(fn):
+        started = time.perf_counter()
+        try:
+            return decorator(fn)
+        finally:
+            registration[0] += time.perf_counter() - started
+    return register
+
+FastMCP.tool = timed_tool
+import server
+t2 = time.perf_counter()
+tools = asyncio.run(server.mcp.list_tools())
+t3 = time.perf_counter()
+print(json.dumps({
+    "import_fastmcp_ms": (t1 - t0) * 1000,
+    "import_server_ms": (t2 - t1) * 1000,
+    "tool_registration_ms": registration[0] * 1000,
+    "first_list_tools_ms": (t3 - t2) * 1000,
+    "total_ms": (t3 - t0) * 1000,
+    "tools": len(tools),
+    "aiohttp_imported": "aiohttp" in sys.modules,
+}))
+"""
+
+
+def run_once(env: dict) -> dict:
+    result = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(label: str, runs: int, extra_env: dict) -> dict:
+    env = {**os.environ, "CUSTOMGPT_API_KEY": os.getenv("CUSTOMGPT_API_KEY", "benchmark-key"),
+           **extra_env}
+    run_once(env)  # warm the bytecode cache so every run measures the same thing
+    samples = [run_once(env) for _ in range(runs)]
+    summary = {"config": label, "runs": runs, "tools": samples[-1]["tools"],
+               "aiohttp_imported": samples[-1]["aiohttp_imported"]}
+    for key in ("import_fastmcp_ms", "import_server_ms", "tool_registration_ms",
+                "first_list_tools_ms", "total_ms"):
+        summary[key] = round(statistics.median(s[key] for s in samples), 1)
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--groups", default="agents,conversations,utilities",
+                        help="MCP_TOOL_GROUPS value for the reduced configuration")
+    parser.add_argument("--json", action="store_true", help="print raw JSON instead of a table")
+    args = parser.parse_args()
+
+    results = [
+        measure("all tool groups", args.runs, {}),
+        measure(f"MCP_TOOL_GROUPS={args.groups}", args.runs, {"MCP_TOOL_GROUPS": args.groups}),
+    ]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    columns = ("tools", "import_fastmcp_ms", "import_server_ms", "tool_registration_ms",
+               "first_list_tools_ms", "total_ms", "aiohttp_imported")
+    print(f"{'config':<48}" + "".join(f"{c:>22}" for c in columns))
+    for row in results:
+        print(f"{row['config']:<48}" + "".join(f"{str(row[c]):>22}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Read-Through Response Cache
+
+In-process TTL cache for idempotent CustomGPT reads. Entries are LRU-ordered,
+bounded by both entry count and an approximate memory budget, and tagged so
+write tools can invalidate exactly the resources they touch.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+# Default time-to-live (seconds) per resource type
+DEFAULT_TTLS = {
+    "agent": 300,
+    "settings": 300,
+    "sources": 120,
+    "pages": 60,
+    "page_metadata": 300,
+    "citation": 3600,
+}
+
+
+def parse_ttls(spec: Optional[str]) -> Dict[str, float]:
+    """Parse a ``resource=seconds,resource=seconds`` override string."""
+    ttls: Dict[str, float] = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            name, _, seconds = item.partition("=")
+            ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+def key_fingerprint(api_key: Optional[str]) -> str:
+    """Short stable hash of an API key so raw keys never live in cache keys."""
+    return hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size", "tags", "resource", "tenant")
+
+    def __init__(self, value: Any, expires_at: float, size: int, tags: Tuple[Hashable, ...],
+                 resource: str, tenant: Optional[str]):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.tags = tags
+        self.resource = resource
+        self.tenant = tenant
+
+
+class TTLCache:
+    """LRU cache with per-resource TTLs, a memory cap and tag invalidation."""
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 32 * 1024 * 1024,
+                 default_ttl: float = 300, ttls: Optional[Dict[str, float]] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._resource_stats: Dict[str, Dict[str, int]] = {}
+        self._tenant_stats: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_env(cls) -> "TTLCache":
+        """Build a cache from CACHE_* / MEMORY_CACHE_SIZE environment variables."""
+        return cls(
+            max_entries=int(os.getenv("MEMORY_CACHE_SIZE", "1000")),
+            max_bytes=int(os.getenv("CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+            default_ttl=float(os.getenv("CACHE_TTL_SECONDS", "300")),
+            ttls=parse_ttls(os.getenv("CACHE_TTLS")),
+        )
+
+    def ttl_for(self, resource: str) -> float:
+        return self.ttls.get(resource, self.default_ttl)
+
+    def _count(self, resource: str, field: str, tenant: Optional[str]) -> None:
+        stats = self._resource_stats.setdefault(resource, {"hits": 0, "misses": 0})
+        stats[field] += 1
+        if tenant is not None:
+            totals = self._tenant_stats.setdefault(tenant, {"hits": 0, "misses": 0, "by_resource": {}})
+            totals[field] += 1
+            by_resource = totals["by_resource"].setdefault(resource, {"hits": 0, "misses": 0})
+            by_resource[field] += 1
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def get(self, key: Hashable, resource: str = "default",
+            tenant: Optional[str] = None) -> Tuple[bool, Any]:
+        """Return ``(hit, value)``; expired entries count as misses."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._count(resource, "hits", tenant)
+            return True, entry.value
+        if entry is not None:
+            self._drop(key)
+        self.misses += 1
+        self._count(resource, "misses", tenant)
+        return False, None
+
+    def set(self, key: Hashable, value: Any, resource: str = "default",
+            tags: Iterable[Hashable] = (), ttl: Optional[float] = None,
+            tenant: Optional[str] = None) -> None:
+        """Store a value; evicts least recently used entries past the caps."""
+        ttl = self.ttl_for(resource) if ttl is None else ttl
+        if ttl <= 0:
+            return
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = _Entry(value, time.monotonic() + ttl, size, tuple(tags), resource,
+                                    tenant)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, *tags: Hashable) -> int:
+        """Remove every entry carrying any of the given tags."""
+        wanted = set(tags)
+        stale = [key for key, entry in self._entries.items() if wanted.intersection(entry.tags)]
+        for key in stale:
+            self._drop(key)
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self, tenant: Optional[str] = None) -> int:
+        """Remove every entry, or only the entries stored for one tenant."""
+        if tenant is None:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            return removed
+        owned = [key for key, entry in self._entries.items() if entry.tenant == tenant]
+        for key in owned:
+            self._drop(key)
+        return len(owned)
+
+    def stats(self, tenant: Optional[str] = None) -> Dict[str, Any]:
+        """Counters for the whole cache, or for one tenant's entries and lookups."""
+        if tenant is not None:
+            return self._tenant_view(tenant)
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "ttls": self.ttls,
+            "by_resource": self._resource_stats,
+        }
+
+    def _tenant_view(self, tenant: str) -> Dict[str, Any]:
+        owned = [entry for entry in self._entries.values() if entry.tenant == tenant]
+        totals = self._tenant_stats.get(tenant, {"hits": 0, "misses": 0, "by_resource": {}})
+        lookups = totals["hits"] + totals["misses"]
+        return {
+            "entries": len(owned),
+            "bytes": sum(entry.size for entry in owned),
+            "hits": totals["hits"],
+            "misses": totals["misses"],
+            "hit_rate": round(totals["hits"] / lookups, 4) if lookups else 0.0,
+            "ttls": self.ttls,
+            "by_resource": totals["by_resource"],
+        }
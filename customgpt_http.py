@@ -0,0 +1,652 @@
+"""
+CustomGPT Async HTTP Transport
+
+Native asyncio client for the CustomGPT REST API built on a single pooled
+aiohttp session, so keep-alive connections are reused across tool calls
+instead of being opened per request. One coroutine per operation in
+docs/openapi.json.
+
+aiohttp is imported on first use rather than at import time, which keeps
+cold starts (health checks, tools/list) from paying for it.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Sequence
+
+import metrics
+from jsondecode import iter_array, loads, select
+from ratelimit import RateLimiter
+from resilience import Resilience, endpoint_template
+from singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    import aiohttp
+
+logger = logging.getLogger("customgpt-mcp-server")
+
+DEFAULT_BASE_URL = "https://app.customgpt.ai"
+
+# Read size when a body is parsed incrementally (request_items)
+ITEM_CHUNK_SIZE = 64 * 1024
+
+
+class CustomGPTAPIError(Exception):
+    """Raised when the CustomGPT API answers with a non-2xx status."""
+
+    def __init__(self, status_code: int, message: str, content: bytes = b"",
+                 headers: Optional[Dict[str, str]] = None):
+        super().__init__(f"CustomGPT API error {status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+        self.content = content
+        self.headers = headers or {}
+
+
+class CustomGPTResponse:
+    """Buffered upstream response (status, headers and raw body bytes)."""
+
+    __slots__ = ("status_code", "headers", "content")
+
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self) -> Any:
+        return loads(self.content) if self.content else None
+
+    def select(self, *paths: str) -> Dict[str, Any]:
+        """``{path: value}`` for paths such as ``data.data[*].id``."""
+        return select(self.json(), paths)
+
+
+def _error_message(content: bytes, default: str) -> str:
+    """Pull the human readable message out of a CustomGPT error body."""
+    try:
+        body = loads(content)
+    except ValueError:
+        return default
+    if isinstance(body, dict):
+        data = body.get("data")
+        if isinstance(data, dict) and data.get("message"):
+            return str(data["message"])
+        if body.get("message"):
+            return str(body["message"])
+    return default
+
+
+def _form_value(value: Any) -> str:
+    """Encode a multipart field the same way the CustomGPT SDK does."""
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value)
+
+
+def _clean(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop unset (None) values from a params/body dict."""
+    return {k: v for k, v in params.items() if v is not None}
+
+
+def _request_kwargs(params: Optional[Dict[str, Any]], json_body: Optional[Dict[str, Any]],
+                    form: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build aiohttp request kwargs from query params and a JSON or multipart body."""
+    kwargs: Dict[str, Any] = {}
+    if params:
+        # Lists become repeated keys (form style: filters=a&filters=b)
+        kwargs["params"] = [(k, _form_value(item)) for k, v in _clean(params).items()
+                            for item in (v if isinstance(v, (list, tuple)) else [v])]
+    if json_body is not None:
+        kwargs["json"] = _clean(json_body)
+    elif form is not None:
+        import aiohttp
+
+        data = aiohttp.FormData()
+        for key, value in _clean(form).items():
+            data.add_field(key, _form_value(value))
+        kwargs["data"] = data
+    return kwargs
+
+
+def _decode_event(data_lines: List[str]) -> Dict[str, Any]:
+    payload = "\n".join(data_lines)
+    try:
+        event = loads(payload)
+    except ValueError:
+        return {"status": "progress", "message": payload}
+    return event if isinstance(event, dict) else {"status": "progress", "message": str(event)}
+
+
+async def iter_sse_events(stream: "aiohttp.StreamReader") -> AsyncIterator[Dict[str, Any]]:
+    """Incrementally parse a text/event-stream body into JSON event dicts."""
+    data_lines: List[str] = []
+    async for raw in stream:
+        line = raw.decode("utf-8").rstrip("\r\n")
+        if not line:
+            if data_lines:
+                yield _decode_event(data_lines)
+                data_lines = []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if field == "data":
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+    if data_lines:
+        yield _decode_event(data_lines)
+
+
+class AsyncCustomGPT:
+    """Async CustomGPT API client sharing one pooled keep-alive session."""
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: str = DEFAULT_BASE_URL,
+        pool_limit: int = 100,
+        pool_limit_per_host: int = 0,
+        keepalive_timeout: float = 30.0,
+        timeout: float = 60.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        resilience: Optional[Resilience] = None,
+        single_flight: Optional[SingleFlight] = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.pool_limit = pool_limit
+        self.pool_limit_per_host = pool_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.resilience = resilience or Resilience()
+        self.single_flight = single_flight
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_env(cls) -> "AsyncCustomGPT":
+        """Build a client from CUSTOMGPT_* environment variables."""
+        return cls(
+            api_key=os.getenv("CUSTOMGPT_API_KEY"),
+            base_url=os.getenv("CUSTOMGPT_API_BASE", DEFAULT_BASE_URL),
+            pool_limit=int(os.getenv("CUSTOMGPT_POOL_LIMIT", "100")),
+            pool_limit_per_host=int(os.getenv("CUSTOMGPT_POOL_LIMIT_PER_HOST", "0")),
+            keepalive_timeout=float(os.getenv("CUSTOMGPT_KEEPALIVE_TIMEOUT", "30")),
+            timeout=float(os.getenv("CUSTOMGPT_TIMEOUT", "60")),
+            rate_limiter=(RateLimiter.from_env()
+                          if os.getenv("RATE_LIMIT_ENABLED", "true").lower() != "false" else None),
+            resilience=Resilience.from_env(),
+            single_flight=(SingleFlight()
+                           if os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() != "false" else None),
+        )
+
+    def for_api_key(self, api_key: str, pool_limit: Optional[int] = None) -> "AsyncCustomGPT":
+        """A client for another API key with its own connection pool.
+
+        Transport settings are copied; the rate limiter (keyed per API key),
+        the resilience layer (tracking CustomGPT's health) and request
+        coalescing (keyed per API key) are shared.
+        """
+        return AsyncCustomGPT(
+            api_key=api_key,
+            base_url=self.base_url,
+            pool_limit=pool_limit or self.pool_limit,
+            pool_limit_per_host=self.pool_limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            timeout=self.timeout,
+            rate_limiter=self.rate_limiter,
+            resilience=self.resilience,
+            single_flight=self.single_flight,
+        )
+
+    # ===== SESSION MANAGEMENT =====
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Accept": "application/json",
+            "User-Agent": "customgpt-mcp-server",
+        }
+
+    async def session(self) -> "aiohttp.ClientSession":
+        """Return the shared session, creating it on the running loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_limit,
+                limit_per_host=self.pool_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self._headers(),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._loop = loop
+        return self._session
+
+    async def close(self) -> None:
+        """Close the pooled session and release its connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    async def _throttle(self, method: str, path: str, wait: bool = True) -> bool:
+        """Take a rate-limit token; with ``wait=False`` only if one is free right now."""
+        if self.rate_limiter is None:
+            return True
+        if not wait:
+            return self.rate_limiter.try_acquire(self.api_key, method, path)
+        await self.rate_limiter.acquire(self.api_key, method, path)
+        return True
+
+    def _record(self, method: str, path: str, status: int, headers: Any) -> None:
+        if self.rate_limiter is not None:
+            self.rate_limiter.record(self.api_key, method, path, status, headers)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Dict[str, Any]] = None,
+        form: Optional[Dict[str, Any]] = None,
+    ) -> CustomGPTResponse:
+        """Send one request under the endpoint's retry/circuit-breaker policy.
+
+        Identical concurrent GETs for the same API key share one upstream call.
+        """
+        if method == "GET" and self.single_flight is not None:
+            key = (self.api_key, path, tuple(sorted((k, str(v)) for k, v in _clean(params or {}).items())))
+            return await self.single_flight.do(
+                key, lambda: self._request(method, path, params, json_body, form))
+        return await self._request(method, path, params, json_body, form)
+
+    async def _request(self, method: str, path: str, params: Optional[Dict[str, Any]],
+                       json_body: Optional[Dict[str, Any]],
+                       form: Optional[Dict[str, Any]]) -> CustomGPTResponse:
+        try:
+            return await self.resilience.call(
+                method, path, lambda: self._send(method, path, params, json_body, form),
+                throttle=functools.partial(self._throttle, method, path),
+            )
+        except Exception as e:
+            metrics.record_upstream_error(method, endpoint_template(path), e)
+            raise
+
+    async def _send(self, method: str, path: str, params: Optional[Dict[str, Any]],
+                    json_body: Optional[Dict[str, Any]],
+                    form: Optional[Dict[str, Any]]) -> CustomGPTResponse:
+        """Send one request on the pooled session and buffer the response.
+
+        The caller has already taken the rate-limit token (see ``request``).
+        """
+        session = await self.session()
+        kwargs = _request_kwargs(params, json_body, form)
+
+        started = time.perf_counter()
+        status = "error"
+        metrics.UPSTREAM_IN_FLIGHT.inc()
+        try:
+            async with session.request(method, f"{self.base_url}{path}", **kwargs) as resp:
+                content = await resp.read()
+                headers = dict(resp.headers)
+                status = str(resp.status)
+        finally:
+            metrics.UPSTREAM_IN_FLIGHT.dec()
+            metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - started, method=method,
+                                             endpoint=endpoint_template(path), status=status)
+
+        self._record(method, path, resp.status, headers)
+        if resp.status >= 400:
+            raise CustomGPTAPIError(
+                resp.status, _error_message(content, resp.reason or "request failed"),
+                content, headers,
+            )
+        return CustomGPTResponse(resp.status, headers, content)
+
+    async def stream(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Send a request expecting Server-Sent Events and yield each event as it arrives.
+
+        The overall timeout is lifted for streams; CUSTOMGPT_TIMEOUT instead bounds
+        the gap between two reads. Streams are guarded by the circuit breaker but
+        never retried, since chunks may already have been forwarded. The latency
+        metric records time to response headers, not the whole stream.
+        """
+        import aiohttp
+
+        session = await self.session()
+        kwargs = _request_kwargs(params, json_body, None)
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=self.timeout)
+        headers = {"Accept": "text/event-stream"}
+        await self._throttle(method, path)
+        endpoint = endpoint_template(path)
+        started = time.perf_counter()
+
+        try:
+            async with self.resilience.guard(method, path), session.request(
+                method, f"{self.base_url}{path}", headers=headers, timeout=timeout, **kwargs
+            ) as resp:
+                metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - started, method=method,
+                                                 endpoint=endpoint, status=str(resp.status))
+                self._record(method, path, resp.status, resp.headers)
+                if resp.status >= 400:
+                    content = await resp.read()
+                    raise CustomGPTAPIError(
+                        resp.status, _error_message(content, resp.reason or "request failed"),
+                        content, dict(resp.headers),
+                    )
+                async for event in iter_sse_events(resp.content):
+                    if event.get("status") == "error":
+                        raise CustomGPTAPIError(resp.status, str(event.get("message") or "stream error"))
+                    yield event
+        except Exception as e:
+            metrics.record_upstream_error(method, endpoint, e)
+            raise
+
+    async def request_items(
+        self,
+        method: str,
+        path: str,
+        item_path: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Any]:
+        """Send one request and return only the array at ``item_path`` (e.g. ``data.pages.data``).
+
+        The body is parsed while it downloads, one item at a time, and each
+        item is cut down to ``fields`` as it arrives, so neither the raw body
+        nor the rest of the envelope is ever held in memory. Retried like
+        ``request``, since nothing is handed out until the list is complete.
+        """
+        try:
+            return await self.resilience.call(
+                method, path, lambda: self._send_items(method, path, item_path, params, fields),
+                throttle=functools.partial(self._throttle, method, path),
+            )
+        except Exception as e:
+            metrics.record_upstream_error(method, endpoint_template(path), e)
+            raise
+
+    async def _send_items(self, method: str, path: str, item_path: str, params: Optional[Dict[str, Any]],
+                          fields: Optional[Sequence[str]]) -> List[Any]:
+        session = await self.session()
+        kwargs = _request_kwargs(params, None, None)
+
+        started = time.perf_counter()
+        status = "error"
+        metrics.UPSTREAM_IN_FLIGHT.inc()
+        try:
+            async with session.request(method, f"{self.base_url}{path}", **kwargs) as resp:
+                status = str(resp.status)
+                self._record(method, path, resp.status, resp.headers)
+                if resp.status >= 400:
+                    content = await resp.read()
+                    raise CustomGPTAPIError(
+                        resp.status, _error_message(content, resp.reason or "request failed"),
+                        content, dict(resp.headers),
+                    )
+                items = []
+                async for item in iter_array(resp.content.iter_chunked(ITEM_CHUNK_SIZE), item_path):
+                    if fields and isinstance(item, dict):
+                        item = {k: item[k] for k in fields if k in item}
+                    items.append(item)
+                return items
+        finally:
+            metrics.UPSTREAM_IN_FLIGHT.dec()
+            metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - started, method=method,
+                                             endpoint=endpoint_template(path), status=status)
+
+    # ===== AGENTS (PROJECTS) =====
+
+    async def list_projects(self, page: int = 1, **params: Any) -> CustomGPTResponse:
+        return await self.request("GET", "/api/v1/projects", params={"page": page, **params})
+
+    async def list_projects_items(self, page: int = 1, fields: Optional[Sequence[str]] = None,
+                                  **params: Any) -> List[Any]:
+        return await self.request_items("GET", "/api/v1/projects", "data.data",
+                                        params={"page": page, **params}, fields=fields)
+
+    async def create_project(self, project_name: str, **fields: Any) -> CustomGPTResponse:
+        return await self.request("POST", "/api/v1/projects",
+                                  form={"project_name": project_name, **fields})
+
+    async def get_project(self, project_id: int, **params: Any) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/projects/{project_id}", params=params)
+
+    async def update_project(self, project_id: int, **fields: Any) -> CustomGPTResponse:
+        return await self.request("POST", f"/api/v1/projects/{project_id}", form=fields)
+
+    async def delete_project(self, project_id: int) -> CustomGPTResponse:
+        return await self.request("DELETE", f"/api/v1/projects/{project_id}")
+
+    async def replicate_project(self, project_id: int) -> CustomGPTResponse:
+        return await self.request("POST", f"/api/v1/projects/{project_id}/replicate")
+
+    async def get_project_stats(self, project_id: int) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/projects/{project_id}/stats")
+
+    async def chat_completions(self, project_id: int, **body: Any) -> CustomGPTResponse:
+        return await self.request("POST", f"/api/v1/projects/{project_id}/chat/completions",
+                                  json_body=body)
+
+    def stream_chat_completions(self, project_id: int, **body: Any) -> AsyncIterator[Dict[str, Any]]:
+        """Chat completion with stream=true; iterates OpenAI-style chunk events."""
+        return self.stream("POST", f"/api/v1/projects/{project_id}/chat/completions",
+                           json_body={**body, "stream": True})
+
+    # ===== PAGES =====
+
+    async def list_pages(self, project_id: int, page: int = 1, limit: int = 20,
+                         **params: Any) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/projects/{project_id}/pages",
+                                  params={"page": page, "limit": limit, **params})
+
+    async def list_pages_items(self, project_id: int, page: int = 1, limit: int = 20,
+                               fields: Optional[Sequence[str]] = None, **params: Any) -> List[Any]:
+        return await self.request_items("GET", f"/api/v1/projects/{project_id}/pages", "data.pages.data",
+                                        params={"page": page, "limit": limit, **params}, fields=fields)
+
+    async def delete_page(self, project_id: int, page_id: int) -> CustomGPTResponse:
+        return await self.request("DELETE", f"/api/v1/projects/{project_id}/pages/{page_id}")
+
+    async def reindex_page(self, project_id: int, page_id: int) -> CustomGPTResponse:
+        return await self.request("POST", f"/api/v1/projects/{project_id}/pages/{page_id}/reindex")
+
+    async def get_page_metadata(self, project_id: int, page_id: int) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/projects/{project_id}/pages/{page_id}/metadata")
+
+    async def update_page_metadata(self, project_id: int, page_id: int,
+                                   **fields: Any) -> CustomGPTResponse:
+        return await self.request("PUT", f"/api/v1/projects/{project_id}/pages/{page_id}/metadata",
+                                  json_body=fields)
+
+    async def preview(self, preview_id: str) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/preview/{preview_id}")
+
+    # ===== SETTINGS & PLUGINS =====
+
+    async def get_project_settings(self, project_id: int) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/projects/{project_id}/settings")
+
+    async def update_project_settings(self, project_id: int, **fields: Any) -> CustomGPTResponse:
+        return await self.request("POST", f"/api/v1/projects/{project_id}/settings", form=fields)
+
+    async def list_plugins(self, project_id: int) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/projects/{project_id}/plugins")
+
+    async def create_plugin(self, project_id: int, **fields: Any) -> CustomGPTResponse:
+        return await self.request("POST", f"/api/v1/projects/{project_id}/plugins", json_body=fields)
+
+    async def update_plugin(self, project_id: int, **fields: Any) -> CustomGPTResponse:
+        return await self.request("PUT", f"/api/v1/projects/{project_id}/plugins", json_body=fields)
+
+    # ===== CONVERSATIONS & MESSAGES =====
+
+    async def list_conversations(self, project_id: int, page: int = 1,
+                                 **params: Any) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/projects/{project_id}/conversations",
+                                  params={"page": page, **params})
+
+    async def list_conversations_items(self, project_id: int, page: int = 1,
+                                       fields: Optional[Sequence[str]] = None, **params: Any) -> List[Any]:
+        return await self.request_items("GET", f"/api/v1/projects/{project_id}/conversations", "data.data",
+                                        params={"page": page, **params}, fields=fields)
+
+    async def create_conversation(self, project_id: int, name: Optional[str] = None) -> CustomGPTResponse:
+        return await self.request("POST", f"/api/v1/projects/{project_id}/conversations",
+                                  json_body={"name": name})
+
+    async def update_conversation(self, project_id: int, session_id: str, name: str) -> CustomGPTResponse:
+        return await self.request("PUT", f"/api/v1/projects/{project_id}/conversations/{session_id}",
+                                  json_body={"name": name})
+
+    async def delete_conversation(self, project_id: int, session_id: str) -> CustomGPTResponse:
+        return await self.request("DELETE", f"/api/v1/projects/{project_id}/conversations/{session_id}")
+
+    async def list_messages(self, project_id: int, session_id: str, page: int = 1,
+                            **params: Any) -> CustomGPTResponse:
+        return await self.request(
+            "GET", f"/api/v1/projects/{project_id}/conversations/{session_id}/messages",
+            params={"page": page, **params},
+        )
+
+    async def list_messages_items(self, project_id: int, session_id: str, page: int = 1,
+                                  fields: Optional[Sequence[str]] = None, **params: Any) -> List[Any]:
+        return await self.request_items(
+            "GET", f"/api/v1/projects/{project_id}/conversations/{session_id}/messages",
+            "data.messages.data", params={"page": page, **params}, fields=fields,
+        )
+
+    async def send_message(self, project_id: int, session_id: str, prompt: str,
+                           lang: str = "en", external_id: Optional[str] = None,
+                           **body: Any) -> CustomGPTResponse:
+        return await self.request(
+            "POST", f"/api/v1/projects/{project_id}/conversations/{session_id}/messages",
+            params={"stream": 0, "lang": lang, "external_id": external_id},
+            json_body={"prompt": prompt, **body},
+        )
+
+    def stream_message(self, project_id: int, session_id: str, prompt: str,
+                       lang: str = "en", external_id: Optional[str] = None,
+                       **body: Any) -> AsyncIterator[Dict[str, Any]]:
+        """Send a message with stream=1 and iterate its progress/finish events."""
+        return self.stream(
+            "POST", f"/api/v1/projects/{project_id}/conversations/{session_id}/messages",
+            params={"stream": 1, "lang": lang, "external_id": external_id},
+            json_body={"prompt": prompt, **body},
+        )
+
+    async def get_message(self, project_id: int, session_id: str, prompt_id: int) -> CustomGPTResponse:
+        return await self.request(
+            "GET", f"/api/v1/projects/{project_id}/conversations/{session_id}/messages/{prompt_id}"
+        )
+
+    async def update_message_feedback(self, project_id: int, session_id: str, prompt_id: int,
+                                      reaction: str) -> CustomGPTResponse:
+        return await self.request(
+            "PUT",
+            f"/api/v1/projects/{project_id}/conversations/{session_id}/messages/{prompt_id}/feedback",
+            json_body={"reaction": reaction},
+        )
+
+    # ===== CITATIONS =====
+
+    async def get_citation(self, project_id: int, citation_id: int) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/projects/{project_id}/citations/{citation_id}")
+
+    # ===== SOURCES =====
+
+    async def list_sources(self, project_id: int) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/projects/{project_id}/sources")
+
+    async def create_source(self, project_id: int, **fields: Any) -> CustomGPTResponse:
+        return await self.request("POST", f"/api/v1/projects/{project_id}/sources", form=fields)
+
+    async def update_source(self, project_id: int, source_id: int, **fields: Any) -> CustomGPTResponse:
+        return await self.request("PUT", f"/api/v1/projects/{project_id}/sources/{source_id}",
+                                  json_body=fields)
+
+    async def delete_source(self, project_id: int, source_id: int) -> CustomGPTResponse:
+        return await self.request("DELETE", f"/api/v1/projects/{project_id}/sources/{source_id}")
+
+    async def synchronize_source(self, project_id: int, source_id: int) -> CustomGPTResponse:
+        return await self.request(
+            "PUT", f"/api/v1/projects/{project_id}/sources/{source_id}/instant-sync"
+        )
+
+    # ===== REPORTS & ANALYTICS =====
+
+    async def get_traffic_report(self, project_id: int, **params: Any) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/projects/{project_id}/reports/traffic",
+                                  params=params)
+
+    async def get_queries_report(self, project_id: int, **params: Any) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/projects/{project_id}/reports/queries",
+                                  params=params)
+
+    async def get_conversations_report(self, project_id: int, **params: Any) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/projects/{project_id}/reports/conversations",
+                                  params=params)
+
+    async def get_analysis_report(self, project_id: int, **params: Any) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/projects/{project_id}/reports/analysis",
+                                  params=params)
+
+    async def get_intelligence_report(self, project_id: int, page: int = 1, limit: int = 100,
+                                      **params: Any) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/projects/{project_id}/reports/intelligence",
+                                  params={"page": page, "limit": limit, **params})
+
+    async def get_intelligence_report_items(self, project_id: int, page: int = 1, limit: int = 100,
+                                            fields: Optional[Sequence[str]] = None,
+                                            **params: Any) -> List[Any]:
+        return await self.request_items("GET", f"/api/v1/projects/{project_id}/reports/intelligence",
+                                        "data.data", params={"page": page, "limit": limit, **params},
+                                        fields=fields)
+
+    # ===== LICENSES =====
+
+    async def list_licenses(self, project_id: int) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/projects/{project_id}/licenses")
+
+    async def create_license(self, project_id: int, name: str) -> CustomGPTResponse:
+        return await self.request("POST", f"/api/v1/projects/{project_id}/licenses",
+                                  json_body={"name": name})
+
+    async def get_license(self, project_id: int, license_id: str) -> CustomGPTResponse:
+        return await self.request("GET", f"/api/v1/projects/{project_id}/licenses/{license_id}")
+
+    async def update_license(self, project_id: int, license_id: str, name: str) -> CustomGPTResponse:
+        return await self.request("PUT", f"/api/v1/projects/{project_id}/licenses/{license_id}",
+                                  json_body={"name": name})
+
+    async def delete_license(self, project_id: int, license_id: str) -> CustomGPTResponse:
+        return await self.request("DELETE", f"/api/v1/projects/{project_id}/licenses/{license_id}")
+
+    # ===== USER & LIMITS =====
+
+    async def get_user(self) -> CustomGPTResponse:
+        return await self.request("GET", "/api/v1/user")
+
+    async def update_user(self, **fields: Any) -> CustomGPTResponse:
+        return await self.request("POST", "/api/v1/user", form=fields)
+
+    async def get_limits(self) -> CustomGPTResponse:
+        return await self.request("GET", "/api/v1/limits/usage")
@@ -0,0 +1,472 @@
+"""
+Agent Evaluation Runner
+
+Replays a prompt dataset against one or more agents, optionally under
+several *variants* (per-message overrides of ``chatbot_model``,
+``response_source``, ``custom_persona`` and ``lang``: the knobs
+``send_conversation_message`` passes through), so the effect of a settings
+change on latency and answers can be measured before the agent's settings
+are touched.
+
+Every prompt is sent, streamed, in a new conversation, exactly as
+``send_conversation_message(stream=True)`` would send it (the answer cache
+is bypassed). Each result records time to first token, total latency,
+citation count and the answer. Results are appended to a JSONL checkpoint
+as they finish, so an interrupted run resumes where it stopped; the final
+results are laid out as columns and summarised per (agent, variant) with
+percentiles, plus deltas against the first variant.
+
+Datasets are JSONL (one object per line, or one string) or CSV with a
+header. The prompt is read from ``prompt``, ``question`` or ``message``;
+``id`` and ``expected`` (a substring the answer should contain) are
+optional.
+
+    python evals.py prompts.jsonl --projects 123,456 --concurrency 8
+    python evals.py prompts.csv --projects 123 --variant base: \\
+        --variant gpt4o:chatbot_model=gpt-4-o --variant own:response_source=own_content
+"""
+
+import argparse
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+
+from api_models import PostProjectsConversationsMessagesBody
+from portfolio import DEFAULT_PERCENTILES, column_stats
+
+DEFAULT_EVAL_DIR = Path.home() / ".cache" / "customgpt-mcp" / "evals"
+
+PROMPT_KEYS = ("prompt", "question", "message")
+
+# Per-message overrides a variant may set (send_conversation_message parameters)
+VARIANT_OPTIONS = ("custom_persona", "chatbot_model", "response_source", "lang")
+
+# Result columns, in output order
+COLUMNS = ("case_id", "project_id", "variant", "success", "error", "ttft_ms", "latency_ms", "chunks",
+           "citations", "answer_chars", "expected_match", "prompt_id", "session_id", "answer")
+
+Case = Tuple[str, int, str]  # (case id, project id, variant name)
+Ask = Callable[[int, str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class EvalError(Exception):
+    """Raised for an unusable dataset, variant or checkpoint."""
+
+
+# --- datasets ---
+
+def parse_dataset(text: str, fmt: str) -> List[Dict[str, Any]]:
+    """Rows with ``id``, ``prompt`` and optional ``expected`` from JSONL or CSV text."""
+    if fmt == "csv":
+        raw: Iterable[Any] = csv.DictReader(io.StringIO(text))
+    elif fmt == "jsonl":
+        raw = (json.loads(line) for line in text.splitlines() if line.strip())
+    else:
+        raise EvalError(f"Unknown dataset format {fmt!r} (expected jsonl or csv)")
+    return normalize_rows(raw)
+
+
+def normalize_rows(raw: Iterable[Any]) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for number, item in enumerate(raw, 1):
+        if isinstance(item, str):
+            item = {"prompt": item}
+        if not isinstance(item, dict):
+            raise EvalError(f"Row {number}: expected an object or a string")
+        prompt = next((item[key] for key in PROMPT_KEYS if item.get(key)), None)
+        if not prompt:
+            raise EvalError(f"Row {number}: no {'/'.join(PROMPT_KEYS)} field")
+        row_id = item.get("id")
+        row = {"id": str(number if row_id in (None, "") else row_id), "prompt": str(prompt)}
+        if item.get("expected"):
+            row["expected"] = str(item["expected"])
+        rows.append(row)
+    ids = [row["id"] for row in rows]
+    if len(set(ids)) != len(ids):
+        raise EvalError("Dataset row ids must be unique")
+    return rows
+
+
+def load_dataset(path: Path) -> List[Dict[str, Any]]:
+    fmt = "csv" if path.suffix.lower() == ".csv" else "jsonl"
+    return parse_dataset(path.read_text(encoding="utf-8"), fmt)
+
+
+def resolve_in(directory: Path, name: str) -> Path:
+    """``directory / name``, refusing names that lead outside ``directory``."""
+    root = directory.expanduser().resolve()
+    path = (root / name).resolve()
+    if root != path and root not in path.parents:
+        raise EvalError(f"{name!r} is outside the eval directory")
+    return path
+
+
+def parse_variants(variants: Optional[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Validated variants (name -> overrides); a single empty "default" variant when none are given."""
+    if not variants:
+        return {"default": {}}
+    checked = {}
+    for name, options in variants.items():
+        unknown = set(options or {}) - set(VARIANT_OPTIONS)
+        if unknown:
+            raise EvalError(f"Variant {name!r}: unknown option(s) {', '.join(sorted(unknown))}; "
+                            f"allowed: {', '.join(VARIANT_OPTIONS)}")
+        overrides = {key: value for key, value in (options or {}).items() if value is not None}
+        body = {key: value for key, value in overrides.items() if key != "lang"}
+        try:
+            PostProjectsConversationsMessagesBody.model_validate(body)
+        except ValidationError as e:
+            raise EvalError(f"Variant {name!r}: {e.errors()[0]['loc'][0]}: {e.errors()[0]['msg']}") from e
+        checked[str(name)] = overrides
+    return checked
+
+
+def run_fingerprint(rows: Sequence[Dict[str, Any]], project_ids: Sequence[int],
+                    variants: Dict[str, Dict[str, Any]]) -> str:
+    """Stable id of (dataset, agents, variants): the same eval always maps to the same checkpoint."""
+    digest = hashlib.sha256(json.dumps([rows, sorted(project_ids), variants], sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+# --- checkpoint ---
+
+class Checkpoint:
+    """Append-only JSONL record of finished cases. The first line describes the run."""
+
+    def __init__(self, path: Path, header: Dict[str, Any], resume: bool = True, sync_every: int = 50):
+        self.path = path
+        self.header = header
+        self.resume = resume
+        self.sync_every = sync_every
+        self._file: Optional[io.TextIOWrapper] = None
+        self._unsynced = 0
+
+    def open(self) -> Dict[Case, Dict[str, Any]]:
+        """Open for appending; returns the records already in the file (latest per case)."""
+        records: Dict[Case, Dict[str, Any]] = {}
+        if self.resume and self.path.exists() and self.path.stat().st_size:
+            with self.path.open(encoding="utf-8") as f:
+                first = json.loads(f.readline())
+                if first.get("eval", {}).get("run") != self.header["run"]:
+                    raise EvalError(f"{self.path} belongs to a different eval run; pass resume=False to overwrite")
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from an interrupted write
+                    records[(record["case_id"], record["project_id"], record["variant"])] = record
+            with self.path.open("rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+            self._file = self.path.open("a", encoding="utf-8")
+            if torn:
+                self._file.write("\n")  # terminate the torn last line so appends start on their own
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("w", encoding="utf-8")
+            self._file.write(json.dumps({"eval": self.header}) + "\n")
+        self._file.flush()
+        return records
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.sync()
+
+    def sync(self) -> None:
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+
+# --- running ---
+
+async def ask_streamed(client: Any, project_id: int, prompt: str, options: Dict[str, Any],
+                       timeout: float) -> Dict[str, Any]:
+    """Send one prompt, streamed, in a new conversation and time it."""
+    session_id = str(uuid.uuid4())
+    result: Dict[str, Any] = {"session_id": session_id}
+    chunks: List[str] = []
+    final: Dict[str, Any] = {}
+    started = time.perf_counter()
+    first_chunk: List[float] = []
+
+    async def consume() -> None:
+        async for event in client.stream_message(project_id=project_id, session_id=session_id,
+                                                 prompt=prompt, **options):
+            if event.get("status") == "progress":
+                if not first_chunk:
+                    first_chunk.append(time.perf_counter())
+                chunks.append(event.get("message") or "")
+            else:
+                final.update(event)
+
+    try:
+        await asyncio.wait_for(consume(), timeout)
+        answer = "".join(chunks)
+        result.update(success=True, answer=answer, answer_chars=len(answer), chunks=len(chunks),
+                      citations=len(final.get("citations") or []),
+                      prompt_id=final.get("prompt_id") or final.get("id"))
+    except asyncio.TimeoutError:
+        result.update(success=False, error=f"Timed out after {timeout}s")
+    except Exception as e:
+        result.update(success=False, error=str(e))
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    if first_chunk:
+        result["ttft_ms"] = round((first_chunk[0] - started) * 1000, 1)
+    return result
+
+
+def expected_match(answer: Optional[str], expected: Optional[str]) -> Optional[bool]:
+    if expected is None:
+        return None
+    return expected.strip().lower() in (answer or "").lower()
+
+
+async def run_cases(rows: Sequence[Dict[str, Any]], project_ids: Sequence[int],
+                    variants: Dict[str, Dict[str, Any]], ask: Ask, checkpoint: Checkpoint,
+                    concurrency: int = 4, retry_failed: bool = True,
+                    progress: Optional[Dict[str, Any]] = None,
+                    on_progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+                    report_every: int = 25) -> List[Dict[str, Any]]:
+    """Run every (row, agent, variant) case not already in the checkpoint; returns all records.
+
+    ``progress`` (e.g. ``job.progress``) is kept up to date; ``on_progress``
+    is awaited every ``report_every`` finished cases.
+    """
+    progress = progress if progress is not None else {}
+    records = checkpoint.open()
+    try:
+        done = {case for case, record in records.items() if record.get("success") or not retry_failed}
+        by_id = {row["id"]: row for row in rows}
+        pending = [(row["id"], pid, name) for row in rows for pid in project_ids for name in variants
+                   if (row["id"], pid, name) not in done]
+        progress.update(total=len(rows) * len(project_ids) * len(variants), resumed=len(done),
+                        completed=len(done), failed=0, pending=len(pending))
+
+        queue = iter(pending)
+
+        async def worker() -> None:
+            for case in queue:
+                case_id, project_id, variant = case
+                row = by_id[case_id]
+                result = await ask(project_id, row["prompt"], variants[variant])
+                record = {"case_id": case_id, "project_id": project_id, "variant": variant, **result,
+                          "expected_match": expected_match(result.get("answer"), row.get("expected"))}
+                records[case] = record
+                checkpoint.append(record)
+                progress["completed"] += 1
+                progress["pending"] -= 1
+                if not record.get("success"):
+                    progress["failed"] += 1
+                if on_progress is not None and progress["completed"] % report_every == 0:
+                    await on_progress(progress)
+
+        await asyncio.gather(*[worker() for _ in range(max(1, min(concurrency, len(pending) or 1)))])
+    finally:
+        checkpoint.close()
+    order = {case: index for index, case in enumerate(
+        (row["id"], pid, name) for row in rows for pid in project_ids for name in variants)}
+    return sorted((record for case, record in records.items() if case in order), key=lambda r: order[
+        (r["case_id"], r["project_id"], r["variant"])])
+
+
+# --- results ---
+
+def columns(records: Sequence[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """One list per result field, aligned on case."""
+    return {name: [record.get(name) for record in records] for name in COLUMNS}
+
+
+def _numbers(values: Iterable[Any]) -> List[float]:
+    return [float(value) for value in values if value is not None]
+
+
+def _group_summary(cols: Dict[str, List[Any]], rows: List[int], percentiles: Sequence[float]) -> Dict[str, Any]:
+    ok = [i for i in rows if cols["success"][i]]
+    matches = [cols["expected_match"][i] for i in ok if cols["expected_match"][i] is not None]
+    summary: Dict[str, Any] = {
+        "cases": len(rows),
+        "succeeded": len(ok),
+        "failed": len(rows) - len(ok),
+        "error_rate": round((len(rows) - len(ok)) / len(rows), 4) if rows else 0.0,
+        "empty_answers": sum(1 for i in ok if not cols["answer_chars"][i]),
+    }
+    for name in ("ttft_ms", "latency_ms", "citations", "answer_chars"):
+        summary[name] = column_stats(_numbers(cols[name][i] for i in ok), percentiles)
+    if matches:
+        summary["expected_match_rate"] = round(sum(matches) / len(matches), 4)
+    return summary
+
+
+def _normalize_answer(answer: Optional[str]) -> str:
+    return " ".join((answer or "").split()).lower()
+
+
+def summarize(records: Sequence[Dict[str, Any]], variants: Sequence[str],
+              percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+    """Per (agent, variant) and overall summaries, with deltas against the first variant."""
+    cols = columns(records)
+    groups: Dict[Tuple[int, str], List[int]] = {}
+    for i, key in enumerate(zip(cols["project_id"], cols["variant"])):
+        groups.setdefault(key, []).append(i)
+
+    baseline = variants[0] if variants else None
+    answers = {(cols["case_id"][i], cols["project_id"][i], cols["variant"][i]): cols["answer"][i]
+               for i in range(len(records)) if cols["success"][i]}
+    summaries = []
+    for (project_id, variant), rows in groups.items():
+        item = {"project_id": project_id, "variant": variant,
+                **_group_summary(cols, rows, percentiles)}
+        base_rows = groups.get((project_id, baseline))
+        if variant != baseline and base_rows:
+            base = _group_summary(cols, base_rows, percentiles)
+            paired = [(answers.get((cols["case_id"][i], project_id, baseline)), answers.get(
+                (cols["case_id"][i], project_id, variant))) for i in rows]
+            paired = [(a, b) for a, b in paired if a is not None and b is not None]
+            delta = {f"{name}_p50": round(item[name]["p50"] - base[name]["p50"], 3)
+                     for name in ("ttft_ms", "latency_ms", "citations", "answer_chars")
+                     if "p50" in item[name] and "p50" in base[name]}
+            delta["error_rate"] = round(item["error_rate"] - base["error_rate"], 4)
+            if paired:
+                delta["answers_changed_rate"] = round(sum(
+                    _normalize_answer(a) != _normalize_answer(b) for a, b in paired) / len(paired), 4)
+            item["vs_baseline"] = delta
+        summaries.append(item)
+
+    return {
+        "cases": len(records),
+        "baseline_variant": baseline,
+        "overall": _group_summary(cols, list(range(len(records))), percentiles),
+        "groups": summaries,
+    }
+
+
+def write_results(path: Path, records: Sequence[Dict[str, Any]], summary: Dict[str, Any]) -> None:
+    """``.csv``: one row per case; anything else: JSON with ``columns`` and ``summary``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == ".csv":
+        with path.open("w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(records)
+        return
+    path.write_text(json.dumps({"columns": columns(records), "summary": summary}, default=str),
+                    encoding="utf-8")
+
+
+# --- CLI ---
+
+def _variant_arg(text: str) -> Tuple[str, Dict[str, str]]:
+    """``name:key=value,key=value`` (``name:`` for no overrides)."""
+    name, _, spec = text.partition(":")
+    options = dict(item.split("=", 1) for item in spec.split(",") if "=" in item)
+    return name or "default", options
+
+
+def _print_summary(summary: Dict[str, Any]) -> None:
+    header = ("project_id", "variant", "cases", "failed", "ttft_p50", "ttft_p90", "lat_p50", "lat_p90",
+              "lat_p99", "cites_mean", "changed")
+    print("".join(f"{h:>12}" for h in header))
+    for group in summary["groups"]:
+        ttft, latency = group["ttft_ms"], group["latency_ms"]
+        values = (group["project_id"], group["variant"][:11], group["cases"], group["failed"],
+                  ttft.get("p50", "-"), ttft.get("p90", "-"), latency.get("p50", "-"), latency.get("p90", "-"),
+                  latency.get("p99", "-"), group["citations"].get("mean", "-"),
+                  (group.get("vs_baseline") or {}).get("answers_changed_rate", "-"))
+        print("".join(f"{str(v):>12}" for v in values))
+
+
+async def _main(args: argparse.Namespace) -> int:
+    from customgpt_http import AsyncCustomGPT
+
+    rows = load_dataset(args.dataset)
+    if args.limit:
+        rows = rows[:args.limit]
+    project_ids = [int(p) for p in args.projects.split(",") if p.strip()]
+    variants = parse_variants(dict(args.variant) if args.variant else None)
+    if args.lang:
+        variants = {name: {"lang": args.lang, **options} for name, options in variants.items()}
+    run = run_fingerprint(rows, project_ids, variants)
+    checkpoint_path = args.checkpoint or args.dataset.with_name(f"{args.dataset.stem}.{run}.checkpoint.jsonl")
+    output = args.output or args.dataset.with_name(f"{args.dataset.stem}.{run}.results.json")
+
+    client = AsyncCustomGPT.from_env()
+    checkpoint = Checkpoint(checkpoint_path, {"run": run, "dataset": str(args.dataset), "rows": len(rows),
+                                              "project_ids": project_ids, "variants": variants},
+                            resume=not args.no_resume)
+    started = time.perf_counter()
+
+    async def report(progress: Dict[str, Any]) -> None:
+        print(f"{progress['completed']}/{progress['total']} done, {progress['failed']} failed "
+              f"({time.perf_counter() - started:.0f}s)", file=sys.stderr)
+
+    try:
+        records = await run_cases(
+            rows, project_ids, variants,
+            lambda pid, prompt, options: ask_streamed(client, pid, prompt, options, args.timeout),
+            checkpoint, args.concurrency, retry_failed=not args.keep_failed, on_progress=report)
+    finally:
+        await client.close()
+    summary = summarize(records, list(variants))
+    write_results(output, records, summary)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        _print_summary(summary)
+    print(f"checkpoint: {checkpoint_path}\nresults: {output}", file=sys.stderr)
+    return 0 if summary["overall"]["failed"] == 0 else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("dataset", type=Path, help="prompt dataset (.jsonl or .csv)")
+    parser.add_argument("--projects", required=True, help="comma separated agent (project) ids")
+    parser.add_argument("--variant", action="append", type=_variant_arg,
+                        help="name:key=value,... with keys from " + ", ".join(VARIANT_OPTIONS)
+                             + " (repeatable; the first is the baseline)")
+    parser.add_argument("--lang", default=None, help="lang for every variant that does not set one")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds per prompt")
+    parser.add_argument("--limit", type=int, default=0, help="only the first N dataset rows")
+    parser.add_argument("--checkpoint", type=Path, default=None)
+    parser.add_argument("--output", type=Path, default=None, help=".json (columnar) or .csv")
+    parser.add_argument("--no-resume", action="store_true", help="start over instead of resuming")
+    parser.add_argument("--keep-failed", action="store_true", help="do not retry failed cases on resume")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:  # optional dependency
+        pass
+    try:
+        return asyncio.run(_main(args))
+    except EvalError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        print("interrupted; run the same command again to resume", file=sys.stderr)
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Bulk Source Ingestion
+
+Submits many sitemaps to one agent with bounded concurrency, then follows
+indexing until every page is settled. Sitemaps the agent already has are
+skipped. Progress is read from page counts per crawl/index status (one
+``limit=1`` list_pages call per status, so a poll costs a handful of small
+requests however large the agent is).
+
+Both functions run as background jobs (see jobs.py) and keep their
+progress in ``job.progress``; polling is adaptive via ``poll_until``.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from jobs import Job, JobFailed, poll_until
+from pagination import gather_bounded
+
+FetchJSON = Callable[..., Awaitable[Dict[str, Any]]]
+
+# list_pages filters whose totals make up the progress report
+PAGE_COUNTS = {
+    "total": {},
+    "crawl_queued": {"crawl_status": "queued"},
+    "crawl_failed": {"crawl_status": "failed"},
+    "index_ok": {"index_status": "ok"},
+    "index_queued": {"index_status": "queued"},
+    "index_failed": {"index_status": "failed"},
+}
+
+
+async def page_counts(list_pages: FetchJSON, project_id: int) -> Dict[str, int]:
+    """Pages crawled/indexed/failed/pending for one agent."""
+    bodies = await asyncio.gather(*[list_pages(project_id, page=1, limit=1, **filters)
+                                    for filters in PAGE_COUNTS.values()])
+    raw = {name: int((((body.get("data") or {}).get("pages") or {}).get("total")) or 0)
+           for name, body in zip(PAGE_COUNTS, bodies)}
+    failed = raw["crawl_failed"] + raw["index_failed"]
+    return {
+        "total": raw["total"],
+        "crawled": raw["total"] - raw["crawl_queued"],
+        "indexed": raw["index_ok"],
+        "failed": failed,
+        "pending": max(0, raw["total"] - raw["index_ok"] - failed),
+    }
+
+
+def pages_added(pages: Dict[str, int], baseline: Dict[str, int]) -> Dict[str, Any]:
+    """Pages added since the job started, by state."""
+    added: Dict[str, Any] = {key: pages[key] - baseline[key] for key in ("total", "crawled", "indexed", "failed")}
+    added["pending"] = pages["pending"]
+    added["percent_indexed"] = round(100 * added["indexed"] / added["total"], 1) if added["total"] > 0 else 0.0
+    return added
+
+
+def existing_sitemaps(body: Dict[str, Any]) -> Dict[str, int]:
+    """sitemap_path -> source id from a list_sources body."""
+    sitemaps = (body.get("data") or {}).get("sitemaps") or []
+    return {(s.get("settings") or {}).get("sitemap_path"): s.get("id") for s in sitemaps
+            if (s.get("settings") or {}).get("sitemap_path")}
+
+
+async def _submit(project_id: int, item: Dict[str, Any], known: Dict[str, int],
+                  create_source: FetchJSON) -> None:
+    if item["sitemap_path"] in known:
+        item.update(status="skipped_existing", source_id=known[item["sitemap_path"]])
+        return
+    try:
+        body = await create_source(project_id, sitemap_path=item["sitemap_path"])
+        item.update(status="submitted", source_id=(body.get("data") or {}).get("id"))
+    except Exception as e:
+        item.update(status="failed", error=str(e))
+
+
+def _tally(submissions: List[Dict[str, Any]]) -> Dict[str, int]:
+    statuses: Dict[str, int] = {}
+    for item in submissions:
+        statuses[item["status"]] = statuses.get(item["status"], 0) + 1
+    return statuses
+
+
+async def run_ingest(job: Job, project_id: int, sitemaps: List[str], list_sources: FetchJSON,
+                     create_source: FetchJSON, list_pages: FetchJSON, max_concurrency: int = 4,
+                     poll_min: float = 5.0, poll_max: float = 60.0, max_wait: float = 3600.0,
+                     settle_after: float = 60.0,
+                     on_change: Optional[Callable[[Job], Awaitable[None]]] = None) -> Dict[str, Any]:
+    """Submit every sitemap, then poll page counts until indexing settles."""
+    submissions = [{"sitemap_path": path, "status": "pending"} for path in dict.fromkeys(sitemaps)]
+    job.progress.update(phase="submitting", submissions=submissions, pages={})
+
+    known = existing_sitemaps(await list_sources(project_id))
+    baseline = await page_counts(list_pages, project_id)
+    await gather_bounded([_submit(project_id, item, known, create_source) for item in submissions],
+                         max_concurrency)
+    job.progress["sitemaps"] = _tally(submissions)
+    if not any(item["status"] == "submitted" for item in submissions):
+        raise JobFailed("No sitemap could be submitted")
+
+    job.progress["phase"] = "indexing"
+    started = time.monotonic()
+    previous: List[Optional[Dict[str, int]]] = [None]
+
+    async def check():
+        pages = await page_counts(list_pages, project_id)
+        job.progress["pages"] = pages_added(pages, baseline)
+        changed = pages != previous[0]
+        previous[0] = pages
+        if changed and on_change is not None:
+            await on_change(job)
+        # Settled: nothing pending and no change since the last poll, once new pages
+        # have shown up (or settle_after passed, for sitemaps that add nothing)
+        grown = pages["total"] > baseline["total"]
+        settled = not changed and pages["pending"] == 0 and (
+            grown or time.monotonic() - started >= settle_after)
+        return settled, changed
+
+    if not await poll_until(check, poll_min, poll_max, max_wait, job):
+        job.state = "timed_out"
+    job.progress["phase"] = "done"
+    return {"sitemaps": job.progress["sitemaps"], "pages": job.progress["pages"]}
+
+
+def stats_counts(body: Dict[str, Any]) -> Dict[str, int]:
+    data = body.get("data") or {}
+    return {key: int(data.get(key) or 0) for key in ("pages_found", "pages_crawled", "pages_indexed")}
+
+
+async def wait_for_indexing(job: Job, project_id: int, get_stats: FetchJSON, poll_min: float = 5.0,
+                            poll_max: float = 60.0, max_wait: float = 3600.0,
+                            quiet_polls: int = 3) -> bool:
+    """Poll an agent's stats until its documents stop moving.
+
+    Done once two consecutive polls match and every found document is
+    indexed, or after ``quiet_polls`` unchanged polls (documents that fail
+    are never indexed). Returns False on timeout.
+    """
+    previous: List[Optional[Dict[str, int]]] = [None]
+    quiet = [0]
+
+    async def check():
+        counts = stats_counts(await get_stats(project_id))
+        job.progress["pages"] = counts
+        changed = counts != previous[0]
+        previous[0] = counts
+        quiet[0] = 0 if changed else quiet[0] + 1
+        indexed = counts["pages_found"] > 0 and counts["pages_indexed"] >= counts["pages_found"]
+        return quiet[0] >= 1 and (indexed or quiet[0] >= quiet_polls), changed
+
+    return await poll_until(check, poll_min, poll_max, max_wait, job)
@@ -0,0 +1,328 @@
+"""
+Background Jobs
+
+In-process runner for operations that finish long after the tool call that
+started them (bulk ingestion, agent replication, source syncs, page
+reindexing). A job gets an id at once; at most ``workers`` jobs run at a
+time and the rest wait in ``queued``. Job functions update ``job.progress``
+as they go, and an optional callback fires when a job reaches a final state
+(the server uses it to notify the MCP client).
+
+Jobs are scoped by API key fingerprint. With a database path configured,
+every state change is written to SQLite so finished jobs stay queryable
+after a restart. Each row records the process that owns it (host, pid and a
+per-boot id), so several workers can share one database: a process only
+marks queued or running rows as ``interrupted`` (their coroutines cannot be
+resumed) when they are its own leftovers or their owner is provably gone,
+i.e. a dead pid on the same host.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from transcripts import SQLiteStore
+
+FINAL_STATES = ("completed", "failed", "cancelled", "timed_out", "interrupted")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    tenant TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    owner TEXT,
+    params TEXT NOT NULL,
+    state TEXT NOT NULL,
+    progress TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_tenant ON jobs (tenant, created_at);
+"""
+
+# Identifies this process in the ``owner`` column: host/pid/boot
+OWNER = f"{socket.gethostname()}/{os.getpid()}/{uuid.uuid4().hex[:8]}"
+
+
+class JobFailed(Exception):
+    """Raised by a job function to finish its job as failed with a message."""
+
+
+def owner_dead(owner: Optional[str]) -> bool:
+    """True if the process that owns a row is provably gone. Rows from other hosts are never presumed dead."""
+    if not owner:
+        return True  # written before owners were recorded
+    try:
+        host, pid, _ = owner.rsplit("/", 2)
+        pid_number = int(pid)
+    except ValueError:
+        return False
+    if host != socket.gethostname():
+        return False
+    if pid_number == os.getpid():
+        return owner != OWNER  # an earlier process that had our pid (e.g. a restarted container)
+    try:
+        os.kill(pid_number, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False  # alive, owned by another user
+    return False
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp else None
+
+
+class Job:
+    """State of one background operation."""
+
+    def __init__(self, kind: str, tenant: str, params: Dict[str, Any], job_id: Optional[str] = None,
+                 owner: str = OWNER):
+        self.id = job_id or uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.tenant = tenant
+        self.owner = owner
+        self.params = params
+        self.state = "queued"
+        self.progress: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def done(self) -> bool:
+        return self.state in FINAL_STATES
+
+    @property
+    def local(self) -> bool:
+        """Whether this process runs the job (False for a stored copy of another worker's job)."""
+        return self.task is not None
+
+    def snapshot(self) -> Dict[str, Any]:
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "params": self.params,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "created_at": _iso(self.created_at),
+            "started_at": _iso(self.started_at),
+            "finished_at": _iso(self.finished_at),
+            "elapsed_seconds": round(end - (self.started_at or end), 1),
+        }
+
+    def row(self) -> Tuple[Any, ...]:
+        return (self.id, self.tenant, self.kind, self.owner, json.dumps(self.params, default=str), self.state,
+                json.dumps(self.progress, default=str), json.dumps(self.result, default=str), self.error,
+                self.created_at, self.started_at, self.finished_at)
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        job = cls(row["kind"], row["tenant"], json.loads(row["params"]), row["id"], row["owner"])
+        job.state = row["state"]
+        job.progress = json.loads(row["progress"])
+        job.result = json.loads(row["result"]) if row["result"] else None
+        job.error = row["error"]
+        job.created_at, job.started_at, job.finished_at = row["created_at"], row["started_at"], row["finished_at"]
+        return job
+
+
+class JobStore(SQLiteStore):
+    """SQLite record of every job, so results outlive the process."""
+
+    schema = SCHEMA
+
+    def _connect(self) -> sqlite3.Connection:
+        fresh = self._conn is None
+        conn = super()._connect()
+        if fresh and "owner" not in {col["name"] for col in conn.execute("PRAGMA table_info(jobs)")}:
+            conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")  # databases from before owners
+        return conn
+
+    async def save(self, job: Job) -> None:
+        row = job.row()
+        await self.run(lambda conn: conn.execute(
+            "INSERT OR REPLACE INTO jobs (id, tenant, kind, owner, params, state, progress, result, error,"
+            " created_at, started_at, finished_at) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", row))
+
+    async def load(self, tenant: str, job_id: str) -> Optional[Job]:
+        row = await self.run(lambda conn: conn.execute(
+            "SELECT * FROM jobs WHERE tenant = ? AND id = ?", (tenant, job_id)).fetchone())
+        return Job.from_row(row) if row else None
+
+    async def recent(self, tenant: str, limit: int) -> List[Job]:
+        rows = await self.run(lambda conn: conn.execute(
+            "SELECT * FROM jobs WHERE tenant = ? ORDER BY created_at DESC LIMIT ?", (tenant, limit)).fetchall())
+        return [Job.from_row(row) for row in rows]
+
+    async def interrupt_stale(self) -> int:
+        """Mark jobs left queued/running by processes that are gone as interrupted.
+
+        Rows owned by live processes, including other workers sharing the
+        database, are left alone.
+        """
+        def interrupt(conn: sqlite3.Connection) -> int:
+            owners = [row["owner"] for row in conn.execute(
+                "SELECT DISTINCT owner FROM jobs WHERE state IN ('queued', 'running')")]
+            dead = [owner for owner in owners if owner_dead(owner)]
+            if not dead:
+                return 0
+            named = [owner for owner in dead if owner]
+            marks = ",".join("?" * len(named))
+            where = " OR ".join(([f"owner IN ({marks})"] if named else [])
+                                + (["owner IS NULL"] if len(named) < len(dead) else []))
+            return conn.execute(
+                "UPDATE jobs SET state = 'interrupted', finished_at = ?"
+                f" WHERE state IN ('queued', 'running') AND ({where})", [time.time(), *named]).rowcount
+        return await self.run(interrupt)
+
+
+class JobManager:
+    """Bounded worker pool over asyncio tasks, with optional persistence."""
+
+    def __init__(self, workers: int = 4, store: Optional[JobStore] = None, keep_finished: int = 500):
+        self.workers = workers
+        self.store = store
+        self.keep_finished = keep_finished
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._recovered = store is None
+        self.counts: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "JobManager":
+        """Read JOB_WORKERS, JOB_KEEP_FINISHED and JOBS_DB_PATH (unset: memory only)."""
+        path = os.getenv("JOBS_DB_PATH")
+        return cls(workers=int(os.getenv("JOB_WORKERS", "4")), store=JobStore(path) if path else None,
+                   keep_finished=int(os.getenv("JOB_KEEP_FINISHED", "500")))
+
+    def submit(self, kind: str, tenant: str, params: Dict[str, Any], fn: Callable[[Job], Awaitable[Any]],
+               on_finish: Optional[Callable[[Job], Awaitable[None]]] = None) -> Job:
+        """Queue ``fn(job)``; returns the job immediately. Must be called from the event loop."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(1, self.workers))
+        job = Job(kind, tenant, params)
+        self._jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job, fn, on_finish))
+        return job
+
+    async def _run(self, job: Job, fn: Callable[[Job], Awaitable[Any]],
+                   on_finish: Optional[Callable[[Job], Awaitable[None]]]) -> None:
+        try:
+            await self._save(job)
+            async with self._slots:
+                job.state = "running"
+                job.started_at = time.time()
+                await self._save(job)
+                job.result = await fn(job)
+                if job.state == "running":
+                    job.state = "completed"
+        except asyncio.CancelledError:
+            job.state = "cancelled"
+        except JobFailed as e:
+            job.state, job.error = "failed", str(e)
+        except Exception as e:
+            job.state, job.error = "failed", f"{type(e).__name__}: {e}"
+        finally:
+            job.finished_at = time.time()
+            self.counts[job.state] = self.counts.get(job.state, 0) + 1
+            await self._save(job)
+            self._prune()
+            if on_finish is not None:
+                await on_finish(job)
+
+    async def _save(self, job: Job) -> None:
+        if self.store is None:
+            return
+        if not self._recovered:
+            self._recovered = True
+            await self.store.interrupt_stale()
+        await self.store.save(job)
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    async def get(self, tenant: str, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job if job.tenant == tenant else None
+        if self.store is None:
+            return None
+        if not self._recovered:
+            self._recovered = True
+            await self.store.interrupt_stale()
+        return await self.store.load(tenant, job_id)
+
+    async def list(self, tenant: str, state: Optional[str] = None, kind: Optional[str] = None,
+                   limit: int = 50) -> List[Job]:
+        """Newest first; live jobs take precedence over their stored copies."""
+        jobs = {job.id: job for job in self._jobs.values() if job.tenant == tenant}
+        if self.store is not None:
+            for job in await self.store.recent(tenant, limit + len(jobs)):
+                jobs.setdefault(job.id, job)
+        selected = [job for job in jobs.values()
+                    if (state is None or job.state == state) and (kind is None or job.kind == kind)]
+        return sorted(selected, key=lambda job: job.created_at, reverse=True)[:limit]
+
+    async def cancel(self, job: Job) -> None:
+        if job.task is not None and not job.task.done():
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Cancel running jobs (recording them as cancelled) and close the store."""
+        for job in list(self._jobs.values()):
+            await self.cancel(job)
+        if self.store is not None:
+            self.store.close()
+
+    def stats(self) -> Dict[str, Any]:
+        live: Dict[str, int] = {}
+        for job in self._jobs.values():
+            live[job.state] = live.get(job.state, 0) + 1
+        return {"workers": self.workers, "jobs": live, "finished_total": self.counts,
+                "persistent": self.store is not None}
+
+
+async def poll_until(check: Callable[[], Awaitable[Tuple[bool, bool]]], poll_min: float, poll_max: float,
+                     max_wait: float, job: Optional[Job] = None) -> bool:
+    """Call ``check()`` -> ``(done, changed)`` at an adaptive interval until done.
+
+    The interval grows by half while nothing changes and drops back to
+    ``poll_min`` when something does. Returns False if ``max_wait`` passed.
+    """
+    interval = poll_min
+    deadline = time.monotonic() + max_wait
+    while True:
+        if job is not None:
+            job.progress["next_poll_in_seconds"] = round(interval, 1)
+        await asyncio.sleep(interval)
+        done, changed = await check()
+        if job is not None:
+            job.progress["polls"] = job.progress.get("polls", 0) + 1
+        if done:
+            if job is not None:
+                job.progress.pop("next_poll_in_seconds", None)
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        interval = poll_min if changed else min(poll_max, interval * 1.5)
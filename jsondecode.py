@@ -0,0 +1,259 @@
+"""
+JSON Decoding
+
+Decoding helpers for CustomGPT response bodies:
+
+- ``loads`` parses straight from the response bytes (orjson when it is
+  installed, otherwise the stdlib decoder, which also accepts bytes), so
+  no intermediate ``str`` copy of the body is made;
+- ``select`` / ``extract`` pull a few values out of a body by path, e.g.
+  ``data.data[*].id``. Paths are compiled once and cached;
+- ``iter_array`` parses a large array out of a body *as it arrives*,
+  yielding one item at a time, so a multi-megabyte page never has to be
+  buffered or held as one object tree.
+"""
+
+import codecs
+import json
+import re
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+WILDCARD = object()
+_MISSING = object()
+_TOKEN = re.compile(r"([^.\[\]]+)|\[(\*|-?\d+)\]")
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DELIMITERS = frozenset(",]} \t\n\r")
+_decoder = json.JSONDecoder()
+_scanstring = json.decoder.scanstring
+
+Step = Union[str, int, object]
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Parse JSON from bytes without decoding them to ``str`` first."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # orjson is stricter (NaN, integers beyond 64 bits); let json decide
+    if isinstance(data, memoryview):
+        data = bytes(data)
+    return json.loads(data)
+
+
+@lru_cache(maxsize=256)
+def compile_path(path: str) -> Tuple[Step, ...]:
+    """``"data.data[*].id"`` -> ``("data", "data", WILDCARD, "id")``."""
+    steps: List[Step] = []
+    position = 0
+    for match in _TOKEN.finditer(path):
+        between = path[position:match.start()]
+        if between not in ("", "."):
+            raise ValueError(f"Invalid path {path!r} at {between!r}")
+        key, index = match.groups()
+        if key is not None:
+            steps.append(key)
+        else:
+            steps.append(WILDCARD if index == "*" else int(index))
+        position = match.end()
+    if not steps or path[position:]:
+        raise ValueError(f"Invalid path {path!r}")
+    return tuple(steps)
+
+
+def _walk(node: Any, steps: Sequence[Step]) -> Any:
+    for depth, step in enumerate(steps):
+        if step is WILDCARD:
+            if not isinstance(node, list):
+                return _MISSING
+            rest = steps[depth + 1:]
+            return [value for value in (_walk(item, rest) for item in node) if value is not _MISSING]
+        if isinstance(step, int):
+            if not isinstance(node, list) or not -len(node) <= step < len(node):
+                return _MISSING
+            node = node[step]
+        else:
+            if not isinstance(node, dict) or step not in node:
+                return _MISSING
+            node = node[step]
+    return node
+
+
+def extract(body: Any, path: str, default: Any = None) -> Any:
+    """Value at ``path``; ``[*]`` collects a list (items lacking the rest of the path are skipped)."""
+    value = _walk(body, compile_path(path))
+    return default if value is _MISSING else value
+
+
+def select(body: Any, paths: Iterable[str]) -> Dict[str, Any]:
+    """``{path: value}`` for each path (None where a path is absent)."""
+    return {path: extract(body, path) for path in paths}
+
+
+class _NeedMore(Exception):
+    """The buffer ends before the next complete token."""
+
+
+class _ArrayScanner:
+    """Incremental scanner that walks object keys down to one array and yields its items.
+
+    States: ``open`` (expect ``{``), ``key`` (look for the next wanted key
+    in the current object), ``array`` (expect ``[``), ``item`` (next array
+    element) and ``done``. Each step either completes or rewinds to where
+    it started, so a chunk may end anywhere.
+    """
+
+    def __init__(self, keys: Sequence[str]):
+        self.keys = list(keys)
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+        self.depth = 0  # keys entered so far
+        self.state = "open"
+        self.first = True
+        self.retry_at = 0  # unparsed characters needed before the next attempt
+
+    @property
+    def done(self) -> bool:
+        return self.state == "done"
+
+    def feed(self, text: str, eof: bool = False) -> None:
+        # Drop what has been consumed so the buffer stays about one item long
+        self.buffer = self.buffer[self.position:] + text
+        self.position = 0
+        self.eof = eof
+
+    def _skip_ws(self) -> str:
+        self.position = _WHITESPACE.match(self.buffer, self.position).end()
+        if self.position >= len(self.buffer):
+            raise _NeedMore
+        return self.buffer[self.position]
+
+    def _value(self) -> Any:
+        self._skip_ws()
+        try:
+            value, end = _decoder.raw_decode(self.buffer, self.position)
+        except json.JSONDecodeError:
+            if self.eof:
+                raise
+            raise _NeedMore from None
+        if not self.eof and not isinstance(value, (dict, list, str)) and (
+                end >= len(self.buffer) or self.buffer[end] not in _DELIMITERS):
+            raise _NeedMore  # a number may continue in the next chunk ("-5." + "5e3")
+        self.position = end
+        return value
+
+    def _expect(self, char: str) -> None:
+        if self._skip_ws() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.position}")
+        self.position += 1
+
+    def _key(self) -> Optional[bool]:
+        """One member of the current object: True if it is the wanted key (its value is next),
+        False at the end of the object, None after skipping a sibling member."""
+        char = self._skip_ws()
+        if char == "}":
+            return False
+        if char == ",":
+            self.position += 1
+            char = self._skip_ws()
+        if char != '"':
+            raise ValueError(f"Expected a key at offset {self.position}")
+        try:
+            key, self.position = _scanstring(self.buffer, self.position + 1)
+        except json.JSONDecodeError:
+            raise _NeedMore from None
+        self._expect(":")
+        if key == self.keys[self.depth]:
+            return True
+        self._value()
+        return None
+
+    def _step(self) -> Any:
+        """Advance one step; returns an array item or _MISSING."""
+        if self.state == "open":
+            if self._skip_ws() != "{":
+                self.state = "done"  # the path runs through something other than an object
+                return _MISSING
+            self.position += 1
+            self.state = "key"
+        elif self.state == "key":
+            found = self._key()
+            if found is False:
+                self.state = "done"
+            elif found:
+                self.depth += 1
+                self.state = "open" if self.depth < len(self.keys) else "array"
+        elif self.state == "array":
+            if self._skip_ws() != "[":
+                self.state = "done"  # the path holds something other than an array
+            else:
+                self.position += 1
+                self.state = "item"
+        else:
+            char = self._skip_ws()
+            if char == "]":
+                self.state = "done"
+                return _MISSING
+            if not self.first:
+                if char != ",":
+                    raise ValueError(f"Expected ',' at offset {self.position}")
+                self.position += 1
+            item = self._value()
+            self.first = False
+            return item
+        return _MISSING
+
+    def items(self) -> List[Any]:
+        """Every item that can be parsed from the buffer so far."""
+        found: List[Any] = []
+        if not self.eof and len(self.buffer) - self.position < self.retry_at:
+            return found
+        while self.state != "done":
+            start = self.position
+            try:
+                item = self._step()
+            except _NeedMore as e:
+                self.position = start
+                if self.eof:
+                    raise ValueError("JSON body ended before the array did") from e
+                # Retry once the pending value has had room to double, so a value
+                # spanning many chunks is parsed O(log n) times rather than per chunk
+                self.retry_at = 2 * (len(self.buffer) - start)
+                break
+            self.retry_at = 0
+            if item is not _MISSING:
+                found.append(item)
+        return found
+
+
+async def iter_array(chunks: AsyncIterator[bytes], path: str) -> AsyncIterator[Any]:
+    """Yield the items of the array at ``path`` (object keys only, e.g. ``data.pages.data``)
+    while the body is still arriving. Yields nothing if the path is absent."""
+    steps = compile_path(path)
+    if not all(isinstance(step, str) for step in steps):
+        raise ValueError("iter_array paths may only contain object keys")
+    scanner = _ArrayScanner([str(step) for step in steps])
+    text = codecs.getincrementaldecoder("utf-8")()
+    async for chunk in chunks:
+        scanner.feed(text.decode(chunk))
+        for item in scanner.items():
+            yield item
+        if scanner.done:
+            return
+    scanner.feed(text.decode(b"", final=True), eof=True)
+    for item in scanner.items():
+        yield item
+
+
+async def iter_bytes(data: bytes, chunk_size: int = 65536) -> AsyncIterator[bytes]:
+    """Async chunks of an in-memory body, for feeding ``iter_array``."""
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
@@ -0,0 +1,270 @@
+"""
+Server Metrics
+
+Dependency-free Prometheus instrumentation: counters, gauges and
+histograms with labels, rendered in the Prometheus text exposition format
+for /metrics and summarised as JSON for the get_server_metrics tool.
+
+Metrics are kept per process: with several uvicorn workers each scrape of
+/metrics reflects whichever worker answered it.
+"""
+
+import bisect
+import contextvars
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastmcp.server.middleware import Middleware
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}"
+                for key, value in self.values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        self.values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        self.series: Dict[LabelValues, List[float]] = {}  # bucket counts..., +Inf, sum
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [0.0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, series in self.series.items():
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.label_names, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+    def summary(self, key: LabelValues) -> Dict[str, Any]:
+        """Count, mean and bucket-interpolated p50/p95/p99 for one label set."""
+        series = self.series[key]
+        count = sum(series[:-1])
+        result = {"count": int(count), "mean": series[-1] / count if count else 0.0}
+        for q in (0.5, 0.95, 0.99):
+            result[f"p{int(q * 100)}"] = self._quantile(series, count, q)
+        return result
+
+    def _quantile(self, series: List[float], count: float, q: float) -> float:
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0.0
+        lower = 0.0
+        for bound, n in zip(self.buckets, series):
+            if seen + n >= rank and n:
+                return lower + (bound - lower) * (rank - seen) / n
+            seen += n
+            lower = bound
+        return self.buckets[-1]
+
+
+class Registry:
+    """Holds metrics plus callbacks that contribute samples at scrape time."""
+
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+        self.collectors: List[Callable[[], Iterable[Tuple[str, str, str, float]]]] = []
+
+    def register(self, metric: _Metric) -> Any:
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, float]]]) -> None:
+        """Register a callback yielding ``(name, type, help, value)`` samples."""
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            for name, kind, documentation, value in collector():
+                lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} {kind}",
+                              f"{name} {value}"])
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+TOOL_CALLS = REGISTRY.register(Counter(
+    "mcp_tool_calls_total", "MCP tool calls by outcome.", ("tool", "outcome")))
+TOOL_ERRORS = REGISTRY.register(Counter(
+    "mcp_tool_errors_total", "Failed MCP tool calls by error class.", ("tool", "error_class")))
+TOOL_LATENCY = REGISTRY.register(Histogram(
+    "mcp_tool_duration_seconds", "MCP tool call latency.", ("tool",)))
+TOOL_PAYLOAD = REGISTRY.register(Histogram(
+    "mcp_tool_response_bytes", "Size of tool results sent to the client.", ("tool",), SIZE_BUCKETS))
+TOOLS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "mcp_tools_in_flight", "MCP tool calls currently executing.", ("tool",)))
+UPSTREAM_LATENCY = REGISTRY.register(Histogram(
+    "customgpt_request_duration_seconds", "CustomGPT API request latency per attempt.",
+    ("method", "endpoint", "status")))
+UPSTREAM_ERRORS = REGISTRY.register(Counter(
+    "customgpt_request_errors_total", "Failed CustomGPT requests by error class.",
+    ("method", "endpoint", "error_class")))
+UPSTREAM_IN_FLIGHT = REGISTRY.register(Gauge(
+    "customgpt_requests_in_flight", "CustomGPT requests currently awaiting a response."))
+
+# Per-tool-call scratch space so the transport can report why a tool failed
+_tool_scope: "contextvars.ContextVar[Optional[Dict[str, str]]]" = contextvars.ContextVar(
+    "tool_scope", default=None)
+
+
+def error_class(exc: BaseException) -> str:
+    """Coarse, low-cardinality classification of an upstream failure."""
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        if status == 429:
+            return "rate_limited"
+        return "http_5xx" if status >= 500 else "http_4xx"
+    name = type(exc).__name__
+    if name == "CircuitOpenError":
+        return "circuit_open"
+    if name == "QuotaExhausted":
+        return "quota_exhausted"
+    if "Timeout" in name:
+        return "timeout"
+    if "Connect" in name or isinstance(exc, ConnectionError):
+        return "connection"
+    return name
+
+
+def record_upstream_error(method: str, endpoint: str, exc: BaseException) -> None:
+    klass = error_class(exc)
+    UPSTREAM_ERRORS.inc(method=method, endpoint=endpoint, error_class=klass)
+    scope = _tool_scope.get()
+    if scope is not None:
+        scope["error_class"] = klass
+
+
+def _result_bytes(result: Any) -> int:
+    return sum(len(getattr(block, "text", "") or "") for block in getattr(result, "content", None) or [])
+
+
+class MetricsMiddleware(Middleware):
+    """Times every tool call and records outcome, error class and payload size."""
+
+    async def on_call_tool(self, context, call_next):
+        tool = context.message.name
+        scope: Dict[str, str] = {}
+        token = _tool_scope.set(scope)
+        TOOLS_IN_FLIGHT.inc(tool=tool)
+        started = time.perf_counter()
+        try:
+            result = await call_next(context)
+        except Exception as exc:
+            TOOL_CALLS.inc(tool=tool, outcome="exception")
+            TOOL_ERRORS.inc(tool=tool, error_class=scope.get("error_class", type(exc).__name__))
+            raise
+        finally:
+            TOOL_LATENCY.observe(time.perf_counter() - started, tool=tool)
+            TOOLS_IN_FLIGHT.dec(tool=tool)
+            _tool_scope.reset(token)
+
+        data = getattr(result, "structured_content", None)
+        if isinstance(data, dict) and (data.get("success") is False or data.get("valid") is False):
+            TOOL_CALLS.inc(tool=tool, outcome="failure")
+            TOOL_ERRORS.inc(tool=tool, error_class=scope.get("error_class", "tool_error"))
+        else:
+            TOOL_CALLS.inc(tool=tool, outcome="success")
+        TOOL_PAYLOAD.observe(_result_bytes(result), tool=tool)
+        return result
+
+
+def summary() -> Dict[str, Any]:
+    """JSON-friendly view of the tool and upstream metrics."""
+    tools: Dict[str, Dict[str, Any]] = {}
+    for (tool,), _ in TOOL_LATENCY.series.items():
+        stats = TOOL_LATENCY.summary((tool,))
+        tools[tool] = {
+            "calls": stats["count"],
+            "failures": int(sum(v for (t, outcome), v in TOOL_CALLS.values.items()
+                                if t == tool and outcome != "success")),
+            "mean_ms": round(stats["mean"] * 1000, 1),
+            "p50_ms": round(stats["p50"] * 1000, 1),
+            "p95_ms": round(stats["p95"] * 1000, 1),
+            "p99_ms": round(stats["p99"] * 1000, 1),
+            "in_flight": int(TOOLS_IN_FLIGHT.values.get((tool,), 0)),
+        }
+    upstream: Dict[str, Dict[str, Any]] = {}
+    for key in UPSTREAM_LATENCY.series:
+        method, endpoint, status = key
+        stats = UPSTREAM_LATENCY.summary(key)
+        upstream[f"{method} {endpoint} {status}"] = {
+            "requests": stats["count"],
+            "mean_ms": round(stats["mean"] * 1000, 1),
+            "p95_ms": round(stats["p95"] * 1000, 1),
+        }
+    errors = {f"{m} {e} {c}": int(v) for (m, e, c), v in UPSTREAM_ERRORS.values.items()}
+    return {"tools": tools, "upstream": upstream, "upstream_errors": errors,
+            "upstream_in_flight": int(UPSTREAM_IN_FLIGHT.values.get((), 0))}
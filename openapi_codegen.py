@@ -0,0 +1,197 @@
+"""
+OpenAPI model generator.
+
+Reads docs/openapi.json and writes api_models.py: one pydantic model per
+request body of every CustomGPT operation, plus a named ``Literal`` alias
+per enumerated field (e.g. ``ChatbotModel``) for the tool signatures to
+share, so clients see the allowed values. pydantic compiles each model's
+validator once, at import, so a tool validates and serialises its
+arguments in a single pass instead of copying them field by field. Keys
+the spec does not list are rejected.
+
+    python openapi_codegen.py          # regenerate api_models.py
+    python openapi_codegen.py --check  # exit 1 if api_models.py is stale
+
+Model names are derived from the method and the literal path segments,
+e.g. ``POST /api/v1/projects/{projectId}/settings`` -> PostProjectsSettingsBody.
+"""
+
+import argparse
+import json
+import keyword
+import re
+import sys
+import textwrap
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent
+SPEC_PATH = ROOT / "docs" / "openapi.json"
+OUTPUT_PATH = ROOT / "api_models.py"
+
+METHODS = ("get", "post", "put", "patch", "delete")
+
+# Attribute names a generated field must not shadow on APIModel/BaseModel
+RESERVED = {"payload", "copy", "dict", "json", "schema", "validate", "construct", "fields"}
+
+LINE_LENGTH = 100
+
+HEADER = '''"""
+CustomGPT API request models.
+
+Generated by openapi_codegen.py from docs/openapi.json - do not edit by
+hand; run ``python openapi_codegen.py`` after updating the spec.
+"""
+
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class APIModel(BaseModel):
+    """Base of the generated models. Fields the spec does not list are rejected."""
+
+    model_config = ConfigDict(extra="forbid", populate_by_name=True)
+
+    def payload(self) -> Dict[str, Any]:
+        """Wire-format dict of the fields that are set (None means unset)."""
+        return self.model_dump(by_alias=True, exclude_none=True)
+'''
+
+
+class Generator:
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self.aliases: Dict[str, str] = {}  # alias name -> Literal[...]
+
+    def alias(self, field: str, model: str, literal: str) -> str:
+        """Name an enum after its field; fields sharing a name but not values get the model's prefix."""
+        name = "".join(word.capitalize() for word in re.split(r"\W|_", field) if word)
+        if self.aliases.get(name, literal) != literal:
+            name = model + name
+        self.aliases[name] = literal
+        return name
+
+    def resolve(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        while "$ref" in schema:
+            node: Any = self.spec
+            for part in schema["$ref"].lstrip("#/").split("/"):
+                node = node[part]
+            schema = node
+        return schema
+
+    def annotation(self, schema: Dict[str, Any], field: str, model: str) -> str:
+        schema = self.resolve(schema)
+        enum = schema.get("enum")
+        if enum:
+            # Some enums in the spec are wrapped in an extra list
+            values = enum[0] if len(enum) == 1 and isinstance(enum[0], list) else enum
+            return self.alias(field, model, f"Literal[{', '.join(repr(v) for v in values)}]")
+        kind = schema.get("type")
+        if kind == "string":
+            return "Any" if schema.get("format") == "binary" else "str"
+        if kind == "integer":
+            return "int"
+        if kind == "number":
+            return "float"
+        if kind == "boolean":
+            return "bool"
+        if kind == "array":
+            return f"List[{self.annotation(schema.get('items') or {}, field, model)}]"
+        return "Dict[str, Any]" if kind == "object" else "Any"
+
+    @staticmethod
+    def attribute(name: str) -> str:
+        attr = re.sub(r"\W", "_", name).strip("_") or "field"
+        if keyword.iskeyword(attr) or attr.startswith("model_") or attr in RESERVED:
+            attr += "_"
+        return attr
+
+    def model(self, name: str, doc: str, fields: List[Tuple[str, Dict[str, Any], bool]]) -> str:
+        lines = [f"class {name}(APIModel):", f'    """{doc}"""', ""]
+        prefix = name[:-len("Body")]
+        for wire, schema, required in fields:
+            attr = self.attribute(wire)
+            annotation = self.annotation(schema, wire, prefix)
+            alias = f', alias="{wire}"' if attr != wire else ""
+            if required:
+                line = f"    {attr}: {annotation}" + (f" = Field(...{alias})" if alias else "")
+            elif alias:
+                line = f"    {attr}: Optional[{annotation}] = Field(None{alias})"
+            else:
+                line = f"    {attr}: Optional[{annotation}] = None"
+            lines.append(line)
+        return "\n".join(lines)
+
+    @staticmethod
+    def wrap(line: str) -> str:
+        """Break an over-long Literal[...] alias across lines."""
+        start = line.find("Literal[")
+        if len(line) <= LINE_LENGTH or start < 0:
+            return line
+        end = line.index("]", start)
+        values = textwrap.fill(line[start + 8:end], LINE_LENGTH - 4, initial_indent=" " * 4,
+                               subsequent_indent=" " * 4, break_on_hyphens=False)
+        return f"{line[:start + 8]}\n{values}\n{line[end:]}"
+
+    @staticmethod
+    def base_name(method: str, path: str) -> str:
+        segments = [s for s in path.split("/") if s and not s.startswith("{") and s not in ("api", "v1")]
+        words = [w for s in segments for w in re.split(r"[-_]", s)]
+        suffix = "ById" if path.rstrip("/").endswith("}") else ""
+        return method.capitalize() + "".join(w.capitalize() for w in words) + suffix
+
+    def operations(self):
+        for path, item in self.spec["paths"].items():
+            for method in METHODS:
+                if method in item:
+                    yield method, path, item[method]
+
+    def render(self) -> str:
+        blocks = []
+        names = set()
+        for method, path, op in self.operations():
+            name = self.base_name(method, path)
+            if name in names:
+                raise ValueError(f"Two operations map to {name}; extend Generator.base_name")
+            names.add(name)
+            summary = (op.get("summary") or f"{method.upper()} {path}").strip()
+            content = (op.get("requestBody") or {}).get("content") or {}
+            if content:
+                content_type, media = next(iter(content.items()))
+                schema = self.resolve(media.get("schema") or {})
+                required = set(schema.get("required") or [])
+                fields = [(field, prop, field in required)
+                          for field, prop in (schema.get("properties") or {}).items()]
+                blocks.append(self.model(f"{name}Body", f"{content_type} body of: {summary}", fields))
+        aliases = "\n".join(self.wrap(f"{name} = {literal}") for name, literal in self.aliases.items())
+        enums = "# Enumerated values of the spec, shared with the tool signatures\n" + aliases
+        return "\n\n\n".join([HEADER.rstrip("\n"), enums, *blocks]) + "\n"
+
+
+def generate(spec_path: Path = SPEC_PATH) -> str:
+    return Generator(json.loads(spec_path.read_text())).render()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--check", action="store_true", help="fail if the generated file is out of date")
+    parser.add_argument("--spec", type=Path, default=SPEC_PATH)
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH)
+    args = parser.parse_args(argv)
+
+    source = generate(args.spec)
+    if args.check:
+        current = args.output.read_text() if args.output.exists() else ""
+        if current != source:
+            print(f"{args.output.name} is out of date; run python openapi_codegen.py", file=sys.stderr)
+            return 1
+        print(f"{args.output.name} is up to date")
+        return 0
+    args.output.write_text(source)
+    print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Auto-Pagination
+
+Reads the Laravel-style paginator (current_page / last_page / per_page /
+total) from the first page of a CustomGPT list endpoint, then fetches the
+remaining pages concurrently with a bounded fan-out and merges them into a
+single payload. Later pages only contribute their items, so when the
+caller keeps just a few ``fields`` of each item it can pass a
+``fetch_items`` that streams a page's item array and projects each item as
+it is parsed, instead of holding the whole decoded body.
+"""
+
+import asyncio
+import copy
+import math
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+FetchPage = Callable[[int], Awaitable[Dict[str, Any]]]
+FetchItems = Callable[[int], Awaitable[List[Any]]]
+
+# Paginator keys that only make sense for a single page
+PAGE_ONLY_KEYS = ("first_page_url", "last_page_url", "next_page_url", "prev_page_url",
+                  "path", "from", "to", "current_page", "links")
+
+
+def dig(payload: Any, path: Sequence[str]) -> Any:
+    """Follow a key path into nested dicts, returning None if it is missing."""
+    for key in path:
+        if not isinstance(payload, dict):
+            return None
+        payload = payload.get(key)
+    return payload
+
+
+def project_fields(items: List[Any], fields: Optional[Sequence[str]]) -> List[Any]:
+    """Keep only the requested top-level keys of each item."""
+    if not fields:
+        return items
+    return [{k: item[k] for k in fields if k in item} if isinstance(item, dict) else item
+            for item in items]
+
+
+async def gather_bounded(coros: Sequence[Awaitable[Any]], max_concurrency: int) -> List[Any]:
+    """Run awaitables with at most max_concurrency in flight, keeping input order.
+
+    The first failure cancels everything still pending and is re-raised.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(coro: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await coro
+
+    tasks = [asyncio.ensure_future(run(coro)) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def fetch_all_pages(
+    fetch_page: FetchPage,
+    pager_path: Sequence[str] = ("data",),
+    max_concurrency: int = 8,
+    max_items: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+    fetch_items: Optional[FetchItems] = None,
+) -> Dict[str, Any]:
+    """Fetch every page of a paginated endpoint and merge the item lists.
+
+    ``pager_path`` locates the paginator inside the response body, e.g.
+    ``("data", "pages")`` for the pages endpoint. The returned body keeps the
+    first response's envelope (so siblings such as ``conversation`` survive)
+    with the paginator replaced by the merged items. When ``fields`` is set
+    and ``fetch_items(page)`` is given, it is used for the pages after the
+    first and must return that page's (projected) item list. Without a
+    projection the full items are kept anyway, and decoding whole bodies is
+    cheaper than streaming them.
+    """
+    first = await fetch_page(1)
+    pager = dig(first, pager_path)
+    if not isinstance(pager, dict):
+        raise ValueError(f"No paginator found at {'.'.join(pager_path)}")
+
+    items = list(pager.get("data") or [])
+    per_page = pager.get("per_page") or len(items) or 1
+    last_page = int(pager.get("last_page") or 1)
+    if max_items is not None:
+        last_page = min(last_page, max(1, math.ceil(max_items / per_page)))
+
+    if fetch_items is not None and fields:
+        rest = await gather_bounded([fetch_items(page) for page in range(2, last_page + 1)],
+                                    max_concurrency)
+        for page_items in rest:
+            items.extend(page_items)
+    else:
+        rest = await gather_bounded([fetch_page(page) for page in range(2, last_page + 1)],
+                                    max_concurrency)
+        for body in rest:
+            items.extend((dig(body, pager_path) or {}).get("data") or [])
+
+    truncated = max_items is not None and len(items) > max_items
+    if truncated:
+        items = items[:max_items]
+
+    merged = {k: v for k, v in pager.items() if k not in PAGE_ONLY_KEYS}
+    merged["data"] = project_fields(items, fields)
+    merged["pages_fetched"] = 1 + len(rest)
+    merged["truncated"] = truncated or (pager.get("total") or 0) > len(items)
+
+    body = copy.copy(first)
+    parent = body
+    for key in pager_path[:-1]:
+        parent[key] = copy.copy(parent[key])
+        parent = parent[key]
+    parent[pager_path[-1]] = merged
+    return body
@@ -0,0 +1,215 @@
+"""
+Portfolio Analytics
+
+Rolls the per-agent report endpoints (traffic, queries, conversations,
+analysis and, optionally, the first page of customer intelligence) up into
+one compact summary for many agents, so a cross-agent dashboard is one tool
+call instead of hundreds.
+
+Each agent's reports are normalised into one row of numeric metrics; the
+rows are then laid out as columns (one array per metric, aligned on agent
+index) and every rollup - totals, percentiles, top agents, time-bucketed
+series - is computed over whole columns at once. NumPy is used when it is
+installed (pip install numpy); otherwise the same rollups run in pure
+Python and give the same numbers. Free-text fields from the intelligence
+report (queries, intents, emotions) are counted with ``Counter``.
+"""
+
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+# Query-string filters each report endpoint needs to return its metrics
+REPORT_FILTERS: Dict[str, List[str]] = {
+    "traffic": ["sources"],
+    "queries": ["total", "query_status"],
+    "conversations": ["total", "average_queries_per_conversation"],
+    "analysis": ["queries", "conversations", "queries_per_conversation"],
+}
+
+# Intelligence fields whose values are tallied across the portfolio
+INTELLIGENCE_FIELDS = ("user_intent", "user_emotion", "language", "feedback", "content_source")
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _data(body: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    data = (body or {}).get("data")
+    return data if isinstance(data, dict) else {}
+
+
+def normalize_query(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def report_row(reports: Dict[str, Dict[str, Any]]) -> Dict[str, float]:
+    """Flatten one agent's traffic/queries/conversations bodies into named metrics."""
+    row: Dict[str, float] = {}
+    conversations = _data(reports.get("conversations"))
+    queries = _data(reports.get("queries"))
+    row["conversations"] = _number(conversations.get("total"))
+    row["queries"] = _number(queries.get("total"))
+    row["avg_queries_per_conversation"] = _number(conversations.get("average_queries_per_conversation"))
+    for item in queries.get("query_status") or []:
+        key = f"queries_{item.get('status') or 'unknown'}"
+        row[key] = row.get(key, 0.0) + _number(item.get("count"))
+    for item in _data(reports.get("traffic")).get("sources") or []:
+        key = f"traffic_{item.get('request_source') or 'unknown'}"
+        row[key] = row.get(key, 0.0) + _number(item.get("request_source_number"))
+    return row
+
+
+def report_series(body: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """metric -> {bucket label -> value} from an analysis report body."""
+    series: Dict[str, Dict[str, float]] = {}
+    for metric, points in _data(body).items():
+        if not isinstance(points, list):
+            continue
+        buckets = series.setdefault(metric, {})
+        for point in points:
+            label = str(point.get("created_at_interval"))
+            buckets[label] = buckets.get(label, 0.0) + _number(point.get("queries_number"))
+    return series
+
+
+# --- column kernels (NumPy when available, pure Python otherwise) ---
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Linear interpolation between closest ranks (NumPy's default method)."""
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def column_stats(values: Sequence[float], percentiles: Sequence[float]) -> Dict[str, float]:
+    if not len(values):
+        return {}
+    if np is not None:
+        column = np.asarray(values, dtype=np.float64)
+        points = np.percentile(column, percentiles)
+        stats = {"sum": float(column.sum()), "mean": float(column.mean()), "min": float(column.min()),
+                 "max": float(column.max()), "nonzero": int(np.count_nonzero(column))}
+    else:
+        ordered = sorted(values)
+        points = [_percentile(ordered, q) for q in percentiles]
+        total = float(sum(ordered))
+        stats = {"sum": total, "mean": total / len(ordered), "min": float(ordered[0]),
+                 "max": float(ordered[-1]), "nonzero": sum(1 for value in ordered if value)}
+    stats.update({f"p{q:g}": float(point) for q, point in zip(percentiles, points)})
+    return {key: round(value, 3) if isinstance(value, float) else value for key, value in stats.items()}
+
+
+def top_indices(values: Sequence[float], n: int) -> List[int]:
+    """Indices of the ``n`` largest values, largest first."""
+    n = min(n, len(values))
+    if n <= 0:
+        return []
+    if np is not None:
+        column = np.asarray(values, dtype=np.float64)
+        head = np.argpartition(-column, n - 1)[:n]
+        return [int(i) for i in head[np.argsort(-column[head], kind="stable")]]
+    return sorted(range(len(values)), key=lambda i: -values[i])[:n]
+
+
+def column_sums(matrix: List[List[float]]) -> List[float]:
+    """Sum of each column of a rows x buckets matrix."""
+    if not matrix:
+        return []
+    if np is not None:
+        return np.asarray(matrix, dtype=np.float64).sum(axis=0).tolist()
+    return [float(sum(column)) for column in zip(*matrix)]
+
+
+class Portfolio:
+    """Columnar accumulation of many agents' reports."""
+
+    def __init__(self):
+        self.project_ids: List[int] = []
+        self.rows: List[Dict[str, float]] = []
+        self.series: List[Dict[str, Dict[str, float]]] = []
+        self.failed: List[Dict[str, Any]] = []
+        self.texts: Dict[str, Counter] = {field: Counter() for field in ("user_query",) + INTELLIGENCE_FIELDS}
+        self.query_agents: Dict[str, set] = {}
+        self.interactions = 0
+
+    def add(self, project_id: int, reports: Dict[str, Dict[str, Any]]) -> None:
+        self.project_ids.append(project_id)
+        self.rows.append(report_row(reports))
+        self.series.append(report_series(reports.get("analysis")))
+        for record in _data(reports.get("intelligence")).get("data") or []:
+            self.interactions += 1
+            for field in INTELLIGENCE_FIELDS:
+                if record.get(field):
+                    self.texts[field][str(record[field])] += 1
+            if record.get("user_query"):
+                query = normalize_query(str(record["user_query"]))
+                self.texts["user_query"][query] += 1
+                self.query_agents.setdefault(query, set()).add(project_id)
+
+    def add_failure(self, project_id: int, error: str) -> None:
+        self.failed.append({"project_id": project_id, "error": error})
+
+    def columns(self) -> Dict[str, List[float]]:
+        """metric -> one value per agent (0 where an agent did not report it)."""
+        names = list(dict.fromkeys(name for row in self.rows for name in row))
+        return {name: [row.get(name, 0.0) for row in self.rows] for name in names}
+
+    def summary(self, top_n: int = 10, percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                include_columns: bool = False) -> Dict[str, Any]:
+        columns = self.columns()
+        stats = {name: column_stats(values, percentiles) for name, values in columns.items()}
+        totals = {name: column["sum"] for name, column in stats.items()}
+        conversations = totals.get("conversations", 0.0)
+        if conversations:
+            # Weighted by conversations, unlike the mean of per-agent averages
+            totals["avg_queries_per_conversation"] = round(totals.get("queries", 0.0) / conversations, 3)
+
+        top_agents = {}
+        for name in ("queries", "conversations"):
+            values = columns.get(name) or []
+            top_agents[name] = [{"project_id": self.project_ids[i], "value": values[i]}
+                                for i in top_indices(values, top_n) if values[i]]
+
+        series: Dict[str, List[Dict[str, Any]]] = {}
+        for metric in dict.fromkeys(m for agent in self.series for m in agent):
+            labels = list(dict.fromkeys(label for agent in self.series for label in agent.get(metric, {})))
+            matrix = [[agent.get(metric, {}).get(label, 0.0) for label in labels] for agent in self.series]
+            sums = column_sums(matrix)
+            if metric == "queries_per_conversation":
+                # A ratio: average over the agents that had activity in the bucket
+                active = column_sums([[1.0 if value else 0.0 for value in row] for row in matrix])
+                sums = [total / count if count else 0.0 for total, count in zip(sums, active)]
+            series[metric] = [{"bucket": label, "value": round(value, 3)} for label, value in zip(labels, sums)]
+
+        summary: Dict[str, Any] = {
+            "agents": len(self.project_ids),
+            "failed": self.failed,
+            "totals": totals,
+            "distribution": stats,
+            "top_agents": top_agents,
+            "series": series,
+            "backend": "numpy" if np is not None else "python",
+        }
+        if self.interactions:
+            summary["intelligence"] = {
+                "interactions": self.interactions,
+                "top_queries": [{"query": query, "count": count, "agents": len(self.query_agents[query])}
+                                for query, count in self.texts["user_query"].most_common(top_n)],
+                **{field: dict(self.texts[field].most_common(top_n)) for field in INTELLIGENCE_FIELDS},
+            }
+        if include_columns:
+            summary["columns"] = {"project_id": self.project_ids, **columns}
+        return summary
@@ -0,0 +1,226 @@
+"""
+Client-Side Rate Limiting
+
+Token buckets per (API key, endpoint class) enforced in-process before a
+request reaches CustomGPT. Each bucket adapts AIMD-style: every success adds
+a small step back towards the configured ceiling, every 429 halves the rate
+and pauses the bucket for the Retry-After interval, so several MCP clients
+sharing one key converge on the quota instead of producing error storms.
+"""
+
+import asyncio
+import email.utils
+import os
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from cache import key_fingerprint
+
+# (requests per second, burst) ceilings per endpoint class
+DEFAULT_LIMITS = {
+    "read": (10.0, 20),
+    "write": (5.0, 10),
+    "chat": (5.0, 10),
+    "reports": (2.0, 5),
+}
+
+
+class QuotaExhausted(Exception):
+    """Raised when the last usage snapshot says no queries are left this cycle."""
+
+
+def endpoint_class(method: str, path: str) -> str:
+    """Bucket a request into one of the DEFAULT_LIMITS endpoint classes."""
+    if path.endswith("/chat/completions") or (method == "POST" and path.endswith("/messages")):
+        return "chat"
+    if "/reports/" in path:
+        return "reports"
+    return "read" if method == "GET" else "write"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, parsed.timestamp() - time.time())
+
+
+class TokenBucket:
+    """Async token bucket whose refill rate follows additive-increase/multiplicative-decrease."""
+
+    def __init__(self, rate: float, burst: int, min_rate: float = 0.1,
+                 increase: Optional[float] = None, decrease: float = 0.5):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.increase = increase if increase is not None else rate / 20
+        self.decrease = decrease
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self.waited_seconds = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """Wait (FIFO) until a token is available; returns seconds spent waiting."""
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        waited = time.monotonic() - started
+        self.waited_seconds += waited
+        return waited
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is free now and nobody is queued for it."""
+        now = time.monotonic()
+        if self._lock.locked() or now < self.blocked_until:
+            return False
+        self._refill(now)
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def on_success(self) -> None:
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: Optional[float]) -> None:
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, self.updated + retry_after)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "rate_per_second": round(self.rate, 3),
+            "ceiling_per_second": self.max_rate,
+            "burst": self.capacity,
+            "tokens": round(self.tokens, 2),
+            "blocked_for_seconds": round(max(0.0, self.blocked_until - time.monotonic()), 2),
+            "throttled": self.throttled,
+            "waited_seconds": round(self.waited_seconds, 3),
+        }
+
+
+class RateLimiter:
+    """Registry of adaptive buckets keyed by (API key fingerprint, endpoint class)."""
+
+    def __init__(self, limits: Optional[Mapping[str, Tuple[float, int]]] = None,
+                 quota_ttl: float = 300.0):
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.quota_ttl = quota_ttl
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._quotas: Dict[str, Tuple[int, float]] = {}
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        """Read RATE_LIMIT_<CLASS>_RPS / RATE_LIMIT_<CLASS>_BURST overrides.
+
+        The ceilings are per API key across the whole server, so each of the
+        WEB_CONCURRENCY worker processes enforces its share of them.
+        """
+        workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+        limits = {}
+        for name, (rate, burst) in DEFAULT_LIMITS.items():
+            limits[name] = (
+                float(os.getenv(f"RATE_LIMIT_{name.upper()}_RPS", rate)) / workers,
+                max(1, int(os.getenv(f"RATE_LIMIT_{name.upper()}_BURST", burst)) // workers),
+            )
+        return cls(limits, quota_ttl=float(os.getenv("RATE_LIMIT_QUOTA_TTL", "300")))
+
+    def bucket(self, api_key: Optional[str], kind: str) -> TokenBucket:
+        key = (key_fingerprint(api_key), kind)
+        if key not in self._buckets:
+            rate, burst = self.limits.get(kind, self.limits["read"])
+            self._buckets[key] = TokenBucket(rate, burst)
+        return self._buckets[key]
+
+    async def acquire(self, api_key: Optional[str], method: str, path: str) -> float:
+        kind = endpoint_class(method, path)
+        if kind == "chat":
+            self._check_quota(api_key)
+        return await self.bucket(api_key, kind).acquire()
+
+    def try_acquire(self, api_key: Optional[str], method: str, path: str) -> bool:
+        """Non-blocking ``acquire``: False when the bucket would make the caller wait."""
+        kind = endpoint_class(method, path)
+        if kind == "chat":
+            self._check_quota(api_key)
+        return self.bucket(api_key, kind).try_acquire()
+
+    def record(self, api_key: Optional[str], method: str, path: str, status: int,
+               headers: Optional[Mapping[str, str]] = None) -> None:
+        """Feed an upstream outcome back into the matching bucket."""
+        kind = endpoint_class(method, path)
+        bucket = self.bucket(api_key, kind)
+        if status == 429:
+            bucket.on_throttle(parse_retry_after((headers or {}).get("Retry-After")))
+        elif status < 400:
+            bucket.on_success()
+            if kind == "chat":
+                self._spend_quota(api_key)
+
+    def forget(self, api_key: Optional[str]) -> None:
+        """Drop the buckets and quota of a key that is no longer in use."""
+        tenant = key_fingerprint(api_key)
+        for key in [key for key in self._buckets if key[0] == tenant]:
+            del self._buckets[key]
+        self._quotas.pop(tenant, None)
+
+    # ===== USAGE QUOTA SEEDING =====
+
+    def seed_from_usage(self, api_key: Optional[str], limits: Mapping[str, Any]) -> Optional[int]:
+        """Remember remaining queries from a /limits/usage payload; returns that count."""
+        if "max_queries" not in limits or "current_queries" not in limits:
+            return None
+        remaining = max(0, int(limits["max_queries"]) - int(limits["current_queries"]))
+        self._quotas[key_fingerprint(api_key)] = (remaining, time.monotonic() + self.quota_ttl)
+        return remaining
+
+    def _check_quota(self, api_key: Optional[str]) -> None:
+        quota = self._quotas.get(key_fingerprint(api_key))
+        if quota and quota[1] > time.monotonic() and quota[0] <= 0:
+            raise QuotaExhausted("CustomGPT query quota for this billing cycle is used up")
+
+    def _spend_quota(self, api_key: Optional[str]) -> None:
+        tenant = key_fingerprint(api_key)
+        if tenant in self._quotas:
+            remaining, expires_at = self._quotas[tenant]
+            self._quotas[tenant] = (max(0, remaining - 1), expires_at)
+
+    def stats(self, api_key: Optional[str] = None) -> Dict[str, Any]:
+        tenant = key_fingerprint(api_key)
+        buckets = {kind: bucket.snapshot() for (owner, kind), bucket in self._buckets.items()
+                   if owner == tenant}
+        quota = self._quotas.get(tenant)
+        return {
+            "buckets": buckets,
+            "queries_remaining": quota[0] if quota and quota[1] > time.monotonic() else None,
+            "limits": {kind: {"rate_per_second": rate, "burst": burst}
+                       for kind, (rate, burst) in self.limits.items()},
+        }
@@ -0,0 +1,291 @@
+"""
+Resilience Policies
+
+Central retry, hedging and circuit-breaker layer wrapped around every
+CustomGPT request by the transport:
+
+- idempotent reads retry transient failures with full-jitter exponential
+  backoff (writes only retry a 429, which CustomGPT never processed);
+- slow reads such as the report endpoints can be hedged: a second copy is
+  sent if the first has not answered after a delay and the loser is
+  cancelled. The delay counts from when the first copy got its rate-limit
+  token, and no copy is sent while the limiter is queueing requests;
+- each endpoint has a circuit breaker that fails fast while CustomGPT keeps
+  returning 5xx/network errors and probes again after a cool-down.
+"""
+
+import asyncio
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Path segments followed by an identifier, used to build endpoint templates
+ID_COLLECTIONS = {"projects", "pages", "conversations", "messages", "citations", "sources",
+                  "licenses", "preview"}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"Circuit open for {endpoint}; CustomGPT looks degraded, retry in {retry_in:.0f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+def endpoint_template(path: str) -> str:
+    """Collapse ids in a request path, e.g. /api/v1/projects/12/pages -> /api/v1/projects/{id}/pages."""
+    segments = path.split("/")
+    for i in range(1, len(segments)):
+        if segments[i - 1] in ID_COLLECTIONS and segments[i]:
+            segments[i] = "{id}"
+    return "/".join(segments)
+
+
+def network_errors() -> Tuple[type, ...]:
+    """Exception types meaning the request never got a usable answer (aiohttp loaded lazily)."""
+    import aiohttp
+
+    return (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError)
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Network errors, timeouts and retryable HTTP statuses."""
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    return isinstance(exc, network_errors())
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """Failures that count against a circuit breaker (not 4xx client errors or 429s)."""
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status >= 500
+    return isinstance(exc, network_errors())
+
+
+class RetryPolicy:
+    """How often and how patiently to retry one endpoint."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.25, max_delay: float = 8.0,
+                 hedge_after: Optional[float] = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_after = hedge_after
+
+    def should_retry(self, method: str, exc: BaseException) -> bool:
+        if method == "GET":
+            return is_transient(exc)
+        # Non-idempotent calls are only repeated when CustomGPT rejected them outright
+        return getattr(exc, "status_code", None) == 429
+
+    def backoff(self, attempt: int, exc: BaseException) -> float:
+        """Full-jitter exponential backoff, never shorter than a Retry-After hint."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        headers = getattr(exc, "headers", None) or {}
+        try:
+            delay = max(delay, float(headers.get("Retry-After", 0)))
+        except ValueError:
+            pass
+        return min(delay, self.max_delay)
+
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures -> half-open probe after a cool-down."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._probe_in_flight = False
+
+    def before_call(self, endpoint: str) -> None:
+        if self.state == "open":
+            elapsed = time.monotonic() - self.opened_at
+            if elapsed < self.reset_timeout:
+                raise CircuitOpenError(endpoint, self.reset_timeout - elapsed)
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                raise CircuitOpenError(endpoint, self.reset_timeout)
+            self._probe_in_flight = True
+
+    def release(self) -> None:
+        """Forget an in-flight probe that was cancelled before it got an answer."""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self, upstream_failure: bool) -> None:
+        """Count an upstream failure. A client error (4xx) is neutral: it neither closes a
+        half-open breaker nor counts against or resets the failure streak."""
+        self._probe_in_flight = False
+        if not upstream_failure:
+            return
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self.trips += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures, "trips": self.trips}
+
+
+class Resilience:
+    """Applies per-endpoint retry/hedge policies and circuit breakers to request callables."""
+
+    def __init__(self, read_policy: Optional[RetryPolicy] = None,
+                 write_policy: Optional[RetryPolicy] = None,
+                 overrides: Optional[Dict[str, RetryPolicy]] = None,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.read_policy = read_policy or RetryPolicy()
+        self.write_policy = write_policy or RetryPolicy(max_attempts=2)
+        self.overrides = overrides or {}
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedges_skipped = 0
+
+    @classmethod
+    def from_env(cls) -> "Resilience":
+        """Read RETRY_* / HEDGE_* / CIRCUIT_* environment variables."""
+        attempts = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+        base_delay = float(os.getenv("RETRY_BASE_DELAY", "0.25"))
+        max_delay = float(os.getenv("RETRY_MAX_DELAY", "8"))
+        hedge_after = float(os.getenv("HEDGE_DELAY", "2.0"))
+        hedged = RetryPolicy(attempts, base_delay, max_delay, hedge_after=hedge_after)
+        overrides = {}
+        if hedge_after > 0:
+            for report in ("traffic", "queries", "conversations", "analysis", "intelligence"):
+                overrides[f"GET /api/v1/projects/{{id}}/reports/{report}"] = hedged
+        return cls(
+            read_policy=RetryPolicy(attempts, base_delay, max_delay),
+            write_policy=RetryPolicy(min(attempts, 2), base_delay, max_delay),
+            overrides=overrides,
+            failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30")),
+        )
+
+    def policy_for(self, endpoint: str, method: str) -> RetryPolicy:
+        if endpoint in self.overrides:
+            return self.overrides[endpoint]
+        return self.read_policy if method == "GET" else self.write_policy
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        if endpoint not in self._breakers:
+            self._breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return self._breakers[endpoint]
+
+    async def call(self, method: str, path: str, send: Callable[[], Awaitable[Any]],
+                   throttle: Optional[Callable[..., Awaitable[bool]]] = None) -> Any:
+        """Run ``send`` under the endpoint's breaker and retry/hedge policy.
+
+        ``throttle()`` waits for a rate-limit token before each attempt;
+        ``throttle(wait=False)`` must return False instead of waiting, which
+        suppresses a hedge.
+        """
+        endpoint = f"{method} {endpoint_template(path)}"
+        policy = self.policy_for(endpoint, method)
+        breaker = self.breaker(endpoint)
+        attempt = 0
+        while True:
+            breaker.before_call(endpoint)
+            try:
+                if throttle is not None:
+                    await throttle()
+                if policy.hedge_after is not None and method == "GET":
+                    result = await self._hedged(send, policy.hedge_after, throttle)
+                else:
+                    result = await send()
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+            except Exception as exc:
+                breaker.record_failure(is_upstream_failure(exc))
+                attempt += 1
+                if attempt >= policy.max_attempts or not policy.should_retry(method, exc):
+                    raise
+                self.retries += 1
+                await asyncio.sleep(policy.backoff(attempt, exc))
+                continue
+            breaker.record_success()
+            return result
+
+    def guard(self, method: str, path: str) -> "BreakerGuard":
+        """Breaker-only protection for calls that cannot be retried (e.g. streams)."""
+        endpoint = f"{method} {endpoint_template(path)}"
+        return BreakerGuard(self.breaker(endpoint), endpoint)
+
+    async def _hedged(self, send: Callable[[], Awaitable[Any]], delay: float,
+                      throttle: Optional[Callable[..., Awaitable[bool]]] = None) -> Any:
+        """Send a backup request if the first is slower than ``delay``; first success wins."""
+        first = asyncio.ensure_future(send())
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return first.result()
+            if throttle is not None and not await throttle(wait=False):
+                self.hedges_skipped += 1
+                return await first
+            self.hedges += 1
+            tasks.add(asyncio.ensure_future(send()))
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            assert error is not None  # the loop only ends once every copy has failed
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedges_skipped": self.hedges_skipped,
+            "circuit_breakers": {endpoint: breaker.snapshot()
+                                 for endpoint, breaker in self._breakers.items()},
+        }
+
+
+class BreakerGuard:
+    """Async context manager recording one call's outcome on a circuit breaker."""
+
+    def __init__(self, breaker: CircuitBreaker, endpoint: str):
+        self.breaker = breaker
+        self.endpoint = endpoint
+
+    async def __aenter__(self) -> "BreakerGuard":
+        self.breaker.before_call(self.endpoint)
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> None:
+        if exc is None:
+            self.breaker.record_success()
+        elif isinstance(exc, Exception):
+            self.breaker.record_failure(is_upstream_failure(exc))
+        else:
+            self.breaker.release()
@@ -2,21 +2,86 @@
 """
 CustomGPT MCP Server - Working Version
 
-A working MCP server using FastMCP with ONLY confirmed CustomGPT SDK methods.
+A working MCP server using FastMCP with async tools on top of a pooled
+aiohttp transport (see customgpt_http.py).
 """
 
+import asyncio
+import functools
+import inspect
 import json
 import logging
 import os
 import sys
+import time
 import uuid
-from typing import Dict, Any, Optional
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional
 
-from fastmcp import FastMCP
-from customgpt_client import CustomGPT
 from dotenv import load_dotenv
+from fastmcp import Context, FastMCP
+from fastmcp.tools import ToolResult
+from mcp.types import TextContent
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+
+import metrics
+import shaping
+from answers import AnswerCache, answer_key
+from api_models import (
+    ChatbotModel,
+    ChatbotMsgLang,
+    CitationsViewType,
+    ConversationRetentionPeriod,
+    DataRefreshFrequency,
+    EnableCitations,
+    ImageCitationDisplay,
+    PostProjectsBody,
+    PostProjectsByIdBody,
+    PostProjectsChatCompletionsBody,
+    PostProjectsConversationsBody,
+    PostProjectsConversationsMessagesBody,
+    PostProjectsPluginsBody,
+    PostProjectsSettingsBody,
+    PostProjectsSourcesBody,
+    PostUserBody,
+    PutProjectsConversationsByIdBody,
+    PutProjectsPagesMetadataBody,
+    PutProjectsPluginsBody,
+    PutProjectsSourcesByIdBody,
+    Reaction,
+    RefreshExistingPages,
+    ResponseSource,
+    SpotlightAvatarShape,
+    SpotlightAvatarType,
+    UserAvatarOrientation,
+)
+from cache import TTLCache, key_fingerprint
+from evals import (
+    DEFAULT_EVAL_DIR,
+    Checkpoint,
+    EvalError,
+    ask_streamed,
+    columns,
+    load_dataset,
+    normalize_rows,
+    parse_variants,
+    resolve_in,
+    run_cases,
+    run_fingerprint,
+    summarize,
+    write_results,
+)
+from ingest import run_ingest, wait_for_indexing
+from jobs import Job, JobManager
+from jsondecode import loads
+from pagination import fetch_all_pages
+from portfolio import REPORT_FILTERS, Portfolio
+from shaping import ContinuationStore, shape
+from tenants import TenantClients, TenantMiddleware
+from transcripts import TranscriptStore, fts_query
 
 load_dotenv()
 
@@ -24,8 +89,47 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("customgpt-mcp-server")
 
+
+@asynccontextmanager
+async def lifespan(server):
+    """Release pooled CustomGPT connections when the server shuts down."""
+    try:
+        yield {}
+    finally:
+        await customgpt.close()
+        transcript_store.close()
+        answer_cache.close()
+        continuation_store.close()
+        await job_manager.close()
+
 # Initialize FastMCP server
-mcp = FastMCP("CustomGPT MCP Server")
+mcp = FastMCP("CustomGPT MCP Server", lifespan=lifespan)
+mcp.add_middleware(TenantMiddleware())
+mcp.add_middleware(metrics.MetricsMiddleware())
+
+# Tool groups: MCP_TOOL_GROUPS registers only the listed groups (default: all),
+# MCP_DISABLED_TOOL_GROUPS drops groups. Skipped tools are never registered, so
+# their schemas are not built at startup.
+def _env_set(name: str) -> set:
+    return {item.strip() for item in os.getenv(name, "").split(",") if item.strip()}
+
+ENABLED_TOOL_GROUPS = _env_set("MCP_TOOL_GROUPS")
+DISABLED_TOOL_GROUPS = _env_set("MCP_DISABLED_TOOL_GROUPS")
+TOOL_GROUPS: Dict[str, List[str]] = {}
+
+def group_enabled(group: str) -> bool:
+    if ENABLED_TOOL_GROUPS and group not in ENABLED_TOOL_GROUPS:
+        return False
+    return group not in DISABLED_TOOL_GROUPS
+
+def tool(group: str):
+    """Register a tool tagged with its group, unless the deployment switched the group off."""
+    def decorator(func):
+        TOOL_GROUPS.setdefault(group, []).append(func.__name__)
+        if not group_enabled(group):
+            return func
+        return mcp.tool(tags={group})(func)
+    return decorator
 
 
 def mask_api_key(api_key: str) -> str:
@@ -37,47 +141,275 @@ def mask_api_key(api_key: str) -> str:
 def extract_response_data(response):
     """Extract JSON data from CustomGPT Response object."""
     if hasattr(response, 'content'):
-        return json.loads(response.content.decode('utf-8'))
+        return loads(response.content)
     return response
 
-# Pre-configure CustomGPT on startup
-api_key = os.getenv("CUSTOMGPT_API_KEY")
+async def relay_stream(events, ctx: Optional[Context]) -> Dict[str, Any]:
+    """Forward streamed answer chunks to the MCP client and assemble the final message."""
+    chunks = []
+    final = {}
+    async for event in events:
+        if event.get("status") == "progress":
+            chunk = event.get("message") or ""
+            chunks.append(chunk)
+            if ctx is not None:
+                await ctx.report_progress(len(chunks), message=chunk)
+        else:
+            final = event
+
+    message = {key: value for key, value in final.items() if key not in ("status", "message")}
+    message["openai_response"] = "".join(chunks)
+    message.setdefault("citations", [])
+    return {"status": "success", "data": message, "chunks": len(chunks)}
+
+# Pre-configure CustomGPT on startup (connections are pooled and opened lazily).
+# HTTP calls carrying an X-CustomGPT-API-Key header are routed to a per-tenant
+# client; everything else uses CUSTOMGPT_API_KEY.
+customgpt = TenantClients.from_env()
+api_key = customgpt.default_api_key
 if api_key:
-    CustomGPT.api_key = api_key
-    CustomGPT.base_url = os.getenv("CUSTOMGPT_API_BASE", "https://app.customgpt.ai")
     logger.info(f"✅ CustomGPT configured with API key: {mask_api_key(api_key)}")
 else:
     logger.error("❌ No CUSTOMGPT_API_KEY found in environment!")
 
-# ===== CORE TOOLS (Using only confirmed SDK methods) =====
+# Read-through cache for idempotent reads, keyed by (api key, tool, args)
+response_cache = TTLCache.from_env()
+
+def cache_metrics():
+    """Expose response cache counters on /metrics."""
+    stats = response_cache.stats()
+    yield "mcp_cache_hits_total", "counter", "Response cache hits.", stats["hits"]
+    yield "mcp_cache_misses_total", "counter", "Response cache misses.", stats["misses"]
+    yield "mcp_cache_evictions_total", "counter", "Response cache LRU evictions.", stats["evictions"]
+    yield "mcp_cache_entries", "gauge", "Entries held in the response cache.", stats["entries"]
+    yield "mcp_cache_bytes", "gauge", "Approximate bytes held in the response cache.", stats["bytes"]
+    yield "mcp_answer_cache_hits_total", "counter", "Answers served from the answer cache.", answer_cache.hits
+    yield "mcp_answer_cache_misses_total", "counter", "Answer cache lookups that went upstream.", answer_cache.misses
+
+metrics.REGISTRY.add_collector(cache_metrics)
+
+def tenant_metrics():
+    """Expose per-tenant client pool counters on /metrics."""
+    stats = customgpt.stats()
+    yield "mcp_tenant_clients", "gauge", "Tenant clients with their own connection pool.", stats["tenant_clients"]
+    yield "mcp_tenant_evictions_total", "counter", "Idle tenant clients evicted.", stats["evictions"]
+
+metrics.REGISTRY.add_collector(tenant_metrics)
+
+def single_flight_metrics():
+    """Expose request coalescing counters on /metrics."""
+    if customgpt.single_flight is None:
+        return
+    stats = customgpt.single_flight.stats()
+    yield "customgpt_requests_coalesced_total", "counter", "Reads that joined an identical in-flight request.", stats["coalesced"]
+    yield "customgpt_requests_abandoned_total", "counter", "Shared reads cancelled after every caller left.", stats["abandoned"]
+
+metrics.REGISTRY.add_collector(single_flight_metrics)
+
+def cached(resource: str):
+    """Serve successful results of a read tool from the response cache."""
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            fingerprint = key_fingerprint(customgpt.api_key)
+            key = (fingerprint, func.__name__, json.dumps(bound.arguments, sort_keys=True, default=str))
+            hit, value = response_cache.get(key, resource, tenant=fingerprint)
+            if hit:
+                return value
+            result = await func(*args, **kwargs)
+            if result.get("success"):
+                tag = (fingerprint, resource, bound.arguments.get("project_id"))
+                response_cache.set(key, result, resource, tags=[tag], tenant=fingerprint)
+            return result
+        return wrapper
+    return decorator
+
+def invalidate_cache(project_id: int, *resources: str) -> None:
+    """Drop cached reads of the given resources for one agent (and its cached answers)."""
+    fingerprint = key_fingerprint(customgpt.api_key)
+    response_cache.invalidate(*[(fingerprint, resource, project_id) for resource in resources])
+    if ANSWER_INVALIDATING.intersection(resources):
+        answer_cache.invalidate(fingerprint, project_id)
+
+# Opt-in answer cache for send_message / send_conversation_message (ANSWER_CACHE=true)
+answer_cache = AnswerCache.from_env()
+
+# Writes to these resources can change an agent's answers
+ANSWER_INVALIDATING = {"settings", "sources", "pages"}
+
+def answer_cache_key(use_cache: Optional[bool], project_id: int, prompt: str, **options) -> Optional[str]:
+    """Answer cache key for this call, or None when the cache is off for it."""
+    if not (answer_cache.enabled if use_cache is None else use_cache):
+        return None
+    return answer_key(project_id, prompt, **options)
+
+async def lookup_answer(project_id: int, key: Optional[str], max_age: Optional[int],
+                        stream: bool, ctx: Optional[Context]) -> Optional[Dict[str, Any]]:
+    """Cached answer for this call, if any; cache failures only cost the lookup."""
+    if key is None:
+        return None
+    try:
+        hit = await answer_cache.get(key_fingerprint(customgpt.api_key), project_id, key, max_age)
+    except Exception as e:
+        logger.warning(f"⚠️ Answer cache lookup failed: {e}")
+        return None
+    if hit is not None:
+        logger.info(f"⚡ Answered from cache for agent {project_id} ({hit['age_seconds']}s old)")
+        if stream and ctx is not None:
+            await ctx.report_progress(1, message=(hit["response"].get("data") or {}).get("openai_response") or "")
+    return hit
+
+async def remember_answer(project_id: int, key: Optional[str], prompt: str,
+                          response_data: Dict[str, Any]) -> None:
+    """Store a non-empty answer in the answer cache; never fails the caller."""
+    if key is None or not (response_data.get("data") or {}).get("openai_response"):
+        return
+    try:
+        await answer_cache.put(key_fingerprint(customgpt.api_key), project_id, key, prompt, response_data)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not cache answer for agent {project_id}: {e}")
+
+# Background jobs for operations that finish after the tool call returns
+job_manager = JobManager.from_env()
+JOB_POLL_MIN_SECONDS = float(os.getenv("JOB_POLL_MIN_SECONDS", "5"))
+JOB_POLL_MAX_SECONDS = float(os.getenv("JOB_POLL_MAX_SECONDS", "60"))
+JOB_MAX_WAIT_SECONDS = float(os.getenv("JOB_MAX_WAIT_SECONDS", "3600"))
 
-@mcp.tool()
-def list_agents(page: int = 1) -> Dict[str, Any]:
+def job_notifier(ctx: Optional[Context]):
+    """Callback that sends the calling MCP session a job://<id> resource update when a job finishes (best effort)."""
+    try:
+        session = ctx.session if ctx is not None else None
+    except Exception:
+        session = None
+
+    async def notify(job: Job) -> None:
+        logger.info(f"🏁 Job {job.id} ({job.kind}) {job.state}")
+        if session is None:
+            return
+        try:
+            await session.send_resource_updated(f"job://{job.id}")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not notify client about job {job.id}: {e}")
+    return notify
+
+def start_job(kind: str, params: Dict[str, Any], fn, ctx: Optional[Context]) -> Job:
+    """Queue a job for the calling API key."""
+    job = job_manager.submit(kind, key_fingerprint(customgpt.api_key), params, fn, job_notifier(ctx))
+    logger.info(f"🧵 Job {job.id} queued: {kind} {params}")
+    return job
+
+def settle_job(call, agent_id):
+    """Job function: run the upstream call, then follow the agent's indexing until it settles."""
+    async def run(job: Job) -> Dict[str, Any]:
+        response_data = await call()
+        target = agent_id(response_data)
+        job.progress["agent_id"] = target
+        if target is not None:
+            if not await wait_for_indexing(job, target, fetch_stats, JOB_POLL_MIN_SECONDS,
+                                           JOB_POLL_MAX_SECONDS, JOB_MAX_WAIT_SECONDS):
+                job.state = "timed_out"
+            invalidate_cache(target, "pages", "page_metadata")
+        return response_data
+    return run
+
+async def fetch_stats(project_id: int) -> Dict[str, Any]:
+    return extract_response_data(await customgpt.get_project_stats(project_id))
+
+# Local transcript store (SQLite + FTS5), opened on first use
+transcript_store = TranscriptStore.from_env()
+
+async def remember_messages(project_id: int, session_id: str, body: Dict[str, Any]) -> None:
+    """Write fetched messages through to the transcript store; never fails the caller."""
+    try:
+        messages = ((body.get("data") or {}).get("messages") or {}).get("data") or []
+        await transcript_store.upsert_messages(key_fingerprint(customgpt.api_key), project_id,
+                                               session_id, messages)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not store messages for {session_id}: {e}")
+
+# Response shaping defaults (per call overridable)
+RESPONSE_PRESET = os.getenv("RESPONSE_PRESET", "full")
+RESPONSE_MAX_TEXT_CHARS = int(os.getenv("RESPONSE_MAX_TEXT_CHARS", "8000"))
+RESPONSE_JSON = os.getenv("RESPONSE_JSON", "default").lower()
+continuation_store = ContinuationStore.from_env()
+
+SHAPING_PARAMETERS = {
+    "fields": (Optional[List[str]], None),
+    "exclude": (Optional[List[str]], None),
+    "preset": (shaping.Preset, RESPONSE_PRESET),
+    "max_text_chars": (int, RESPONSE_MAX_TEXT_CHARS),
+}
+
+def shaped(resource: str):
+    """Add fields/exclude/preset/max_text_chars arguments that trim the tool's "data"."""
+    def decorator(func):
+        signature = inspect.signature(func)
+        own = set(signature.parameters)
+        added = {name: spec for name, spec in SHAPING_PARAMETERS.items() if name not in own}
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            options = {name: kwargs.pop(name, default) for name, (_, default) in added.items()}
+            fields = kwargs.get("fields") if "fields" in own else options.get("fields")
+            result = await func(*args, **kwargs)
+            if result.get("success") and "data" in result:
+                data, notes = shape(result["data"], resource, fields, options.get("exclude"),
+                                    options.get("preset", RESPONSE_PRESET),
+                                    options.get("max_text_chars", RESPONSE_MAX_TEXT_CHARS))
+                result = {**result, "data": data}
+                if notes:
+                    result["truncated_fields"] = await continuation_store.keep(
+                        key_fingerprint(customgpt.api_key), notes)
+            if RESPONSE_JSON == "orjson" and shaping.orjson is not None:
+                return ToolResult(content=[TextContent(type="text", text=shaping.dumps(result))],
+                                  structured_content=result)
+            return result
+
+        extra = [inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, default=default,
+                                   annotation=annotation)
+                 for name, (annotation, default) in added.items()]
+        params = list(signature.parameters.values())
+        wrapper.__signature__ = signature.replace(parameters=params + extra)
+        wrapper.__annotations__ = {**func.__annotations__,
+                                   **{name: annotation for name, (annotation, _) in added.items()}}
+        return wrapper
+    return decorator
+
+# ===== CORE TOOLS =====
+
+@tool("agents")
+@shaped("agents")
+async def list_agents(page: int = 1) -> Dict[str, Any]:
     """List all your CustomGPT agents."""
     try:
         logger.info("🤖 Listing agents...")
 
-        response = CustomGPT.Project.list(page=page)
+        response = await customgpt.list_projects(page=page)
         response_data = extract_response_data(response)
 
         return {
             "success": True,
             "data": response_data,
-            "api_key_configured": bool(os.getenv("CUSTOMGPT_API_KEY")),
-            "response_type": str(type(response))
+            "api_key_configured": bool(customgpt.api_key)
         }
     except Exception as e:
         logger.error(f"❌ Error listing agents: {e}")
         print(f"❌ Error in list_agents: {e}", file=sys.stderr)
         return {"success": False, "error": str(e)}
 
-@mcp.tool()
-def get_agent(project_id: int) -> Dict[str, Any]:
+@tool("agents")
+@shaped("agent")
+@cached("agent")
+async def get_agent(project_id: int) -> Dict[str, Any]:
     """Get details for a specific agent."""
     try:
         logger.info(f"🔍 Getting agent {project_id}")
 
-        response = CustomGPT.Project.get(project_id)
+        response = await customgpt.get_project(project_id)
         response_data = extract_response_data(response)
 
         return {
@@ -90,17 +422,15 @@ def get_agent(project_id: int) -> Dict[str, Any]:
         print(f"❌ Error in get_agent: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def create_agent(project_name: str, sitemap_path: Optional[str] = None) -> Dict[str, Any]:
+@tool("agents")
+async def create_agent(project_name: str, sitemap_path: Optional[str] = None) -> Dict[str, Any]:
     """Create a new CustomGPT agent."""
     try:
         logger.info(f"🚀 Creating agent '{project_name}'")
 
-        create_params = {"project_name": project_name}
-        if sitemap_path:
-            create_params["sitemap_path"] = sitemap_path
+        create_params = PostProjectsBody(project_name=project_name, sitemap_path=sitemap_path).payload()
 
-        response = CustomGPT.Project.create(**create_params)
+        response = await customgpt.create_project(**create_params)
         response_data = extract_response_data(response)
 
         return {
@@ -113,13 +443,14 @@ def create_agent(project_name: str, sitemap_path: Optional[str] = None) -> Dict[
         print(f"❌ Error in create_agent: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_name": project_name}
 
-@mcp.tool()
-def delete_agent(project_id: int) -> Dict[str, Any]:
+@tool("agents")
+async def delete_agent(project_id: int) -> Dict[str, Any]:
     """Delete a CustomGPT agent."""
     try:
         logger.info(f"🗑️ Deleting agent {project_id}")
 
-        response = CustomGPT.Project.delete(project_id)
+        response = await customgpt.delete_project(project_id)
+        invalidate_cache(project_id, "agent", "settings", "sources", "pages", "page_metadata", "citation")
         response_data = extract_response_data(response)
 
         return {
@@ -132,13 +463,13 @@ def delete_agent(project_id: int) -> Dict[str, Any]:
         print(f"❌ Error in delete_agent: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def get_agent_stats(project_id: int) -> Dict[str, Any]:
+@tool("agents")
+async def get_agent_stats(project_id: int) -> Dict[str, Any]:
     """Get statistics for a CustomGPT agent."""
     try:
         logger.info(f"📊 Getting stats for agent {project_id}")
 
-        response = CustomGPT.Project.stats(project_id)
+        response = await customgpt.get_project_stats(project_id)
         response_data = extract_response_data(response)
 
         return {
@@ -151,22 +482,42 @@ def get_agent_stats(project_id: int) -> Dict[str, Any]:
         print(f"❌ Error in get_agent_stats: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def send_message(project_id: int, message: str, session_id: Optional[str] = None) -> Dict[str, Any]:
-    """Send a message to a CustomGPT agent."""
+@tool("conversations")
+async def send_message(project_id: int, message: str, session_id: Optional[str] = None,
+                       stream: bool = False, use_cache: Optional[bool] = None,
+                       max_cache_age: Optional[int] = None, ctx: Context = None) -> Dict[str, Any]:
+    """Send a message to a CustomGPT agent. With stream=True, answer chunks are sent as progress notifications."""
     try:
         if not session_id:
             session_id = str(uuid.uuid4())
 
+        cache_key = answer_cache_key(use_cache, project_id, message)
+        hit = await lookup_answer(project_id, cache_key, max_cache_age, stream, ctx)
+        if hit is not None:
+            return {
+                "success": True,
+                "data": hit["response"],
+                "session_id": session_id,
+                "project_id": project_id,
+                "cached": True,
+                "cache_age_seconds": hit["age_seconds"]
+            }
+
         logger.info(f"💬 Sending message to agent {project_id}")
 
-        response = CustomGPT.Conversation.send(
-            project_id=project_id,
-            prompt=message,
-            session_id=session_id,
-            stream=False
-        )
-        response_data = extract_response_data(response)
+        if stream:
+            response_data = await relay_stream(
+                customgpt.stream_message(project_id=project_id, session_id=session_id, prompt=message),
+                ctx
+            )
+        else:
+            response = await customgpt.send_message(
+                project_id=project_id,
+                session_id=session_id,
+                prompt=message
+            )
+            response_data = extract_response_data(response)
+        await remember_answer(project_id, cache_key, message, response_data)
 
         return {
             "success": True,
@@ -179,18 +530,18 @@ def send_message(project_id: int, message: str, session_id: Optional[str] = None
         print(f"❌ Error in send_message: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def validate_api_key() -> Dict[str, Any]:
+@tool("utilities")
+async def validate_api_key() -> Dict[str, Any]:
     """Validate the configured CustomGPT API key."""
     try:
-        api_key = os.getenv("CUSTOMGPT_API_KEY")
+        api_key = customgpt.api_key
         if not api_key:
             return {"valid": False, "error": "No API key configured"}
 
         logger.info(f"🔑 Validating API key {mask_api_key(api_key)}")
 
         # Test API key by listing agents
-        response = CustomGPT.Project.list(page=1)
+        response = await customgpt.list_projects(page=1)
         response_data = extract_response_data(response)
         success = response.status_code == 200 if hasattr(response, 'status_code') else True
 
@@ -198,7 +549,7 @@ def validate_api_key() -> Dict[str, Any]:
             "valid": success,
             "api_key_masked": mask_api_key(api_key),
             "message": "API key is valid and working" if success else "API key validation failed",
-            "test_response": response_data
+            "agents_visible": (response_data.get("data") or {}).get("total")
         }
     except Exception as e:
         logger.error(f"❌ API key validation failed: {e}")
@@ -207,13 +558,14 @@ def validate_api_key() -> Dict[str, Any]:
 
 # ===== CONVERSATION MANAGEMENT TOOLS =====
 
-@mcp.tool()
-def list_conversations(project_id: int, page: int = 1) -> Dict[str, Any]:
+@tool("conversations")
+@shaped("conversations")
+async def list_conversations(project_id: int, page: int = 1) -> Dict[str, Any]:
     """List all conversations for a specific agent."""
     try:
         logger.info(f"📝 Listing conversations for agent {project_id}")
 
-        response = CustomGPT.Conversation.get(project_id, page=page)
+        response = await customgpt.list_conversations(project_id, page=page)
         response_data = extract_response_data(response)
 
         return {
@@ -226,17 +578,15 @@ def list_conversations(project_id: int, page: int = 1) -> Dict[str, Any]:
         print(f"❌ Error in list_conversations: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def create_conversation(project_id: int, name: Optional[str] = None) -> Dict[str, Any]:
+@tool("conversations")
+async def create_conversation(project_id: int, name: Optional[str] = None) -> Dict[str, Any]:
     """Create a new conversation for an agent."""
     try:
         logger.info(f"💬 Creating conversation for agent {project_id}")
 
-        create_params = {}
-        if name:
-            create_params["name"] = name
+        create_params = PostProjectsConversationsBody(name=name).payload()
 
-        response = CustomGPT.Conversation.create(project_id, **create_params)
+        response = await customgpt.create_conversation(project_id, **create_params)
         response_data = extract_response_data(response)
 
         return {
@@ -250,14 +600,16 @@ def create_conversation(project_id: int, name: Optional[str] = None) -> Dict[str
         print(f"❌ Error in create_conversation: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def get_conversation_messages(project_id: int, session_id: str, page: int = 1) -> Dict[str, Any]:
+@tool("conversations")
+@shaped("messages")
+async def get_conversation_messages(project_id: int, session_id: str, page: int = 1) -> Dict[str, Any]:
     """Get all messages in a specific conversation."""
     try:
         logger.info(f"💬 Getting messages for conversation {session_id}")
 
-        response = CustomGPT.Conversation.messages(project_id, session_id, page=page)
+        response = await customgpt.list_messages(project_id, session_id, page=page)
         response_data = extract_response_data(response)
+        await remember_messages(project_id, session_id, response_data)
 
         return {
             "success": True,
@@ -270,13 +622,14 @@ def get_conversation_messages(project_id: int, session_id: str, page: int = 1) -
         print(f"❌ Error in get_conversation_messages: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id, "session_id": session_id}
 
-@mcp.tool()
-def update_conversation(project_id: int, session_id: str, name: str) -> Dict[str, Any]:
+@tool("conversations")
+async def update_conversation(project_id: int, session_id: str, name: str) -> Dict[str, Any]:
     """Update a conversation's name."""
     try:
         logger.info(f"✏️ Updating conversation {session_id}")
 
-        response = CustomGPT.Conversation.update(project_id, session_id, name=name)
+        updates = PutProjectsConversationsByIdBody(name=name).payload()
+        response = await customgpt.update_conversation(project_id, session_id, **updates)
         response_data = extract_response_data(response)
 
         return {
@@ -291,13 +644,13 @@ def update_conversation(project_id: int, session_id: str, name: str) -> Dict[str
         print(f"❌ Error in update_conversation: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id, "session_id": session_id}
 
-@mcp.tool()
-def delete_conversation(project_id: int, session_id: str) -> Dict[str, Any]:
+@tool("conversations")
+async def delete_conversation(project_id: int, session_id: str) -> Dict[str, Any]:
     """Delete a conversation and all its messages."""
     try:
         logger.info(f"🗑️ Deleting conversation {session_id}")
 
-        response = CustomGPT.Conversation.delete(project_id, session_id)
+        response = await customgpt.delete_conversation(project_id, session_id)
         response_data = extract_response_data(response)
 
         return {
@@ -312,40 +665,53 @@ def delete_conversation(project_id: int, session_id: str) -> Dict[str, Any]:
         print(f"❌ Error in delete_conversation: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id, "session_id": session_id}
 
-@mcp.tool()
-def send_conversation_message(
+@tool("conversations")
+async def send_conversation_message(
     project_id: int,
     session_id: str,
     prompt: str,
     custom_persona: Optional[str] = None,
-    chatbot_model: Optional[str] = None,
-    response_source: Optional[str] = None,
+    chatbot_model: Optional[ChatbotModel] = None,
+    response_source: Optional[ResponseSource] = None,
     lang: str = "en",
-    stream: bool = False
+    stream: bool = False,
+    use_cache: Optional[bool] = None,
+    max_cache_age: Optional[int] = None,
+    ctx: Context = None
 ) -> Dict[str, Any]:
-    """Send a message to a specific conversation session."""
+    """Send a message to a specific conversation session. With stream=True, answer chunks are sent as progress notifications."""
     try:
+        prompt_preview = prompt[:100] + "..." if len(prompt) > 100 else prompt
+        cache_key = answer_cache_key(use_cache, project_id, prompt, custom_persona=custom_persona,
+                                     chatbot_model=chatbot_model, response_source=response_source,
+                                     lang=lang)
+        hit = await lookup_answer(project_id, cache_key, max_cache_age, stream, ctx)
+        if hit is not None:
+            return {
+                "success": True,
+                "message": f"Answered from cache; not added to conversation {session_id}",
+                "data": hit["response"],
+                "project_id": project_id,
+                "session_id": session_id,
+                "prompt_preview": prompt_preview,
+                "cached": True,
+                "cache_age_seconds": hit["age_seconds"]
+            }
+
         logger.info(f"💬 Sending message to conversation {session_id}")
 
         # Build message parameters
-        message_params = {
-            "project_id": project_id,
-            "session_id": session_id,
-            "prompt": prompt,
-            "lang": lang,
-            "stream": stream
-        }
+        body = PostProjectsConversationsMessagesBody(prompt=prompt, custom_persona=custom_persona,
+                                                     chatbot_model=chatbot_model,
+                                                     response_source=response_source).payload()
+        message_params = {"project_id": project_id, "session_id": session_id, "lang": lang, **body}
 
-        if custom_persona:
-            message_params["custom_persona"] = custom_persona
-        if chatbot_model:
-            message_params["chatbot_model"] = chatbot_model
-        if response_source:
-            message_params["response_source"] = response_source
-
-        # Use the conversation send method
-        response = CustomGPT.Conversation.send(**message_params)
-        response_data = extract_response_data(response)
+        if stream:
+            response_data = await relay_stream(customgpt.stream_message(**message_params), ctx)
+        else:
+            response = await customgpt.send_message(**message_params)
+            response_data = extract_response_data(response)
+        await remember_answer(project_id, cache_key, prompt, response_data)
 
         return {
             "success": True,
@@ -353,7 +719,7 @@ def send_conversation_message(
             "data": response_data,
             "project_id": project_id,
             "session_id": session_id,
-            "prompt_preview": prompt[:100] + "..." if len(prompt) > 100 else prompt
+            "prompt_preview": prompt_preview
         }
     except Exception as e:
         logger.error(f"❌ Error sending conversation message: {e}")
@@ -362,68 +728,89 @@ def send_conversation_message(
 
 # ===== MESSAGE MANAGEMENT TOOLS =====
 
-@mcp.tool()
-def get_message_details(project_id: int, session_id: str, prompt_id: int) -> Dict[str, Any]:
-    """Get detailed information for a specific message by ID."""
+@tool("messages")
+@shaped("message")
+async def get_message_details(project_id: int, session_id: str, prompt_id: int,
+                              refresh: bool = False) -> Dict[str, Any]:
+    """Get detailed information for a specific message by ID (served from the local transcript store when synced)."""
     try:
         logger.info(f"💬 Getting message {prompt_id} details from conversation {session_id}")
+        tenant = key_fingerprint(customgpt.api_key)
+
+        message = None if refresh else await transcript_store.get_message(tenant, prompt_id)
+        if message is not None:
+            return {
+                "success": True,
+                "data": {"status": "success", "data": message},
+                "source": "local",
+                "project_id": project_id,
+                "session_id": session_id,
+                "prompt_id": prompt_id
+            }
 
-        # Note: This may require custom API implementation as SDK doesn't expose message-specific methods
-        # The SDK's Conversation.messages() gets all messages, not individual message details
+        response = await customgpt.get_message(project_id, session_id, prompt_id)
+        response_data = extract_response_data(response)
+        if isinstance(response_data.get("data"), dict):
+            await transcript_store.upsert_messages(tenant, project_id, session_id, [response_data["data"]])
 
-        print(f"⚠️ Individual message details may require custom API implementation", file=sys.stderr)
         return {
-            "success": False,
-            "error": "Individual message details not available in current SDK version",
-            "note": "Use get_conversation_messages to get all messages, then filter by prompt_id",
+            "success": True,
+            "data": response_data,
+            "source": "upstream",
             "project_id": project_id,
             "session_id": session_id,
-            "prompt_id": prompt_id,
-            "alternative": "Use get_conversation_messages tool and search for the specific message"
+            "prompt_id": prompt_id
         }
     except Exception as e:
         logger.error(f"❌ Error getting message details: {e}")
         print(f"❌ Error in get_message_details: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id, "session_id": session_id, "prompt_id": prompt_id}
 
-@mcp.tool()
-def update_message_feedback(
-    project_id: int,
-    session_id: str,
-    prompt_id: int,
-    reaction: str  # "liked", "disliked", "neutral"
-) -> Dict[str, Any]:
+@tool("messages")
+async def update_message_feedback(project_id: int, session_id: str, prompt_id: int,
+                                  reaction: Reaction) -> Dict[str, Any]:
     """Update feedback reaction for a specific message (thumbs up/down)."""
     try:
         logger.info(f"👍 Updating feedback for message {prompt_id}: {reaction}")
 
-        # Note: This may require custom API implementation as SDK doesn't expose feedback methods
-        print(f"⚠️ Message feedback updates may require custom API implementation", file=sys.stderr)
+        response = await customgpt.update_message_feedback(project_id, session_id, prompt_id, reaction)
+        response_data = extract_response_data(response)
+
+        # Keep the local transcript copy in step, so get_message_details stays a local read
+        tenant = key_fingerprint(customgpt.api_key)
+        message = response_data.get("data")
+        if not (isinstance(message, dict) and message.get("id") is not None):
+            message = await transcript_store.get_message(tenant, prompt_id)
+            if message is not None:
+                message = {**message, "response_feedback": reaction}
+        if message is not None:
+            await transcript_store.upsert_messages(tenant, project_id, session_id, [message])
 
         return {
-            "success": False,
-            "error": "Message feedback updates not available in current SDK version",
-            "note": "The /api/v1/projects/{projectId}/conversations/{sessionId}/messages/{promptId}/feedback endpoint requires custom implementation",
+            "success": True,
+            "data": response_data,
             "project_id": project_id,
             "session_id": session_id,
             "prompt_id": prompt_id,
-            "reaction": reaction,
-            "sdk_limitation": "CustomGPT SDK doesn't expose message feedback methods"
+            "reaction": reaction
         }
     except Exception as e:
         logger.error(f"❌ Error updating message feedback: {e}")
         print(f"❌ Error in update_message_feedback: {e}", file=sys.stderr)
-        return {"success": False, "error": str(e), "project_id": project_id, "session_id": session_id, "prompt_id": prompt_id}
+        return {"success": False, "error": str(e), "project_id": project_id, "session_id": session_id,
+                "prompt_id": prompt_id}
 
 # ===== PAGE MANAGEMENT TOOLS =====
 
-@mcp.tool()
-def list_pages(project_id: int, page: int = 1, limit: int = 20) -> Dict[str, Any]:
+@tool("pages")
+@shaped("pages")
+@cached("pages")
+async def list_pages(project_id: int, page: int = 1, limit: int = 20) -> Dict[str, Any]:
     """List all pages for an agent."""
     try:
         logger.info(f"📄 Listing pages for agent {project_id}")
 
-        response = CustomGPT.Page.get(project_id, page=page, limit=limit)
+        response = await customgpt.list_pages(project_id, page=page, limit=limit)
         response_data = extract_response_data(response)
 
         return {
@@ -436,13 +823,14 @@ def list_pages(project_id: int, page: int = 1, limit: int = 20) -> Dict[str, Any
         print(f"❌ Error in list_pages: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def delete_page(project_id: int, page_id: int) -> Dict[str, Any]:
+@tool("pages")
+async def delete_page(project_id: int, page_id: int) -> Dict[str, Any]:
     """Delete a specific page from an agent."""
     try:
         logger.info(f"🗑️ Deleting page {page_id}")
 
-        response = CustomGPT.Page.delete(project_id, page_id)
+        response = await customgpt.delete_page(project_id, page_id)
+        invalidate_cache(project_id, "pages", "page_metadata")
         response_data = extract_response_data(response)
 
         return {
@@ -457,14 +845,24 @@ def delete_page(project_id: int, page_id: int) -> Dict[str, Any]:
         print(f"❌ Error in delete_page: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id, "page_id": page_id}
 
-@mcp.tool()
-def reindex_page(project_id: int, page_id: int) -> Dict[str, Any]:
-    """Reindex a specific page to refresh its content."""
+@tool("pages")
+async def reindex_page(project_id: int, page_id: int, background: bool = False,
+                       ctx: Context = None) -> Dict[str, Any]:
+    """Reindex a specific page to refresh its content. background=True returns a job id that tracks indexing."""
     try:
         logger.info(f"🔄 Reindexing page {page_id}")
 
-        response = CustomGPT.Page.reindex(project_id, page_id)
-        response_data = extract_response_data(response)
+        async def call() -> Dict[str, Any]:
+            response = await customgpt.reindex_page(project_id, page_id)
+            invalidate_cache(project_id, "pages", "page_metadata")
+            return extract_response_data(response)
+
+        if background:
+            job = start_job("reindex_page", {"project_id": project_id, "page_id": page_id},
+                            settle_job(call, lambda _: project_id), ctx)
+            return {"success": True, "job": job.snapshot(), "project_id": project_id, "page_id": page_id}
+
+        response_data = await call()
 
         return {
             "success": True,
@@ -480,13 +878,14 @@ def reindex_page(project_id: int, page_id: int) -> Dict[str, Any]:
 
 # ===== SOURCE MANAGEMENT TOOLS =====
 
-@mcp.tool()
-def list_sources(project_id: int) -> Dict[str, Any]:
+@tool("sources")
+@cached("sources")
+async def list_sources(project_id: int) -> Dict[str, Any]:
     """List all sources (sitemaps and files) for an agent."""
     try:
         logger.info(f"📚 Listing sources for agent {project_id}")
 
-        response = CustomGPT.Source.list(project_id)
+        response = await customgpt.list_sources(project_id)
         response_data = extract_response_data(response)
 
         return {
@@ -502,19 +901,18 @@ def list_sources(project_id: int) -> Dict[str, Any]:
 # ===== MISSING TOOLS - COMPLETE API COVERAGE =====
 
 # === AGENT SETTINGS ===
-@mcp.tool()
-def update_agent(project_id: int, project_name: Optional[str] = None,
+@tool("agents")
+async def update_agent(project_id: int, project_name: Optional[str] = None,
                 is_shared: Optional[bool] = None, are_licenses_allowed: Optional[bool] = None) -> Dict[str, Any]:
     """Update an agent's basic information."""
     try:
         logger.info(f"✏️ Updating agent {project_id}")
 
-        updates = {}
-        if project_name is not None: updates["project_name"] = project_name
-        if is_shared is not None: updates["is_shared"] = is_shared
-        if are_licenses_allowed is not None: updates["are_licenses_allowed"] = are_licenses_allowed
+        updates = PostProjectsByIdBody(project_name=project_name, is_shared=is_shared,
+                                       are_licenses_allowed=are_licenses_allowed).payload()
 
-        response = CustomGPT.Project.update(project_id, **updates)
+        response = await customgpt.update_project(project_id, **updates)
+        invalidate_cache(project_id, "agent")
         response_data = extract_response_data(response)
 
         return {
@@ -529,14 +927,21 @@ def update_agent(project_id: int, project_name: Optional[str] = None,
         print(f"❌ Error in update_agent: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def replicate_agent(project_id: int) -> Dict[str, Any]:
-    """Replicate/clone an agent by copying all its info, settings, sources and files."""
+@tool("agents")
+async def replicate_agent(project_id: int, background: bool = False, ctx: Context = None) -> Dict[str, Any]:
+    """Replicate/clone an agent by copying all its info, settings, sources and files. background=True returns a job id that tracks the copy's indexing."""
     try:
         logger.info(f"📋 Replicating agent {project_id}")
 
-        response = CustomGPT.Project.replicate(project_id)
-        response_data = extract_response_data(response)
+        async def call() -> Dict[str, Any]:
+            return extract_response_data(await customgpt.replicate_project(project_id))
+
+        if background:
+            job = start_job("replicate_agent", {"project_id": project_id},
+                            settle_job(call, lambda data: ((data or {}).get("data") or {}).get("id")), ctx)
+            return {"success": True, "job": job.snapshot(), "original_agent_id": project_id}
+
+        response_data = await call()
 
         return {
             "success": True,
@@ -549,40 +954,46 @@ def replicate_agent(project_id: int) -> Dict[str, Any]:
         print(f"❌ Error in replicate_agent: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def get_agent_settings(project_id: int) -> Dict[str, Any]:
+@tool("settings")
+@cached("settings")
+async def get_agent_settings(project_id: int) -> Dict[str, Any]:
     """Get configuration settings for an agent."""
     try:
         logger.info(f"⚙️ Getting settings for agent {project_id}")
-        response = CustomGPT.ProjectSettings.get(project_id)
+        response = await customgpt.get_project_settings(project_id)
         response_data = extract_response_data(response)
         return {"success": True, "data": response_data, "project_id": project_id}
     except Exception as e:
         logger.error(f"❌ Error getting agent settings: {e}")
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def update_agent_settings(
+# update_agent_settings arguments named differently in the spec, and ones the spec has no field for
+SETTINGS_RENAMES = {"chatbot_avatar": "chat_bot_avatar", "chatbot_background": "chat_bot_bg"}
+UNSUPPORTED_SETTINGS = ("chatbot_background_type", "chatbot_background_color", "private_deployment",
+                        "selling_url", "license_slug")
+
+@tool("settings")
+async def update_agent_settings(
     project_id: int,
     # Core Settings
     default_prompt: Optional[str] = None,
     persona_instructions: Optional[str] = None,
-    chatbot_model: Optional[str] = None,
-    response_source: Optional[str] = None,
-    chatbot_msg_lang: Optional[str] = None,
+    chatbot_model: Optional[ChatbotModel] = None,
+    response_source: Optional[ResponseSource] = None,
+    chatbot_msg_lang: Optional[ChatbotMsgLang] = None,
     # Appearance Settings
     chatbot_color: Optional[str] = None,
     chatbot_toolbar_color: Optional[str] = None,
     chatbot_title: Optional[str] = None,
     chatbot_title_color: Optional[str] = None,
-    chatbot_avatar: Optional[str] = None,
-    chatbot_background_type: Optional[str] = None,
-    chatbot_background: Optional[str] = None,
-    chatbot_background_color: Optional[str] = None,
+    chatbot_avatar: Optional[str] = None,  # sent as chat_bot_avatar
+    chatbot_background_type: Optional[str] = None,  # not in the settings API; rejected
+    chatbot_background: Optional[str] = None,  # sent as chat_bot_bg
+    chatbot_background_color: Optional[str] = None,  # not in the settings API; rejected
     # Citation Settings
-    enable_citations: Optional[int] = None,
-    citations_view_type: Optional[str] = None,
-    image_citation_display: Optional[str] = None,
+    enable_citations: Optional[EnableCitations] = None,
+    citations_view_type: Optional[CitationsViewType] = None,
+    image_citation_display: Optional[ImageCitationDisplay] = None,
     citations_answer_source_label_msg: Optional[str] = None,
     citations_sources_label_msg: Optional[str] = None,
     # UI Messages
@@ -597,7 +1008,7 @@ def update_agent_settings(
     enable_feedbacks: Optional[bool] = None,
     is_loading_indicator_enabled: Optional[bool] = None,
     remove_branding: Optional[bool] = None,
-    private_deployment: Optional[bool] = None,
+    private_deployment: Optional[bool] = None,  # not in the settings API; rejected
     enable_recaptcha_for_public_chatbots: Optional[bool] = None,
     is_selling_enabled: Optional[bool] = None,
     can_share_conversation: Optional[bool] = None,
@@ -609,86 +1020,34 @@ def update_agent_settings(
     markdown_enabled: Optional[bool] = None,
     spotlight_avatar_enabled: Optional[bool] = None,
     # Advanced Settings
-    selling_url: Optional[str] = None,
-    license_slug: Optional[bool] = None,
+    selling_url: Optional[str] = None,  # not in the settings API; rejected
+    license_slug: Optional[bool] = None,  # not in the settings API; rejected
     input_field_addendum: Optional[str] = None,
     user_avatar: Optional[str] = None,
     spotlight_avatar: Optional[str] = None,
-    spotlight_avatar_shape: Optional[str] = None,
-    spotlight_avatar_type: Optional[str] = None,
-    user_avatar_orientation: Optional[str] = None,
-    conversation_retention_period: Optional[str] = None,
+    spotlight_avatar_shape: Optional[SpotlightAvatarShape] = None,
+    spotlight_avatar_type: Optional[SpotlightAvatarType] = None,
+    user_avatar_orientation: Optional[UserAvatarOrientation] = None,
+    conversation_retention_period: Optional[ConversationRetentionPeriod] = None,
     conversation_retention_days: Optional[int] = None
 ) -> Dict[str, Any]:
     """Update comprehensive agent settings with all available configuration options."""
+    fields = {name: value for name, value in locals().items() if name != "project_id"}
     try:
         logger.info(f"⚙️ Updating comprehensive settings for agent {project_id}")
 
-        # Build settings payload with all possible fields
-        settings = {}
-
-        # Core Settings
-        if default_prompt is not None: settings["default_prompt"] = default_prompt
-        if persona_instructions is not None: settings["persona_instructions"] = persona_instructions
-        if chatbot_model is not None: settings["chatbot_model"] = chatbot_model
-        if response_source is not None: settings["response_source"] = response_source
-        if chatbot_msg_lang is not None: settings["chatbot_msg_lang"] = chatbot_msg_lang
-
-        # Appearance Settings
-        if chatbot_color is not None: settings["chatbot_color"] = chatbot_color
-        if chatbot_toolbar_color is not None: settings["chatbot_toolbar_color"] = chatbot_toolbar_color
-        if chatbot_title is not None: settings["chatbot_title"] = chatbot_title
-        if chatbot_title_color is not None: settings["chatbot_title_color"] = chatbot_title_color
-        if chatbot_avatar is not None: settings["chatbot_avatar"] = chatbot_avatar
-        if chatbot_background_type is not None: settings["chatbot_background_type"] = chatbot_background_type
-        if chatbot_background is not None: settings["chatbot_background"] = chatbot_background
-        if chatbot_background_color is not None: settings["chatbot_background_color"] = chatbot_background_color
-
-        # Citation Settings
-        if enable_citations is not None: settings["enable_citations"] = enable_citations
-        if citations_view_type is not None: settings["citations_view_type"] = citations_view_type
-        if image_citation_display is not None: settings["image_citation_display"] = image_citation_display
-        if citations_answer_source_label_msg is not None: settings["citations_answer_source_label_msg"] = citations_answer_source_label_msg
-        if citations_sources_label_msg is not None: settings["citations_sources_label_msg"] = citations_sources_label_msg
-
-        # UI Messages
-        if no_answer_message is not None: settings["no_answer_message"] = no_answer_message
-        if ending_message is not None: settings["ending_message"] = ending_message
-        if hang_in_there_msg is not None: settings["hang_in_there_msg"] = hang_in_there_msg
-        if chatbot_siesta_msg is not None: settings["chatbot_siesta_msg"] = chatbot_siesta_msg
-        if try_asking_questions_msg is not None: settings["try_asking_questions_msg"] = try_asking_questions_msg
-        if view_more_msg is not None: settings["view_more_msg"] = view_more_msg
-        if view_less_msg is not None: settings["view_less_msg"] = view_less_msg
-
-        # Feature Flags
-        if enable_feedbacks is not None: settings["enable_feedbacks"] = enable_feedbacks
-        if is_loading_indicator_enabled is not None: settings["is_loading_indicator_enabled"] = is_loading_indicator_enabled
-        if remove_branding is not None: settings["remove_branding"] = remove_branding
-        if private_deployment is not None: settings["private_deployment"] = private_deployment
-        if enable_recaptcha_for_public_chatbots is not None: settings["enable_recaptcha_for_public_chatbots"] = enable_recaptcha_for_public_chatbots
-        if is_selling_enabled is not None: settings["is_selling_enabled"] = is_selling_enabled
-        if can_share_conversation is not None: settings["can_share_conversation"] = can_share_conversation
-        if can_export_conversation is not None: settings["can_export_conversation"] = can_export_conversation
-        if hide_sources_from_responses is not None: settings["hide_sources_from_responses"] = hide_sources_from_responses
-        if enable_inline_citations_api is not None: settings["enable_inline_citations_api"] = enable_inline_citations_api
-        if conversation_time_window is not None: settings["conversation_time_window"] = conversation_time_window
-        if enable_agent_knowledge_base_awareness is not None: settings["enable_agent_knowledge_base_awareness"] = enable_agent_knowledge_base_awareness
-        if markdown_enabled is not None: settings["markdown_enabled"] = markdown_enabled
-        if spotlight_avatar_enabled is not None: settings["spotlight_avatar_enabled"] = spotlight_avatar_enabled
-
-        # Advanced Settings
-        if selling_url is not None: settings["selling_url"] = selling_url
-        if license_slug is not None: settings["license_slug"] = license_slug
-        if input_field_addendum is not None: settings["input_field_addendum"] = input_field_addendum
-        if user_avatar is not None: settings["user_avatar"] = user_avatar
-        if spotlight_avatar is not None: settings["spotlight_avatar"] = spotlight_avatar
-        if spotlight_avatar_shape is not None: settings["spotlight_avatar_shape"] = spotlight_avatar_shape
-        if spotlight_avatar_type is not None: settings["spotlight_avatar_type"] = spotlight_avatar_type
-        if user_avatar_orientation is not None: settings["user_avatar_orientation"] = user_avatar_orientation
-        if conversation_retention_period is not None: settings["conversation_retention_period"] = conversation_retention_period
-        if conversation_retention_days is not None: settings["conversation_retention_days"] = conversation_retention_days
-
-        response = CustomGPT.ProjectSettings.update(project_id, **settings)
+        unsupported = [name for name in UNSUPPORTED_SETTINGS if fields.pop(name) is not None]
+        if unsupported:
+            return {"success": False, "project_id": project_id,
+                    "error": f"Deprecated: the CustomGPT settings API has no field for {', '.join(unsupported)}"}
+        for name, spec_name in SETTINGS_RENAMES.items():
+            fields[spec_name] = fields.pop(name)
+
+        # Validated against the spec's settings schema; unset (None) fields are left out
+        settings = PostProjectsSettingsBody.model_validate(fields).payload()
+
+        response = await customgpt.update_project_settings(project_id, **settings)
+        invalidate_cache(project_id, "settings")
         response_data = extract_response_data(response)
 
         return {
@@ -704,138 +1063,121 @@ def update_agent_settings(
         print(f"❌ Error in update_agent_settings: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id}
 
-# === AGENT LICENSES (Complete Implementation) ===
-@mcp.tool()
-def list_agent_licenses(project_id: int) -> Dict[str, Any]:
+# === AGENT LICENSES ===
+@tool("licenses")
+async def list_agent_licenses(project_id: int) -> Dict[str, Any]:
     """List all licenses for an agent."""
     try:
         logger.info(f"📜 Listing licenses for agent {project_id}")
-        # Note: License endpoints may need custom implementation as SDK doesn't have dedicated License class
-        print(f"⚠️ License functionality may require custom API calls - SDK doesn't expose License class", file=sys.stderr)
-        return {
-            "success": False,
-            "error": "License management not available in current SDK version",
-            "note": "CustomGPT SDK doesn't expose License class - may need custom API implementation",
-            "project_id": project_id
-        }
+        response = await customgpt.list_licenses(project_id)
+        response_data = extract_response_data(response)
+        return {"success": True, "data": response_data, "project_id": project_id}
     except Exception as e:
         logger.error(f"❌ Error listing licenses: {e}")
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def create_agent_license(project_id: int, name: str) -> Dict[str, Any]:
+@tool("licenses")
+async def create_agent_license(project_id: int, name: str) -> Dict[str, Any]:
     """Create a new license for an agent."""
     try:
         logger.info(f"📜 Creating license for agent {project_id}")
-        print(f"⚠️ License creation not available in current SDK", file=sys.stderr)
-        return {
-            "success": False,
-            "error": "License creation not available in current SDK version",
-            "project_id": project_id,
-            "license_name": name
-        }
+        response = await customgpt.create_license(project_id, name)
+        response_data = extract_response_data(response)
+        return {"success": True, "data": response_data, "project_id": project_id, "license_name": name}
     except Exception as e:
         logger.error(f"❌ Error creating license: {e}")
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def get_license_details(project_id: int, license_id: str) -> Dict[str, Any]:
+@tool("licenses")
+async def get_license_details(project_id: int, license_id: str) -> Dict[str, Any]:
     """Get details for a specific license."""
     try:
         logger.info(f"📜 Getting license {license_id} for agent {project_id}")
-        return {
-            "success": False,
-            "error": "License details not available in current SDK version",
-            "project_id": project_id,
-            "license_id": license_id
-        }
+        response = await customgpt.get_license(project_id, license_id)
+        response_data = extract_response_data(response)
+        return {"success": True, "data": response_data, "project_id": project_id, "license_id": license_id}
     except Exception as e:
         logger.error(f"❌ Error getting license details: {e}")
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def update_license(project_id: int, license_id: str, name: str) -> Dict[str, Any]:
+@tool("licenses")
+async def update_license(project_id: int, license_id: str, name: str) -> Dict[str, Any]:
     """Update a license name."""
     try:
         logger.info(f"📜 Updating license {license_id}")
-        return {
-            "success": False,
-            "error": "License updates not available in current SDK version",
-            "project_id": project_id,
-            "license_id": license_id
-        }
+        response = await customgpt.update_license(project_id, license_id, name)
+        response_data = extract_response_data(response)
+        return {"success": True, "data": response_data, "project_id": project_id, "license_id": license_id}
     except Exception as e:
         logger.error(f"❌ Error updating license: {e}")
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def delete_license(project_id: int, license_id: str) -> Dict[str, Any]:
+@tool("licenses")
+async def delete_license(project_id: int, license_id: str) -> Dict[str, Any]:
     """Delete a license."""
     try:
         logger.info(f"📜 Deleting license {license_id}")
-        return {
-            "success": False,
-            "error": "License deletion not available in current SDK version",
-            "project_id": project_id,
-            "license_id": license_id
-        }
+        response = await customgpt.delete_license(project_id, license_id)
+        response_data = extract_response_data(response)
+        return {"success": True, "data": response_data, "project_id": project_id, "license_id": license_id}
     except Exception as e:
         logger.error(f"❌ Error deleting license: {e}")
         return {"success": False, "error": str(e), "project_id": project_id}
 
 # === REPORTS & ANALYTICS ===
-@mcp.tool()
-def get_traffic_report(project_id: int) -> Dict[str, Any]:
-    """Get traffic analytics for an agent."""
+@tool("reports")
+async def get_traffic_report(project_id: int, filters: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Get traffic analytics for an agent; filters default to sources."""
     try:
         logger.info(f"📊 Getting traffic report for agent {project_id}")
-        response = CustomGPT.ReportsAnalytics.traffic(project_id)
+        filters = filters or REPORT_FILTERS["traffic"]
+        response = await customgpt.get_traffic_report(project_id, filters=filters)
         response_data = extract_response_data(response)
-        return {"success": True, "data": response_data, "project_id": project_id}
+        return {"success": True, "data": response_data, "project_id": project_id, "filters": filters}
     except Exception as e:
         logger.error(f"❌ Error getting traffic report: {e}")
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def get_queries_report(project_id: int) -> Dict[str, Any]:
-    """Get queries analytics for an agent."""
+@tool("reports")
+async def get_queries_report(project_id: int, filters: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Get queries analytics for an agent; filters default to total, query_status."""
     try:
         logger.info(f"❓ Getting queries report for agent {project_id}")
-        response = CustomGPT.ReportsAnalytics.queries(project_id)
+        filters = filters or REPORT_FILTERS["queries"]
+        response = await customgpt.get_queries_report(project_id, filters=filters)
         response_data = extract_response_data(response)
-        return {"success": True, "data": response_data, "project_id": project_id}
+        return {"success": True, "data": response_data, "project_id": project_id, "filters": filters}
     except Exception as e:
         logger.error(f"❌ Error getting queries report: {e}")
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def get_conversations_report(project_id: int) -> Dict[str, Any]:
-    """Get conversations analytics for an agent."""
+@tool("reports")
+async def get_conversations_report(project_id: int, filters: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Get conversations analytics for an agent; filters default to total, average_queries_per_conversation."""
     try:
         logger.info(f"💬 Getting conversations report for agent {project_id}")
-        response = CustomGPT.ReportsAnalytics.conversations(project_id)
+        filters = filters or REPORT_FILTERS["conversations"]
+        response = await customgpt.get_conversations_report(project_id, filters=filters)
         response_data = extract_response_data(response)
-        return {"success": True, "data": response_data, "project_id": project_id}
+        return {"success": True, "data": response_data, "project_id": project_id, "filters": filters}
     except Exception as e:
         logger.error(f"❌ Error getting conversations report: {e}")
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def get_analysis_report(project_id: int, interval: Optional[str] = None) -> Dict[str, Any]:
+@tool("reports")
+async def get_analysis_report(project_id: int, interval: Optional[str] = None,
+                              filters: Optional[List[str]] = None) -> Dict[str, Any]:
     """Get graph-ready analysis data with various metrics (queries, conversations, queries per conversation)."""
     try:
         logger.info(f"📈 Getting analysis report for agent {project_id} (interval: {interval or 'default'})")
 
         # Build parameters
-        params = {}
+        filters = filters or REPORT_FILTERS["analysis"]
+        params = {"filters": filters}
         if interval:
             params["interval"] = interval
 
-        if params:
-            response = CustomGPT.ReportsAnalytics.analysis(project_id, **params)
-        else:
-            response = CustomGPT.ReportsAnalytics.analysis(project_id)
-
+        response = await customgpt.get_analysis_report(project_id, **params)
         response_data = extract_response_data(response)
 
         return {
@@ -843,6 +1185,7 @@ def get_analysis_report(project_id: int, interval: Optional[str] = None) -> Dict
             "data": response_data,
             "project_id": project_id,
             "interval": interval,
+            "filters": filters,
             "note": "Returns graph-ready data with queries, conversations, and queries_per_conversation metrics"
         }
     except Exception as e:
@@ -850,73 +1193,139 @@ def get_analysis_report(project_id: int, interval: Optional[str] = None) -> Dict
         print(f"❌ Error in get_analysis_report: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def get_intelligence_report(project_id: int, page: int = 1, limit: int = 100) -> Dict[str, Any]:
+@tool("reports")
+@shaped("intelligence")
+async def get_intelligence_report(project_id: int, page: int = 1, limit: int = 100) -> Dict[str, Any]:
     """Get customer intelligence analytics data including user interactions, emotions, intents, and behavioral analytics."""
     try:
         logger.info(f"🧠 Getting customer intelligence report for agent {project_id}")
 
-        # Check if SDK has intelligence method, otherwise note limitation
-        if hasattr(CustomGPT.ReportsAnalytics, 'intelligence'):
-            response = CustomGPT.ReportsAnalytics.intelligence(project_id, page=page, limit=limit)
-            response_data = extract_response_data(response)
-            return {"success": True, "data": response_data, "project_id": project_id}
-        else:
-            # Intelligence endpoint not available in SDK - inform user
-            print(f"⚠️ Customer intelligence report not available in current SDK version", file=sys.stderr)
-            return {
-                "success": False,
-                "error": "Customer intelligence report not available in current SDK version",
-                "note": "The /api/v1/projects/{projectId}/reports/intelligence endpoint requires custom implementation",
-                "sdk_limitation": "CustomGPT SDK doesn't expose intelligence method",
-                "project_id": project_id,
-                "available_reports": ["traffic", "queries", "conversations", "analysis"]
-            }
+        response = await customgpt.get_intelligence_report(project_id, page=page, limit=limit)
+        response_data = extract_response_data(response)
+        return {"success": True, "data": response_data, "project_id": project_id}
     except Exception as e:
         logger.error(f"❌ Error getting intelligence report: {e}")
         print(f"❌ Error in get_intelligence_report: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id}
 
+# === PORTFOLIO ANALYTICS ===
+PORTFOLIO_MAX_AGENTS = int(os.getenv("PORTFOLIO_MAX_AGENTS", "5000"))
+PORTFOLIO_MAX_CONCURRENCY = int(os.getenv("PORTFOLIO_MAX_CONCURRENCY", "16"))
+
+async def fetch_agent_reports(project_id: int, interval: Optional[str], intelligence_limit: int,
+                              semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """All report bodies of one agent, plus the error of each report that failed."""
+    calls = {
+        "traffic": lambda: customgpt.get_traffic_report(project_id, filters=REPORT_FILTERS["traffic"]),
+        "queries": lambda: customgpt.get_queries_report(project_id, filters=REPORT_FILTERS["queries"]),
+        "conversations": lambda: customgpt.get_conversations_report(
+            project_id, filters=REPORT_FILTERS["conversations"]),
+        "analysis": lambda: customgpt.get_analysis_report(
+            project_id, filters=REPORT_FILTERS["analysis"], interval=interval),
+    }
+    if intelligence_limit > 0:
+        calls["intelligence"] = lambda: customgpt.get_intelligence_report(project_id, page=1,
+                                                                          limit=intelligence_limit)
+
+    async def fetch(call):
+        async with semaphore:
+            return extract_response_data(await call())
+
+    bodies = await asyncio.gather(*[fetch(call) for call in calls.values()], return_exceptions=True)
+    reports, errors = {}, {}
+    for name, body in zip(calls, bodies):
+        if isinstance(body, BaseException):
+            errors[name] = str(body)
+        else:
+            reports[name] = body
+    return {"project_id": project_id, "reports": reports, "errors": errors}
+
+@tool("reports")
+async def portfolio_report(project_ids: Optional[List[int]] = None,
+                           interval: Optional[Literal["daily", "weekly"]] = None,
+                           include_intelligence: bool = False, intelligence_limit: int = 100,
+                           top_n: int = 10, percentiles: Optional[List[float]] = None,
+                           include_columns: bool = False, ctx: Context = None) -> Dict[str, Any]:
+    """Roll traffic, query, conversation and analysis reports of many agents (default: all) into one summary with totals, percentiles, top agents and time series."""
+    try:
+        started = time.perf_counter()
+        if project_ids is None:
+            async def fetch(page):
+                return extract_response_data(await customgpt.list_projects(page=page))
+
+            async def fetch_items(page):
+                return await customgpt.list_projects_items(page=page, fields=["id"])
+
+            listing = await fetch_all_pages(fetch, ("data",), PAGINATION_MAX_CONCURRENCY,
+                                            PORTFOLIO_MAX_AGENTS + 1, ["id"], fetch_items)
+            project_ids = [agent["id"] for agent in listing["data"]["data"]]
+        project_ids = list(dict.fromkeys(project_ids))
+        if not project_ids:
+            return {"success": False, "error": "No agents to report on"}
+        if len(project_ids) > PORTFOLIO_MAX_AGENTS:
+            return {"success": False, "error": f"Too many agents ({len(project_ids)} > {PORTFOLIO_MAX_AGENTS})"}
+
+        logger.info(f"📊 Building portfolio report for {len(project_ids)} agents")
+        semaphore = asyncio.Semaphore(PORTFOLIO_MAX_CONCURRENCY)
+        limit = max(1, min(intelligence_limit, 100)) if include_intelligence else 0
+        portfolio = Portfolio()
+        step = max(1, len(project_ids) // 20)
+        for done, future in enumerate(asyncio.as_completed(
+                [fetch_agent_reports(pid, interval, limit, semaphore) for pid in project_ids]), 1):
+            item = await future
+            if item["reports"]:
+                portfolio.add(item["project_id"], item["reports"])
+            if item["errors"]:
+                portfolio.add_failure(item["project_id"],
+                                      "; ".join(f"{name}: {error}" for name, error in item["errors"].items()))
+            if ctx is not None and (done % step == 0 or done == len(project_ids)):
+                await ctx.report_progress(done, total=len(project_ids), message=f"{done} agents fetched")
+
+        summary = portfolio.summary(max(1, top_n), percentiles or (50, 90, 99), include_columns)
+        summary["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return {"success": summary["agents"] > 0, "data": summary, "interval": interval}
+    except Exception as e:
+        logger.error(f"❌ Error building portfolio report: {e}")
+        return {"success": False, "error": str(e)}
+
 # === PLUGIN MANAGEMENT ===
-@mcp.tool()
-def list_plugins(project_id: int) -> Dict[str, Any]:
+@tool("plugins")
+async def list_plugins(project_id: int) -> Dict[str, Any]:
     """List plugins for an agent."""
     try:
         logger.info(f"🔌 Listing plugins for agent {project_id}")
-        response = CustomGPT.ProjectPlugins.get(project_id)
+        response = await customgpt.list_plugins(project_id)
         response_data = extract_response_data(response)
         return {"success": True, "data": response_data, "project_id": project_id}
     except Exception as e:
         logger.error(f"❌ Error listing plugins: {e}")
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def create_plugin(project_id: int, model_name: str, human_name: str, description: str) -> Dict[str, Any]:
+@tool("plugins")
+async def create_plugin(project_id: int, model_name: str, human_name: str, description: str) -> Dict[str, Any]:
     """Create a plugin for an agent."""
     try:
         logger.info(f"🔌 Creating plugin for agent {project_id}")
-        response = CustomGPT.ProjectPlugins.create(project_id, model_name=model_name,
-                                                  human_name=human_name, description=description)
+        plugin = PostProjectsPluginsBody(model_name=model_name, human_name=human_name,
+                                         description=description).payload()
+        response = await customgpt.create_plugin(project_id, **plugin)
         response_data = extract_response_data(response)
         return {"success": True, "data": response_data, "project_id": project_id}
     except Exception as e:
         logger.error(f"❌ Error creating plugin: {e}")
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def update_plugin(project_id: int, model_name: Optional[str] = None, human_name: Optional[str] = None,
+@tool("plugins")
+async def update_plugin(project_id: int, model_name: Optional[str] = None, human_name: Optional[str] = None,
                  description: Optional[str] = None, is_active: Optional[bool] = None) -> Dict[str, Any]:
     """Update a plugin for an agent."""
     try:
         logger.info(f"🔌 Updating plugin for agent {project_id}")
 
-        updates = {}
-        if model_name: updates["model_name"] = model_name
-        if human_name: updates["human_name"] = human_name
-        if description: updates["description"] = description
-        if is_active is not None: updates["is_active"] = is_active
+        updates = PutProjectsPluginsBody(model_name=model_name, human_name=human_name,
+                                         description=description, is_active=is_active).payload()
 
-        response = CustomGPT.ProjectPlugins.update(project_id, **updates)
+        response = await customgpt.update_plugin(project_id, **updates)
         response_data = extract_response_data(response)
 
         return {
@@ -932,43 +1341,43 @@ def update_plugin(project_id: int, model_name: Optional[str] = None, human_name:
         return {"success": False, "error": str(e), "project_id": project_id}
 
 # === SOURCE MANAGEMENT (Extended) ===
-@mcp.tool()
-def create_source(project_id: int, sitemap_path: Optional[str] = None) -> Dict[str, Any]:
+@tool("sources")
+async def create_source(project_id: int, sitemap_path: Optional[str] = None) -> Dict[str, Any]:
     """Create a new source for an agent."""
     try:
         logger.info(f"📚 Creating source for agent {project_id}")
-        source_data = {}
-        if sitemap_path: source_data["sitemap_path"] = sitemap_path
+        source_data = PostProjectsSourcesBody(sitemap_path=sitemap_path).payload()
 
-        response = CustomGPT.Source.create(project_id, **source_data)
+        response = await customgpt.create_source(project_id, **source_data)
+        invalidate_cache(project_id, "sources")
         response_data = extract_response_data(response)
         return {"success": True, "data": response_data, "project_id": project_id}
     except Exception as e:
         logger.error(f"❌ Error creating source: {e}")
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def update_source_settings(
+@tool("sources")
+async def update_source_settings(
     project_id: int,
     source_id: int,
     executive_js: Optional[bool] = None,
-    data_refresh_frequency: Optional[str] = None,
+    data_refresh_frequency: Optional[DataRefreshFrequency] = None,
     create_new_pages: Optional[bool] = None,
     remove_unexist_pages: Optional[bool] = None,
-    refresh_existing_pages: Optional[str] = None
+    refresh_existing_pages: Optional[RefreshExistingPages] = None
 ) -> Dict[str, Any]:
     """Update settings for a specific source (sitemap or upload)."""
     try:
         logger.info(f"⚙️ Updating source {source_id} settings for agent {project_id}")
 
-        settings = {}
-        if executive_js is not None: settings["executive_js"] = executive_js
-        if data_refresh_frequency is not None: settings["data_refresh_frequency"] = data_refresh_frequency
-        if create_new_pages is not None: settings["create_new_pages"] = create_new_pages
-        if remove_unexist_pages is not None: settings["remove_unexist_pages"] = remove_unexist_pages
-        if refresh_existing_pages is not None: settings["refresh_existing_pages"] = refresh_existing_pages
+        settings = PutProjectsSourcesByIdBody(
+            executive_js=executive_js, data_refresh_frequency=data_refresh_frequency,
+            create_new_pages=create_new_pages, remove_unexist_pages=remove_unexist_pages,
+            refresh_existing_pages=refresh_existing_pages,
+        ).payload()
 
-        response = CustomGPT.Source.update(project_id, source_id, **settings)
+        response = await customgpt.update_source(project_id, source_id, **settings)
+        invalidate_cache(project_id, "sources")
         response_data = extract_response_data(response)
 
         return {
@@ -984,92 +1393,204 @@ def update_source_settings(
         print(f"❌ Error in update_source_settings: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "project_id": project_id, "source_id": source_id}
 
-@mcp.tool()
-def delete_source(project_id: int, source_id: int) -> Dict[str, Any]:
+@tool("sources")
+async def delete_source(project_id: int, source_id: int) -> Dict[str, Any]:
     """Delete a source from an agent."""
     try:
         logger.info(f"🗑️ Deleting source {source_id} from agent {project_id}")
-        response = CustomGPT.Source.delete(project_id, source_id)
+        response = await customgpt.delete_source(project_id, source_id)
+        invalidate_cache(project_id, "sources", "pages")
         response_data = extract_response_data(response)
         return {"success": True, "data": response_data, "project_id": project_id}
     except Exception as e:
         logger.error(f"❌ Error deleting source: {e}")
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def synchronize_source(project_id: int, source_id: int) -> Dict[str, Any]:
-    """Synchronize/refresh a source."""
+@tool("sources")
+async def synchronize_source(project_id: int, source_id: int, background: bool = False,
+                             ctx: Context = None) -> Dict[str, Any]:
+    """Synchronize/refresh a source. background=True returns a job id that tracks re-indexing."""
     try:
         logger.info(f"🔄 Synchronizing source {source_id}")
-        response = CustomGPT.Source.synchronize(project_id, source_id)
-        response_data = extract_response_data(response)
+
+        async def call() -> Dict[str, Any]:
+            response = await customgpt.synchronize_source(project_id, source_id)
+            invalidate_cache(project_id, "sources", "pages")
+            return extract_response_data(response)
+
+        if background:
+            job = start_job("synchronize_source", {"project_id": project_id, "source_id": source_id},
+                            settle_job(call, lambda _: project_id), ctx)
+            return {"success": True, "job": job.snapshot(), "project_id": project_id}
+
+        response_data = await call()
         return {"success": True, "data": response_data, "project_id": project_id}
     except Exception as e:
         logger.error(f"❌ Error synchronizing source: {e}")
         return {"success": False, "error": str(e), "project_id": project_id}
 
+# === BULK INGESTION ===
+INGEST_MAX_SITEMAPS = int(os.getenv("INGEST_MAX_SITEMAPS", "1000"))
+INGEST_MAX_CONCURRENCY = int(os.getenv("INGEST_MAX_CONCURRENCY", "8"))
+
+async def fetch_sources(project_id: int) -> Dict[str, Any]:
+    return extract_response_data(await customgpt.list_sources(project_id))
+
+async def submit_source(project_id: int, **fields: Any) -> Dict[str, Any]:
+    response = await customgpt.create_source(project_id, **fields)
+    invalidate_cache(project_id, "sources", "pages")
+    return extract_response_data(response)
+
+async def fetch_pages_page(project_id: int, page: int = 1, **params: Any) -> Dict[str, Any]:
+    return extract_response_data(await customgpt.list_pages(project_id, page=page, **params))
+
+@tool("sources")
+async def bulk_ingest(project_id: int, sitemaps: List[str], max_concurrency: int = 4,
+                      poll_min_seconds: float = 5.0, poll_max_seconds: float = 60.0,
+                      max_wait_seconds: float = 3600.0, wait: bool = False,
+                      ctx: Context = None) -> Dict[str, Any]:
+    """Add many sitemaps to an agent in parallel and track indexing. Returns a job id for get_job_status; wait=True blocks and reports progress."""
+    try:
+        if not sitemaps:
+            return {"success": False, "error": "sitemaps is empty", "project_id": project_id}
+        if len(sitemaps) > INGEST_MAX_SITEMAPS:
+            return {"success": False, "error": f"Too many sitemaps ({len(sitemaps)} > {INGEST_MAX_SITEMAPS})",
+                    "project_id": project_id}
+
+        async def report(job: Job) -> None:
+            pages = job.progress.get("pages") or {}
+            await ctx.report_progress(pages.get("indexed", 0), total=pages.get("total") or None,
+                                      message=f"{job.state}: {pages}")
+
+        on_change = report if wait and ctx is not None else None
+        job = start_job("bulk_ingest", {"project_id": project_id, "sitemaps": len(sitemaps)},
+                        lambda job: run_ingest(
+                            job, project_id, sitemaps, fetch_sources, submit_source, fetch_pages_page,
+                            max_concurrency=max(1, min(max_concurrency, INGEST_MAX_CONCURRENCY)),
+                            poll_min=max(1.0, poll_min_seconds), poll_max=max(poll_min_seconds, poll_max_seconds),
+                            max_wait=max_wait_seconds, on_change=on_change),
+                        ctx)
+        logger.info(f"📥 Bulk ingest {job.id}: {len(sitemaps)} sitemaps for agent {project_id}")
+        if wait:
+            await asyncio.shield(job.task)
+        return {"success": job.state != "failed", "data": job.snapshot()}
+    except Exception as e:
+        logger.error(f"❌ Error starting bulk ingest: {e}")
+        return {"success": False, "error": str(e), "project_id": project_id}
+
+# === BACKGROUND JOBS ===
+@tool("jobs")
+async def get_job_status(job_id: str) -> Dict[str, Any]:
+    """Get the state, progress and result of a background job."""
+    try:
+        job = await job_manager.get(key_fingerprint(customgpt.api_key), job_id)
+        if job is None:
+            return {"success": False, "error": f"Job '{job_id}' not found"}
+        return {"success": True, "data": job.snapshot()}
+    except Exception as e:
+        logger.error(f"❌ Error getting job status: {e}")
+        return {"success": False, "error": str(e), "job_id": job_id}
+
+async def job_resource(job_id: str) -> Dict[str, Any]:
+    """Snapshot of a background job; clients are sent an update for it when the job finishes."""
+    job = await job_manager.get(key_fingerprint(customgpt.api_key), job_id)
+    if job is None:
+        raise ValueError(f"Job '{job_id}' not found")
+    return job.snapshot()
+
+if group_enabled("jobs"):
+    mcp.resource("job://{job_id}", mime_type="application/json")(job_resource)
+
+@tool("jobs")
+async def list_jobs(state: Optional[str] = None, kind: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+    """List recent background jobs, newest first, optionally filtered by state or kind."""
+    try:
+        jobs = await job_manager.list(key_fingerprint(customgpt.api_key), state, kind, max(1, min(limit, 500)))
+        return {"success": True, "data": [job.snapshot() for job in jobs], "stats": job_manager.stats()}
+    except Exception as e:
+        logger.error(f"❌ Error listing jobs: {e}")
+        return {"success": False, "error": str(e)}
+
+@tool("jobs")
+async def cancel_job(job_id: str) -> Dict[str, Any]:
+    """Cancel a queued or running background job. Work already done upstream is kept."""
+    try:
+        job = await job_manager.get(key_fingerprint(customgpt.api_key), job_id)
+        if job is None:
+            return {"success": False, "error": f"Job '{job_id}' not found"}
+        if not job.done and not job.local:
+            return {"success": False, "error": f"Job '{job_id}' is {job.state} in another server process and "
+                                              "can't be cancelled from here", "data": job.snapshot()}
+        await job_manager.cancel(job)
+        logger.info(f"🛑 Job {job_id} {job.state}")
+        return {"success": True, "data": job.snapshot()}
+    except Exception as e:
+        logger.error(f"❌ Error cancelling job: {e}")
+        return {"success": False, "error": str(e), "job_id": job_id}
+
 # === PAGE METADATA ===
-@mcp.tool()
-def get_page_metadata(project_id: int, page_id: int) -> Dict[str, Any]:
+@tool("pages")
+@shaped("page_metadata")
+@cached("page_metadata")
+async def get_page_metadata(project_id: int, page_id: int) -> Dict[str, Any]:
     """Get metadata for a specific page."""
     try:
         logger.info(f"📄 Getting metadata for page {page_id}")
-        response = CustomGPT.PageMetadata.get(project_id, page_id)
+        response = await customgpt.get_page_metadata(project_id, page_id)
         response_data = extract_response_data(response)
         return {"success": True, "data": response_data, "project_id": project_id}
     except Exception as e:
         logger.error(f"❌ Error getting page metadata: {e}")
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def update_page_metadata(project_id: int, page_id: int, title: Optional[str] = None,
+@tool("pages")
+async def update_page_metadata(project_id: int, page_id: int, title: Optional[str] = None,
                         description: Optional[str] = None) -> Dict[str, Any]:
     """Update metadata for a specific page."""
     try:
         logger.info(f"✏️ Updating metadata for page {page_id}")
-        metadata = {}
-        if title: metadata["title"] = title
-        if description: metadata["description"] = description
+        metadata = PutProjectsPagesMetadataBody(title=title, description=description).payload()
 
-        response = CustomGPT.PageMetadata.update(project_id, page_id, **metadata)
+        response = await customgpt.update_page_metadata(project_id, page_id, **metadata)
+        invalidate_cache(project_id, "page_metadata", "pages")
         response_data = extract_response_data(response)
         return {"success": True, "data": response_data, "project_id": project_id}
     except Exception as e:
         logger.error(f"❌ Error updating page metadata: {e}")
         return {"success": False, "error": str(e), "project_id": project_id}
 
-@mcp.tool()
-def preview_page(preview_id: str) -> Dict[str, Any]:
+@tool("pages")
+async def preview_page(preview_id: str) -> Dict[str, Any]:
     """Preview a file from citation using preview ID."""
     try:
         logger.info(f"👁️ Getting preview for ID {preview_id}")
 
-        # Check if SDK has preview method
-        if hasattr(CustomGPT.Page, 'preview'):
-            response = CustomGPT.Page.preview(preview_id)
-            response_data = extract_response_data(response)
-            return {"success": True, "data": response_data, "preview_id": preview_id}
-        else:
-            print(f"⚠️ Page preview functionality may require custom API implementation", file=sys.stderr)
+        response = await customgpt.preview(preview_id)
+        content_type = response.headers.get("Content-Type", "")
+        if "json" not in content_type:
+            # Previews are usually the raw cited file, not JSON
             return {
-                "success": False,
-                "error": "Page preview not available in current SDK version",
-                "note": "The /api/v1/preview/{id} endpoint may require custom implementation",
+                "success": True,
                 "preview_id": preview_id,
-                "sdk_limitation": "CustomGPT SDK may not expose preview method"
+                "content_type": content_type,
+                "size_bytes": len(response.content)
             }
+        response_data = extract_response_data(response)
+        return {"success": True, "data": response_data, "preview_id": preview_id}
     except Exception as e:
         logger.error(f"❌ Error getting page preview: {e}")
         print(f"❌ Error in preview_page: {e}", file=sys.stderr)
         return {"success": False, "error": str(e), "preview_id": preview_id}
 
 # === CITATIONS ===
-@mcp.tool()
-def get_citation(project_id: int, citation_id: int) -> Dict[str, Any]:
+@tool("citations")
+@shaped("citation")
+@cached("citation")
+async def get_citation(project_id: int, citation_id: int) -> Dict[str, Any]:
     """Get citation details."""
     try:
         logger.info(f"📎 Getting citation {citation_id}")
-        response = CustomGPT.Citation.get(project_id, citation_id)
+        response = await customgpt.get_citation(project_id, citation_id)
         response_data = extract_response_data(response)
         return {"success": True, "data": response_data, "project_id": project_id}
     except Exception as e:
@@ -1077,50 +1598,47 @@ def get_citation(project_id: int, citation_id: int) -> Dict[str, Any]:
         return {"success": False, "error": str(e), "project_id": project_id}
 
 # === USER MANAGEMENT ===
-@mcp.tool()
-def get_user_profile() -> Dict[str, Any]:
+@tool("user")
+async def get_user_profile() -> Dict[str, Any]:
     """Get user profile information."""
     try:
         logger.info("👤 Getting user profile")
-        response = CustomGPT.User.get()
+        response = await customgpt.get_user()
         response_data = extract_response_data(response)
         return {"success": True, "data": response_data}
     except Exception as e:
         logger.error(f"❌ Error getting user profile: {e}")
         return {"success": False, "error": str(e)}
 
-@mcp.tool()
-def update_user_profile(name: Optional[str] = None, email: Optional[str] = None) -> Dict[str, Any]:
+@tool("user")
+async def update_user_profile(name: Optional[str] = None, profile_photo: Optional[str] = None,
+                              email: Optional[str] = None) -> Dict[str, Any]:
     """Update user profile."""
     try:
         logger.info("✏️ Updating user profile")
-        updates = {}
-        if name: updates["name"] = name
-        if email: updates["email"] = email
+        if email is not None:
+            return {"success": False, "error": "Deprecated: the CustomGPT profile API cannot change the email"}
+        updates = PostUserBody(name=name, profile_photo=profile_photo).payload()
 
-        response = CustomGPT.User.update(**updates)
+        response = await customgpt.update_user(**updates)
         response_data = extract_response_data(response)
         return {"success": True, "data": response_data}
     except Exception as e:
         logger.error(f"❌ Error updating user profile: {e}")
         return {"success": False, "error": str(e)}
 
-@mcp.tool()
-def search_team_member(query: str) -> Dict[str, Any]:
+@tool("user")
+async def search_team_member(query: str) -> Dict[str, Any]:
     """Search for a team member by ID or email (team owners/admins only)."""
     try:
         logger.info(f"🔍 Searching for team member: {query}")
 
-        # Note: This endpoint may require custom implementation as SDK doesn't expose team search
-        print(f"⚠️ Team member search may require custom API implementation", file=sys.stderr)
-
+        # No team-member search endpoint is published in docs/openapi.json
         return {
             "success": False,
-            "error": "Team member search not available in current SDK version",
-            "note": "The /api/v1/user/search/team-member endpoint requires custom implementation",
-            "query": query,
-            "sdk_limitation": "CustomGPT SDK doesn't expose team search methods",
-            "access_required": "Team owner or administrator permissions needed"
+            "error": "Team member search is not part of the CustomGPT API",
+            "note": "docs/openapi.json defines no team-member search endpoint",
+            "query": query
         }
     except Exception as e:
         logger.error(f"❌ Error searching team member: {e}")
@@ -1128,62 +1646,751 @@ def search_team_member(query: str) -> Dict[str, Any]:
         return {"success": False, "error": str(e), "query": query}
 
 # === LIMITS ===
-@mcp.tool()
-def get_usage_limits() -> Dict[str, Any]:
+@tool("limits")
+async def get_usage_limits() -> Dict[str, Any]:
     """Get account usage limits."""
     try:
         logger.info("📊 Getting usage limits")
-        response = CustomGPT.Limit.get()
+        response = await customgpt.get_limits()
         response_data = extract_response_data(response)
+        if customgpt.rate_limiter is not None and isinstance(response_data.get("data"), dict):
+            # Seed the client-side limiter with the remaining query quota
+            customgpt.rate_limiter.seed_from_usage(customgpt.api_key, response_data["data"])
         return {"success": True, "data": response_data}
     except Exception as e:
         logger.error(f"❌ Error getting usage limits: {e}")
         return {"success": False, "error": str(e)}
 
-@mcp.tool()
-def get_server_info() -> Dict[str, Any]:
+# === BULK FETCH (auto-pagination) ===
+PAGINATION_MAX_CONCURRENCY = int(os.getenv("PAGINATION_MAX_CONCURRENCY", "8"))
+
+def page_concurrency(requested: int) -> int:
+    """Clamp a caller's max_concurrency to 1..PAGINATION_MAX_CONCURRENCY."""
+    return max(1, min(requested, PAGINATION_MAX_CONCURRENCY))
+
+def item_count(body: Dict[str, Any], *path: str) -> int:
+    for key in path:
+        body = body.get(key) or {}
+    return len(body.get("data") or [])
+
+@tool("bulk")
+@shaped("agents")
+async def list_agents_all(max_items: Optional[int] = None, fields: Optional[List[str]] = None,
+                          max_concurrency: int = PAGINATION_MAX_CONCURRENCY) -> Dict[str, Any]:
+    """List every agent across all pages in one call (pages are fetched concurrently)."""
+    try:
+        logger.info("🤖 Listing all agents...")
+
+        async def fetch(page):
+            return extract_response_data(await customgpt.list_projects(page=page))
+
+        async def fetch_items(page):
+            return await customgpt.list_projects_items(page=page, fields=fields)
+
+        response_data = await fetch_all_pages(fetch, ("data",), page_concurrency(max_concurrency), max_items,
+                                              fields, fetch_items)
+        return {"success": True, "data": response_data, "items": item_count(response_data, "data")}
+    except Exception as e:
+        logger.error(f"❌ Error listing all agents: {e}")
+        return {"success": False, "error": str(e)}
+
+@tool("bulk")
+@shaped("conversations")
+async def list_conversations_all(project_id: int, max_items: Optional[int] = None,
+                                 fields: Optional[List[str]] = None,
+                                 max_concurrency: int = PAGINATION_MAX_CONCURRENCY) -> Dict[str, Any]:
+    """List every conversation of an agent across all pages in one call."""
+    try:
+        logger.info(f"📝 Listing all conversations for agent {project_id}")
+
+        async def fetch(page):
+            return extract_response_data(await customgpt.list_conversations(project_id, page=page))
+
+        async def fetch_items(page):
+            return await customgpt.list_conversations_items(project_id, page=page, fields=fields)
+
+        response_data = await fetch_all_pages(fetch, ("data",), page_concurrency(max_concurrency), max_items,
+                                              fields, fetch_items)
+        return {
+            "success": True,
+            "data": response_data,
+            "items": item_count(response_data, "data"),
+            "project_id": project_id
+        }
+    except Exception as e:
+        logger.error(f"❌ Error listing all conversations: {e}")
+        return {"success": False, "error": str(e), "project_id": project_id}
+
+@tool("bulk")
+@shaped("messages")
+async def get_conversation_messages_all(project_id: int, session_id: str, max_items: Optional[int] = None,
+                                        fields: Optional[List[str]] = None,
+                                        max_concurrency: int = PAGINATION_MAX_CONCURRENCY) -> Dict[str, Any]:
+    """Get the full transcript of a conversation across all pages in one call."""
+    try:
+        logger.info(f"💬 Getting all messages for conversation {session_id}")
+
+        async def fetch(page):
+            return extract_response_data(await customgpt.list_messages(project_id, session_id, page=page))
+
+        async def fetch_items(page):
+            return await customgpt.list_messages_items(project_id, session_id, page=page, fields=fields)
+
+        response_data = await fetch_all_pages(fetch, ("data", "messages"), page_concurrency(max_concurrency),
+                                              max_items, fields, fetch_items)
+        return {
+            "success": True,
+            "data": response_data,
+            "items": item_count(response_data, "data", "messages"),
+            "project_id": project_id,
+            "session_id": session_id
+        }
+    except Exception as e:
+        logger.error(f"❌ Error getting all conversation messages: {e}")
+        return {"success": False, "error": str(e), "project_id": project_id, "session_id": session_id}
+
+@tool("bulk")
+@shaped("pages")
+async def list_pages_all(project_id: int, limit: int = 100, max_items: Optional[int] = None,
+                         fields: Optional[List[str]] = None,
+                         max_concurrency: int = PAGINATION_MAX_CONCURRENCY) -> Dict[str, Any]:
+    """List every page of an agent across all result pages in one call."""
+    try:
+        logger.info(f"📄 Listing all pages for agent {project_id}")
+
+        async def fetch(page):
+            return extract_response_data(await customgpt.list_pages(project_id, page=page, limit=limit))
+
+        async def fetch_items(page):
+            return await customgpt.list_pages_items(project_id, page=page, limit=limit, fields=fields)
+
+        response_data = await fetch_all_pages(fetch, ("data", "pages"), page_concurrency(max_concurrency),
+                                              max_items, fields, fetch_items)
+        return {
+            "success": True,
+            "data": response_data,
+            "items": item_count(response_data, "data", "pages"),
+            "project_id": project_id
+        }
+    except Exception as e:
+        logger.error(f"❌ Error listing all pages: {e}")
+        return {"success": False, "error": str(e), "project_id": project_id}
+
+@tool("bulk")
+@shaped("intelligence")
+async def get_intelligence_report_all(project_id: int, limit: int = 100, max_items: Optional[int] = None,
+                                      fields: Optional[List[str]] = None,
+                                      max_concurrency: int = PAGINATION_MAX_CONCURRENCY) -> Dict[str, Any]:
+    """Get every customer intelligence record of an agent across all pages in one call."""
+    try:
+        logger.info(f"🧠 Getting full customer intelligence report for agent {project_id}")
+
+        async def fetch(page):
+            return extract_response_data(
+                await customgpt.get_intelligence_report(project_id, page=page, limit=limit)
+            )
+
+        async def fetch_items(page):
+            return await customgpt.get_intelligence_report_items(project_id, page=page, limit=limit,
+                                                                 fields=fields)
+
+        response_data = await fetch_all_pages(fetch, ("data",), page_concurrency(max_concurrency), max_items,
+                                              fields, fetch_items)
+        return {
+            "success": True,
+            "data": response_data,
+            "items": item_count(response_data, "data"),
+            "project_id": project_id
+        }
+    except Exception as e:
+        logger.error(f"❌ Error getting full intelligence report: {e}")
+        return {"success": False, "error": str(e), "project_id": project_id}
+
+# === BATCH EXECUTION ===
+BATCH_MAX_OPERATIONS = int(os.getenv("BATCH_MAX_OPERATIONS", "500"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "32"))
+
+async def run_batch_item(index: int, operation: Dict[str, Any], semaphore: asyncio.Semaphore,
+                         timeout: float) -> Dict[str, Any]:
+    """Run one batch entry through the normal tool pipeline and capture its outcome."""
+    tool = operation.get("tool")
+    item = {"index": index, "tool": tool}
+    if not isinstance(tool, str) or tool == "batch":
+        return {**item, "success": False, "error": "Each operation needs a 'tool' name (nested batch is not allowed)"}
+
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(mcp.call_tool(tool, operation.get("args") or {}), timeout)
+            data = result.structured_content
+            success = not (isinstance(data, dict) and data.get("success") is False)
+            item.update({"success": success, "result": data})
+        except asyncio.TimeoutError:
+            item.update({"success": False, "error": f"Timed out after {timeout}s"})
+        except Exception as e:
+            item.update({"success": False, "error": str(e)})
+        item["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return item
+
+@tool("batch")
+async def batch(operations: List[Dict[str, Any]], max_concurrency: int = 8,
+                timeout: float = 30.0) -> Dict[str, Any]:
+    """Run many tools in one call. Each operation is {"tool": name, "args": {...}}; results keep input order."""
+    try:
+        if len(operations) > BATCH_MAX_OPERATIONS:
+            return {"success": False, "error": f"Too many operations ({len(operations)} > {BATCH_MAX_OPERATIONS})"}
+
+        logger.info(f"📦 Running batch of {len(operations)} operations")
+        semaphore = asyncio.Semaphore(max(1, min(max_concurrency, BATCH_MAX_CONCURRENCY)))
+        results = await asyncio.gather(*[
+            run_batch_item(index, operation, semaphore, timeout)
+            for index, operation in enumerate(operations)
+        ])
+        failed = sum(1 for item in results if not item["success"])
+
+        return {
+            "success": failed == 0,
+            "total": len(results),
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "results": results
+        }
+    except Exception as e:
+        logger.error(f"❌ Error running batch: {e}")
+        return {"success": False, "error": str(e)}
+
+# === FAN-OUT QUERIES ===
+FANOUT_MAX_AGENTS = int(os.getenv("FANOUT_MAX_AGENTS", "50"))
+FANOUT_MAX_CONCURRENCY = int(os.getenv("FANOUT_MAX_CONCURRENCY", "16"))
+
+async def ask_agent(project_id: int, message: str, semaphore: asyncio.Semaphore,
+                    timeout: float) -> Dict[str, Any]:
+    """Send one prompt to one agent in a fresh conversation and summarise the answer."""
+    session_id = str(uuid.uuid4())
+    item = {"project_id": project_id, "session_id": session_id}
+    started = time.perf_counter()
+    try:
+        async with semaphore:
+            response = await asyncio.wait_for(
+                customgpt.send_message(project_id=project_id, session_id=session_id, prompt=message),
+                timeout
+            )
+        answer = extract_response_data(response).get("data") or {}
+        item.update({
+            "success": True,
+            "prompt_id": answer.get("id"),
+            "answer": answer.get("openai_response"),
+            "citations": answer.get("citations") or []
+        })
+    except asyncio.TimeoutError:
+        item.update({"success": False, "error": f"Timed out after {timeout}s"})
+    except Exception as e:
+        item.update({"success": False, "error": str(e)})
+    item["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return item
+
+def is_good_answer(item: Dict[str, Any], min_answer_chars: int) -> bool:
+    return item["success"] and len((item.get("answer") or "").strip()) >= min_answer_chars
+
+@tool("conversations")
+async def fan_out_query(message: str, project_ids: List[int], mode: Literal["all", "first"] = "all",
+                        timeout: float = 60.0, min_answer_chars: int = 1,
+                        ctx: Context = None) -> Dict[str, Any]:
+    """Ask several agents the same question concurrently. mode="first" returns the first good answer and cancels the rest."""
+    try:
+        project_ids = list(dict.fromkeys(project_ids))
+        if not project_ids:
+            return {"success": False, "error": "project_ids is empty"}
+        if len(project_ids) > FANOUT_MAX_AGENTS:
+            return {"success": False, "error": f"Too many agents ({len(project_ids)} > {FANOUT_MAX_AGENTS})"}
+
+        logger.info(f"📣 Fanning out question to {len(project_ids)} agents (mode={mode})")
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(FANOUT_MAX_CONCURRENCY)
+        pending = {asyncio.ensure_future(ask_agent(pid, message, semaphore, timeout)): pid
+                   for pid in project_ids}
+        answers = []
+        winner = None
+        try:
+            while pending and winner is None:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pending.pop(task)
+                    item = task.result()
+                    answers.append(item)
+                    if ctx is not None:
+                        await ctx.report_progress(len(answers), total=len(project_ids),
+                                                  message=f"agent {item['project_id']}: "
+                                                          f"{'answered' if item['success'] else item['error']}")
+                    if mode == "first" and winner is None and is_good_answer(item, min_answer_chars):
+                        winner = item
+        finally:
+            for task in pending:
+                task.cancel()
+
+        cancelled = list(pending.values())
+        result = {
+            "success": any(item["success"] for item in answers),
+            "mode": mode,
+            "answers": answers,
+            "answered": sum(1 for item in answers if item["success"]),
+            "failed": sum(1 for item in answers if not item["success"]),
+            "cancelled": cancelled,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+        if mode == "first":
+            result["winner"] = winner
+            result["success"] = winner is not None
+        return result
+    except Exception as e:
+        logger.error(f"❌ Error in fan-out query: {e}")
+        return {"success": False, "error": str(e)}
+
+# === CHAT COMPLETIONS ===
+CHAT_BATCH_MAX_PROMPTS = int(os.getenv("CHAT_BATCH_MAX_PROMPTS", "1000"))
+CHAT_BATCH_MAX_CONCURRENCY = int(os.getenv("CHAT_BATCH_MAX_CONCURRENCY", "32"))
+CHAT_ROLES = ("system", "user", "assistant")
+
+def chat_messages(messages: Optional[List[Dict[str, Any]]] = None, prompt: Optional[str] = None,
+                  system_prompt: Optional[str] = None) -> List[Dict[str, str]]:
+    """OpenAI-style message list from a message array or a single prompt, with an optional system message first."""
+    if messages is None:
+        if prompt is None:
+            raise ValueError("Provide either messages or prompt")
+        messages = [{"role": "user", "content": prompt}]
+    checked = []
+    for position, message in enumerate(messages):
+        if not isinstance(message, dict) or message.get("role") not in CHAT_ROLES:
+            raise ValueError(f"messages[{position}] needs a role of {', '.join(CHAT_ROLES)}")
+        checked.append({"role": message["role"], "content": str(message.get("content") or "")})
+    if not any(message["role"] == "user" for message in checked):
+        raise ValueError("messages must contain at least one user message")
+    if system_prompt and checked[0]["role"] != "system":
+        checked.insert(0, {"role": "system", "content": system_prompt})
+    return checked
+
+async def relay_completion_stream(events, ctx: Optional[Context], on_first_token=None) -> Dict[str, Any]:
+    """Forward streamed completion deltas to the MCP client and assemble a chat.completion object."""
+    parts: Dict[int, List[str]] = {}
+    finish: Dict[int, Optional[str]] = {}
+    head: Dict[str, Any] = {}
+    chunks = 0
+    async for event in events:
+        if event.get("message") == "[DONE]":
+            break
+        if event.get("error"):
+            error = event["error"]
+            raise ValueError(error.get("message") if isinstance(error, dict) else str(error))
+        for key in ("id", "created", "model", "usage"):
+            if event.get(key) is not None:
+                head[key] = event[key]
+        for choice in event.get("choices") or []:
+            index = choice.get("index") or 0
+            text = (choice.get("delta") or {}).get("content") or ""
+            if text:
+                if not chunks and on_first_token is not None:
+                    on_first_token()
+                chunks += 1
+                parts.setdefault(index, []).append(text)
+                if ctx is not None:
+                    await ctx.report_progress(chunks, message=text)
+            if choice.get("finish_reason"):
+                finish[index] = choice["finish_reason"]
+
+    choices = [{"index": index,
+                "message": {"role": "assistant", "content": "".join(parts.get(index, []))},
+                "finish_reason": finish.get(index, "stop")}
+               for index in sorted(set(parts) | set(finish) or {0})]
+    return {"id": head.get("id"), "object": "chat.completion", "created": head.get("created", int(time.time())),
+            "model": head.get("model"), "usage": head.get("usage"), "choices": choices, "chunks": chunks}
+
+async def complete_chat(project_id: int, body: Dict[str, Any], stream: bool,
+                        ctx: Optional[Context] = None, on_first_token=None) -> Dict[str, Any]:
+    """One call to the stateless chat completions endpoint (no conversation is created)."""
+    if stream:
+        return await relay_completion_stream(customgpt.stream_chat_completions(project_id, **body), ctx,
+                                             on_first_token)
+    return extract_response_data(await customgpt.chat_completions(project_id, **body))
+
+def completion_content(completion: Dict[str, Any]) -> str:
+    choices = completion.get("choices") or [{}]
+    return ((choices[0] or {}).get("message") or {}).get("content") or ""
+
+@tool("completions")
+async def chat_completion(project_id: int, messages: List[Dict[str, Any]], stream: bool = False,
+                          model: Optional[str] = None, lang: Optional[str] = None,
+                          external_id: Optional[str] = None, is_inline_citation: Optional[bool] = None,
+                          ctx: Context = None) -> Dict[str, Any]:
+    """Stateless OpenAI-format chat completion against an agent: pass the full message history, no conversation is created. With stream=True, deltas are sent as progress notifications."""
+    try:
+        body = PostProjectsChatCompletionsBody(
+            messages=chat_messages(messages), model=model, lang=lang, external_id=external_id,
+            is_inline_citation=is_inline_citation,
+        ).payload()
+        logger.info(f"🧠 Chat completion for agent {project_id} ({len(body['messages'])} messages)")
+        response_data = await complete_chat(project_id, body, stream, ctx)
+        return {"success": True, "data": response_data, "content": completion_content(response_data),
+                "project_id": project_id}
+    except Exception as e:
+        logger.error(f"❌ Error in chat completion: {e}")
+        return {"success": False, "error": str(e), "project_id": project_id}
+
+async def run_completion_item(index: int, request: Dict[str, Any], defaults: Dict[str, Any],
+                              semaphore: asyncio.Semaphore, stream: bool, timeout: float,
+                              include_raw: bool) -> Dict[str, Any]:
+    """Run one chat_completion_batch entry and capture its outcome and timings."""
+    project_id = request.get("project_id", defaults["project_id"])
+    item: Dict[str, Any] = {"index": index, "project_id": project_id}
+    if request.get("id") is not None:
+        item["id"] = request["id"]
+    try:
+        body = PostProjectsChatCompletionsBody(
+            messages=chat_messages(request.get("messages"), request.get("prompt"), defaults["system_prompt"]),
+            **{key: request.get(key, defaults[key]) for key in ("model", "lang", "is_inline_citation")},
+            external_id=request.get("external_id"),
+        ).payload()
+    except Exception as e:
+        return {**item, "success": False, "error": str(e)}
+
+    async with semaphore:
+        started = time.perf_counter()
+        first_token: List[float] = []
+        try:
+            completion = await asyncio.wait_for(
+                complete_chat(project_id, body, stream,
+                              on_first_token=lambda: first_token.append(time.perf_counter())),
+                timeout
+            )
+            choice = (completion.get("choices") or [{}])[0] or {}
+            item.update({"success": True, "content": completion_content(completion),
+                         "finish_reason": choice.get("finish_reason"), "usage": completion.get("usage")})
+            if include_raw:
+                item["completion"] = completion
+        except asyncio.TimeoutError:
+            item.update({"success": False, "error": f"Timed out after {timeout}s"})
+        except Exception as e:
+            item.update({"success": False, "error": str(e)})
+        item["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        if first_token:
+            item["ttft_ms"] = round((first_token[0] - started) * 1000, 1)
+        return item
+
+@tool("completions")
+async def chat_completion_batch(project_id: int, requests: List[Dict[str, Any]],
+                                system_prompt: Optional[str] = None, model: Optional[str] = None,
+                                lang: Optional[str] = None, is_inline_citation: Optional[bool] = None,
+                                stream: bool = False, max_concurrency: int = 8, timeout: float = 60.0,
+                                include_raw: bool = False, ctx: Context = None) -> Dict[str, Any]:
+    """Run many independent chat completions concurrently. Each request is {"prompt": text} or {"messages": [...]}, optionally with its own project_id, id, model, lang, external_id; results keep input order."""
+    try:
+        if not requests:
+            return {"success": False, "error": "requests is empty"}
+        if len(requests) > CHAT_BATCH_MAX_PROMPTS:
+            return {"success": False, "error": f"Too many requests ({len(requests)} > {CHAT_BATCH_MAX_PROMPTS})"}
+
+        logger.info(f"🧠 Running {len(requests)} chat completions (stream={stream})")
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(max(1, min(max_concurrency, CHAT_BATCH_MAX_CONCURRENCY)))
+        defaults = {"project_id": project_id, "system_prompt": system_prompt, "model": model, "lang": lang,
+                    "is_inline_citation": is_inline_citation}
+        results = []
+        for future in asyncio.as_completed([
+            run_completion_item(index, request if isinstance(request, dict) else {"prompt": str(request)},
+                                defaults, semaphore, stream, timeout, include_raw)
+            for index, request in enumerate(requests)
+        ]):
+            item = await future
+            results.append(item)
+            if ctx is not None:
+                await ctx.report_progress(len(results), total=len(requests),
+                                          message=f"#{item['index']}: {'done' if item['success'] else item['error']}")
+        results.sort(key=lambda item: item["index"])
+        failed = sum(1 for item in results if not item["success"])
+
+        elapsed = time.perf_counter() - started
+        return {
+            "success": failed == 0,
+            "total": len(results),
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "completions_per_second": round(len(results) / elapsed, 2) if elapsed else None,
+            "results": results,
+            "project_id": project_id
+        }
+    except Exception as e:
+        logger.error(f"❌ Error in chat completion batch: {e}")
+        return {"success": False, "error": str(e), "project_id": project_id}
+
+# === EVALUATION ===
+EVAL_DIR = Path(os.getenv("EVAL_DIR") or DEFAULT_EVAL_DIR).expanduser()
+EVAL_RUNS_DIR = EVAL_DIR / "runs"  # checkpoints and results, one directory per API key
+EVAL_MAX_CASES = int(os.getenv("EVAL_MAX_CASES", "100000"))
+EVAL_MAX_CONCURRENCY = int(os.getenv("EVAL_MAX_CONCURRENCY", "16"))
+
+@tool("evals")
+async def run_eval(project_ids: List[int], dataset: Optional[str] = None, prompts: Optional[List[Any]] = None,
+                   variants: Optional[Dict[str, Dict[str, Any]]] = None, concurrency: int = 4,
+                   timeout: float = 120.0, resume: bool = True, retry_failed: bool = True,
+                   wait: bool = False, include_columns: bool = False, ctx: Context = None) -> Dict[str, Any]:
+    """Replay a prompt dataset (a .jsonl/.csv file in EVAL_DIR, or inline prompts) against agents and setting variants, recording time to first token, latency and citations. Runs as a checkpointed background job; calling again with the same arguments resumes it."""
+    try:
+        if (dataset is None) == (prompts is None):
+            return {"success": False, "error": "Provide either dataset or prompts"}
+        tenant = key_fingerprint(customgpt.api_key)
+        if dataset:
+            path = resolve_in(EVAL_DIR, dataset)
+            if EVAL_RUNS_DIR.expanduser().resolve() in path.parents:
+                return {"success": False, "error": f"{dataset!r} is not a dataset"}
+            rows = load_dataset(path)
+        else:
+            rows = normalize_rows(prompts)
+        project_ids = list(dict.fromkeys(project_ids))
+        checked = parse_variants(variants)
+        cases = len(rows) * len(project_ids) * len(checked)
+        if not cases:
+            return {"success": False, "error": "Nothing to run (no prompts or no agents)"}
+        if cases > EVAL_MAX_CASES:
+            return {"success": False, "error": f"Too many cases ({cases} > {EVAL_MAX_CASES})"}
+
+        run = run_fingerprint(rows, project_ids, checked)
+        for state in ("queued", "running"):
+            for other in await job_manager.list(tenant, state, "run_eval"):
+                if other.params.get("run") == run:
+                    return {"success": False, "error": f"Eval {run} is already in progress as job {other.id}",
+                            "data": other.snapshot()}
+
+        # Per API key, so two tenants running the same eval never share recorded answers
+        checkpoint_path = EVAL_RUNS_DIR / tenant / f"{run}.checkpoint.jsonl"
+        results_path = EVAL_RUNS_DIR / tenant / f"{run}.results.json"
+        checkpoint = Checkpoint(checkpoint_path, {"run": run, "dataset": dataset or "inline", "rows": len(rows),
+                                                  "project_ids": project_ids, "variants": checked},
+                                resume=resume)
+        slots = max(1, min(concurrency, EVAL_MAX_CONCURRENCY))
+
+        async def ask(project_id: int, prompt: str, options: Dict[str, Any]) -> Dict[str, Any]:
+            return await ask_streamed(customgpt, project_id, prompt, options, timeout)
+
+        async def report(progress: Dict[str, Any]) -> None:
+            await ctx.report_progress(progress["completed"], total=progress["total"],
+                                      message=f"{progress['completed']}/{progress['total']} cases, "
+                                              f"{progress['failed']} failed")
+
+        async def evaluate(job: Job) -> Dict[str, Any]:
+            records = await run_cases(rows, project_ids, checked, ask, checkpoint, slots, retry_failed,
+                                      job.progress, report if wait and ctx is not None else None)
+            summary = summarize(records, list(checked))
+            await asyncio.to_thread(write_results, results_path, records, summary)
+            result = {"run": run, "summary": summary, "results_path": str(results_path),
+                      "checkpoint_path": str(checkpoint_path)}
+            if include_columns:
+                result["columns"] = columns(records)
+            return result
+
+        job = start_job("run_eval", {"run": run, "dataset": dataset or "inline", "cases": cases,
+                                     "project_ids": project_ids, "variants": list(checked)}, evaluate, ctx)
+        logger.info(f"🧪 Eval {run} ({job.id}): {len(rows)} prompts x {len(project_ids)} agents x "
+                    f"{len(checked)} variants")
+        if wait:
+            await asyncio.shield(job.task)
+        return {"success": job.state != "failed", "data": job.snapshot()}
+    except EvalError as e:
+        return {"success": False, "error": str(e)}
+    except Exception as e:
+        logger.error(f"❌ Error starting eval: {e}")
+        return {"success": False, "error": str(e)}
+
+# === TRANSCRIPT STORE ===
+TRANSCRIPT_SYNC_CONCURRENCY = int(os.getenv("TRANSCRIPT_SYNC_CONCURRENCY", "4"))
+
+async def fetch_conversations_page(project_id: int, page: int = 1, **params: Any) -> Dict[str, Any]:
+    return extract_response_data(await customgpt.list_conversations(project_id, page=page, **params))
+
+async def fetch_messages_page(project_id: int, session_id: str, page: int = 1, **params: Any) -> Dict[str, Any]:
+    return extract_response_data(await customgpt.list_messages(project_id, session_id, page=page, **params))
+
+@tool("transcripts")
+async def sync_conversations(project_id: int, full_scan: bool = False) -> Dict[str, Any]:
+    """Incrementally copy an agent's conversations and messages into the local searchable store."""
+    try:
+        logger.info(f"🗄️ Syncing transcripts for agent {project_id}")
+        result = await transcript_store.sync_project(
+            key_fingerprint(customgpt.api_key), project_id, fetch_conversations_page,
+            fetch_messages_page, full_scan=full_scan, max_concurrency=TRANSCRIPT_SYNC_CONCURRENCY)
+        return {"success": True, "data": result, "project_id": project_id}
+    except Exception as e:
+        logger.error(f"❌ Error syncing transcripts: {e}")
+        return {"success": False, "error": str(e), "project_id": project_id}
+
+@tool("transcripts")
+async def search_conversations(query: str, project_id: Optional[int] = None,
+                               session_id: Optional[str] = None, match_all: bool = True,
+                               limit: int = 20) -> Dict[str, Any]:
+    """Full-text search over locally synced conversation history (run sync_conversations first)."""
+    try:
+        logger.info(f"🔎 Searching transcripts for '{query}'")
+        match = fts_query(query, match_all)
+        if not match:
+            return {"success": False, "error": "Query has no searchable terms", "query": query}
+        hits = await transcript_store.search(key_fingerprint(customgpt.api_key), match,
+                                             project_id, session_id, max(1, min(limit, 200)))
+        return {"success": True, "query": query, "count": len(hits), "results": hits}
+    except Exception as e:
+        logger.error(f"❌ Error searching transcripts: {e}")
+        return {"success": False, "error": str(e), "query": query}
+
+@tool("transcripts")
+@shaped("messages")
+async def get_conversation_transcript(project_id: int, session_id: str, sync: bool = True) -> Dict[str, Any]:
+    """Get a whole conversation from the local store, fetching only messages newer than the last sync."""
+    try:
+        logger.info(f"📜 Getting transcript for conversation {session_id}")
+        tenant = key_fingerprint(customgpt.api_key)
+        added = 0
+        if sync:
+            known = (await transcript_store.known_conversations(tenant, project_id)).get(session_id) or {}
+            added = await transcript_store.sync_session(
+                tenant, project_id, {"session_id": session_id}, fetch_messages_page,
+                known.get("last_message_id", 0))
+        messages = await transcript_store.session_messages(tenant, project_id, session_id)
+        return {
+            "success": True,
+            "data": {"status": "success", "data": {"messages": {"data": messages, "total": len(messages)}}},
+            "messages_fetched": added,
+            "project_id": project_id,
+            "session_id": session_id
+        }
+    except Exception as e:
+        logger.error(f"❌ Error getting transcript: {e}")
+        return {"success": False, "error": str(e), "project_id": project_id, "session_id": session_id}
+
+# === CACHE ===
+@tool("cache")
+async def get_cache_stats() -> Dict[str, Any]:
+    """Get your read-through cache and answer cache hit/miss statistics."""
+    try:
+        fingerprint = key_fingerprint(customgpt.api_key)
+        answers = await answer_cache.stats(fingerprint)
+        return {"success": True, "data": {**response_cache.stats(fingerprint), "answers": answers}}
+    except Exception as e:
+        logger.error(f"❌ Error getting cache stats: {e}")
+        return {"success": False, "error": str(e)}
+
+@tool("cache")
+async def clear_cache(include_answers: bool = False) -> Dict[str, Any]:
+    """Drop your cached CustomGPT reads; include_answers=True also empties your answer cache."""
+    try:
+        fingerprint = key_fingerprint(customgpt.api_key)
+        removed = response_cache.clear(fingerprint)
+        result = {"success": True, "entries_removed": removed}
+        if include_answers:
+            result["answers_removed"] = await answer_cache.clear(fingerprint)
+        logger.info(f"🧹 Cleared {removed} cached entries")
+        return result
+    except Exception as e:
+        logger.error(f"❌ Error clearing cache: {e}")
+        return {"success": False, "error": str(e)}
+
+# === RESPONSE SHAPING ===
+@tool("utilities")
+async def get_continuation(handle: str, offset: int = 0, length: int = 4000) -> Dict[str, Any]:
+    """Read more of a text field that a previous tool result truncated (see truncated_fields)."""
+    chunk = await continuation_store.read(key_fingerprint(customgpt.api_key), handle, offset, length)
+    if chunk is None:
+        return {"success": False, "error": f"Continuation '{handle}' not found or expired", "handle": handle}
+    return {"success": True, "handle": handle, **chunk}
+
+# === RATE LIMITING ===
+@tool("limits")
+async def get_rate_limit_status() -> Dict[str, Any]:
+    """Get the client-side rate limiter state (current rates, throttling, remaining queries)."""
+    if customgpt.rate_limiter is None:
+        return {"success": True, "enabled": False}
+    return {"success": True, "enabled": True, "data": customgpt.rate_limiter.stats(customgpt.api_key)}
+
+# === RESILIENCE ===
+@tool("utilities")
+async def get_resilience_status() -> Dict[str, Any]:
+    """Get retry/hedge counters, per-endpoint circuit breaker states and request coalescing counts."""
+    data = customgpt.resilience.stats()
+    if customgpt.single_flight is not None:
+        data["single_flight"] = customgpt.single_flight.stats()
+    return {"success": True, "data": data}
+
+# === METRICS ===
+@tool("utilities")
+async def get_server_metrics() -> Dict[str, Any]:
+    """Get per-tool call counts, failures and latency percentiles plus CustomGPT request timings."""
+    data = metrics.summary()
+    data["cache_hit_rate"] = response_cache.stats()["hit_rate"]
+    data["pid"] = os.getpid()
+    return {"success": True, "data": data}
+
+@tool("utilities")
+async def get_server_info() -> Dict[str, Any]:
     """Get server information and available tools."""
     return {
         "server_name": "CustomGPT MCP Server",
         "version": "1.0.0",
         "framework": "FastMCP 2.0",
-        "sdk": "customgpt-client",
+        "sdk": "aiohttp (native async, pooled keep-alive connections)",
         "api_coverage": "COMPREHENSIVE - 39 tools covering major CustomGPT API endpoints",
-        "total_tools": 49,
-        "tool_categories": {
-            "agents": ["list_agents", "get_agent", "create_agent", "update_agent", "delete_agent", "replicate_agent", "get_agent_stats"],
-            "conversations": ["send_message", "list_conversations", "create_conversation", "get_conversation_messages", "update_conversation", "delete_conversation", "send_conversation_message"],
-            "messages": ["get_message_details", "update_message_feedback"],
-            "pages": ["list_pages", "delete_page", "reindex_page", "get_page_metadata", "update_page_metadata", "preview_page"],
-            "sources": ["list_sources", "create_source", "update_source_settings", "delete_source", "synchronize_source"],
-            "settings": ["get_agent_settings", "update_agent_settings"],
-            "licenses": ["list_agent_licenses"],
-            "plugins": ["list_plugins", "create_plugin", "update_plugin"],
-            "reports": ["get_traffic_report", "get_queries_report", "get_conversations_report", "get_analysis_report", "get_intelligence_report"],
-            "citations": ["get_citation"],
-            "user": ["get_user_profile", "update_user_profile", "search_team_member"],
-            "limits": ["get_usage_limits"],
-            "utilities": ["validate_api_key", "get_server_info"]
-        },
+        "total_tools": sum(len(names) for group, names in TOOL_GROUPS.items() if group_enabled(group)),
+        "tool_categories": {group: names for group, names in TOOL_GROUPS.items() if group_enabled(group)},
+        "disabled_tool_groups": sorted(group for group in TOOL_GROUPS if not group_enabled(group)),
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
 
-# Load API documentation
-def load_api_docs():
-    global API_DOCS
+# API documentation is only parsed when something asks for it
+@functools.lru_cache(maxsize=1)
+def load_api_docs() -> Dict[str, Any]:
     try:
         docs_path = Path(__file__).parent / "docs" / "openapi.json"
         if docs_path.exists():
             with open(docs_path, 'r') as f:
-                API_DOCS = json.load(f)
+                docs = json.load(f)
             logger.info("✅ API documentation loaded")
+            return docs
     except Exception as e:
         logger.error(f"❌ Failed to load API docs: {e}")
+    return {}
 
-API_DOCS = {}
-load_api_docs()
+# ===== HTTP SERVING =====
+SERVER_STARTED_AT = time.time()
 
-if __name__ == "__main__":
+@mcp.custom_route("/health", methods=["GET"])
+async def health(request: Request) -> JSONResponse:
+    """Liveness probe for load balancers; never calls CustomGPT."""
+    return JSONResponse({
+        "status": "ok",
+        "server_name": "CustomGPT MCP Server",
+        "version": "1.0.0",
+        "pid": os.getpid(),
+        "uptime_seconds": round(time.time() - SERVER_STARTED_AT, 1),
+        "api_key_configured": bool(customgpt.default_api_key),
+        "tenants": customgpt.stats()
+    })
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request: Request) -> PlainTextResponse:
+    """Prometheus scrape endpoint (metrics are per worker process)."""
+    return PlainTextResponse(metrics.REGISTRY.render(),
+                             media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def create_app():
+    """ASGI app serving MCP streamable HTTP on /mcp plus /health and /metrics.
+
+    Stateless by default so any worker or replica can answer any request
+    without session affinity.
+    """
+    stateless = os.getenv("MCP_STATELESS_HTTP", "true").lower() != "false"
+    return mcp.http_app(path="/mcp", stateless_http=stateless)
+
+# Module-level ASGI entry point (uvicorn workers, Vercel)
+app = create_app()
+
+def main():
+    """Run over stdio (default) or streamable HTTP when MCP_TRANSPORT=http."""
     logger.info("🚀 COMPREHENSIVE CustomGPT MCP Server - COMPLETE API COVERAGE!")
     logger.info("🔧 All 46+ CustomGPT API endpoints implemented with FastMCP 2.0")
     logger.info("📋 Complete Tool Categories:")
@@ -1211,7 +2418,22 @@ if __name__ == "__main__":
         logger.error("❌ API key NOT configured!")
         print("❌ API key NOT found in environment variables!", file=sys.stderr)
 
-    logger.info("💻 Running in stdio mode for Claude Code")
-    print("🚀 CustomGPT MCP Server with 49 tools - COMPLETE API COVERAGE!", file=sys.stderr)
+    transport = os.getenv("MCP_TRANSPORT", "stdio").lower()
+    if transport in ("http", "streamable-http"):
+        import uvicorn
 
-    mcp.run()
\ No newline at end of file
+        host = os.getenv("HOST", "0.0.0.0")
+        port = int(os.getenv("PORT", "8000"))
+        workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+        logger.info(f"🌐 Serving streamable HTTP on http://{host}:{port}/mcp with {workers} worker(s)")
+
+        # Multiple workers need an import string so each process builds its own app and pool
+        uvicorn.run(app if workers == 1 else "server:app", host=host, port=port, workers=workers,
+                    proxy_headers=True, forwarded_allow_ips="*")
+    else:
+        logger.info("💻 Running in stdio mode for Claude Code")
+        print("🚀 CustomGPT MCP Server with 49 tools - COMPLETE API COVERAGE!", file=sys.stderr)
+        mcp.run()
+
+if __name__ == "__main__":
+    main()
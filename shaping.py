@@ -0,0 +1,228 @@
+"""
+Response Shaping
+
+Trims CustomGPT payloads before they are handed to the LLM client:
+
+- ``fields`` / ``exclude`` projection on the records of a list (or on the
+  single record of a detail response);
+- per-resource ``compact`` presets that keep only the fields an assistant
+  usually needs and drop null values;
+- truncation of long text fields, with a continuation handle from which the
+  remainder can be read back with the get_continuation tool. Handles belong
+  to the API key that produced them; they are kept in memory, and also in
+  SQLite when CONTINUATION_DB_PATH is set, so that a follow-up call served
+  by another worker process can read them;
+- optional orjson serialisation of the tool result text (RESPONSE_JSON=orjson).
+"""
+
+import json
+import os
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+
+from cache import TTLCache
+from transcripts import SQLiteStore
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+# Where the records live inside each resource's API body
+RECORD_PATHS: Dict[str, Tuple[str, ...]] = {
+    "agents": ("data", "data"),
+    "agent": ("data",),
+    "conversations": ("data", "data"),
+    "messages": ("data", "messages", "data"),
+    "message": ("data",),
+    "pages": ("data", "pages", "data"),
+    "intelligence": ("data", "data"),
+    "citation": ("data",),
+    "page_metadata": ("data",),
+}
+
+# Fields kept by preset="compact"
+COMPACT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "agents": ("id", "project_name", "type", "is_chat_active", "created_at", "updated_at"),
+    "agent": ("id", "project_name", "type", "is_chat_active", "sitemap_path", "is_shared",
+              "shareable_link", "created_at", "updated_at"),
+    "conversations": ("id", "session_id", "name", "created_at", "updated_at"),
+    "messages": ("id", "user_query", "openai_response", "citations", "response_feedback",
+                 "created_at"),
+    "message": ("id", "conversation_id", "user_query", "openai_response", "citations",
+                "response_feedback", "created_at"),
+    "pages": ("id", "page_url", "filename", "crawl_status", "index_status", "filesize",
+              "updated_at"),
+    "intelligence": ("prompt_id", "conversation_id", "user_query", "ai_response", "user_intent",
+                     "user_emotion", "feedback", "created_at"),
+    "citation": ("id", "url", "title", "description"),
+    "page_metadata": ("id", "url", "title", "description"),
+}
+
+Preset = Literal["full", "compact"]
+PRESETS = ("full", "compact")
+
+CONTINUATION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS continuations (
+    tenant TEXT NOT NULL,
+    handle TEXT NOT NULL,
+    text TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (tenant, handle)
+);
+CREATE INDEX IF NOT EXISTS continuations_expiry ON continuations (expires_at);
+"""
+
+
+def dumps(value: Any) -> str:
+    """Compact JSON, through orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _locate(body: Any, path: Sequence[str]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Return the container holding the records and the key they live under."""
+    parent = body
+    for key in path[:-1]:
+        if not isinstance(parent, dict):
+            return None, None
+        parent = parent.get(key)
+    if not isinstance(parent, dict) or path[-1] not in parent:
+        return None, None
+    return parent, path[-1]
+
+
+def project_record(record: Any, fields: Optional[Sequence[str]], exclude: Optional[Sequence[str]],
+                   drop_nulls: bool = False) -> Any:
+    if not isinstance(record, dict):
+        return record
+    if fields:
+        record = {key: record[key] for key in fields if key in record}
+    if exclude:
+        record = {key: value for key, value in record.items() if key not in exclude}
+    if drop_nulls:
+        record = {key: value for key, value in record.items() if value is not None}
+    return record
+
+
+def _truncate(value: Any, limit: int, path: str, notes: List[Dict[str, Any]]) -> Any:
+    if isinstance(value, str):
+        if len(value) <= limit:
+            return value
+        notes.append({"path": path, "text": value, "total_chars": len(value)})
+        return value[:limit]
+    if isinstance(value, dict):
+        return {key: _truncate(item, limit, f"{path}.{key}" if path else key, notes)
+                for key, item in value.items()}
+    if isinstance(value, list):
+        return [_truncate(item, limit, f"{path}[{i}]", notes) for i, item in enumerate(value)]
+    return value
+
+
+def shape(body: Any, resource: str, fields: Optional[Sequence[str]] = None,
+          exclude: Optional[Sequence[str]] = None, preset: str = "full",
+          max_text_chars: Optional[int] = None) -> Tuple[Any, List[Dict[str, Any]]]:
+    """Apply projection, preset and truncation to one API body.
+
+    Only the records are touched; the envelope (status, paginator counters)
+    is kept as is. Returns the shaped body and a list of truncation notes,
+    one per cut string, each carrying the full ``text``; pass them to
+    ``ContinuationStore.keep`` to swap the text for a continuation handle.
+    """
+    if preset not in PRESETS:
+        raise ValueError(f"Unknown preset '{preset}'; use one of {', '.join(PRESETS)}")
+    compact = preset == "compact"
+    if compact and not fields:
+        fields = COMPACT_FIELDS.get(resource)
+    truncate = bool(max_text_chars and max_text_chars > 0)
+    notes: List[Dict[str, Any]] = []
+
+    path = RECORD_PATHS.get(resource)
+    parent, key = _locate(body, path) if path else (None, None)
+    if parent is None:
+        if truncate:
+            body = _truncate(body, max_text_chars, "", notes)
+        return body, notes
+    if not (fields or exclude or compact or truncate):
+        return body, notes
+
+    # Copy the path down to the records so cached bodies are never mutated
+    body, parent = _copy_path(body, path)
+    records = parent[key]
+    prefix = ".".join(path)
+    if isinstance(records, list):
+        records = [project_record(r, fields, exclude, compact) for r in records]
+    else:
+        records = project_record(records, fields, exclude, compact)
+    if truncate:
+        records = _truncate(records, max_text_chars, prefix, notes)
+    parent[key] = records
+    return body, notes
+
+
+def _copy_path(body: Dict[str, Any], path: Sequence[str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    root = dict(body)
+    parent = root
+    for key in path[:-1]:
+        parent[key] = dict(parent[key])
+        parent = parent[key]
+    return root, parent
+
+
+class ContinuationStore(SQLiteStore):
+    """Cut strings by (tenant, handle): in memory, and in SQLite too when a path is given."""
+
+    schema = CONTINUATION_SCHEMA
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 900, max_entries: int = 500,
+                 max_bytes: int = 16 * 1024 * 1024):
+        super().__init__(path or ":memory:")
+        self.persistent = path is not None
+        self.ttl = ttl
+        self.memory = TTLCache(max_entries=max_entries, max_bytes=max_bytes, default_ttl=ttl)
+
+    @classmethod
+    def from_env(cls) -> "ContinuationStore":
+        """Read CONTINUATION_DB_PATH (unset: memory only, one worker), _TTL_SECONDS, _MAX_ENTRIES and _MAX_BYTES."""
+        return cls(os.getenv("CONTINUATION_DB_PATH") or None,
+                   ttl=float(os.getenv("CONTINUATION_TTL_SECONDS", "900")),
+                   max_entries=int(os.getenv("CONTINUATION_MAX_ENTRIES", "500")),
+                   max_bytes=int(os.getenv("CONTINUATION_MAX_BYTES", str(16 * 1024 * 1024))))
+
+    async def keep(self, tenant: str, notes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Store the text of each truncation note from ``shape``; returns the notes with handles instead."""
+        now = time.time()
+        kept, rows = [], []
+        for note in notes:
+            note = dict(note)
+            text = note.pop("text")
+            handle = uuid.uuid4().hex[:16]
+            self.memory.set((tenant, handle), text, "continuation")
+            rows.append((tenant, handle, text, now + self.ttl))
+            kept.append({"path": note["path"], "handle": handle, "total_chars": note["total_chars"]})
+        if self.persistent and rows:
+            def write(conn: sqlite3.Connection) -> None:
+                conn.execute("DELETE FROM continuations WHERE expires_at <= ?", (now,))
+                conn.executemany("INSERT OR REPLACE INTO continuations (tenant, handle, text, expires_at)"
+                                 " VALUES (?,?,?,?)", rows)
+            await self.run(write)
+        return kept
+
+    async def read(self, tenant: str, handle: str, offset: int = 0,
+                   length: int = 4000) -> Optional[Dict[str, Any]]:
+        """Slice of a truncated string, or None if the handle expired or belongs to another API key."""
+        hit, text = self.memory.get((tenant, handle), "continuation")
+        if not hit and self.persistent:
+            row = await self.run(lambda conn: conn.execute(
+                "SELECT text FROM continuations WHERE tenant = ? AND handle = ? AND expires_at > ?",
+                (tenant, handle, time.time())).fetchone())
+            hit, text = row is not None, row["text"] if row else None
+        if not hit:
+            return None
+        chunk = text[offset:offset + max(1, length)]
+        end = offset + len(chunk)
+        return {"text": chunk, "offset": offset, "next_offset": end if end < len(text) else None,
+                "total_chars": len(text)}
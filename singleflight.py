@@ -0,0 +1,71 @@
+"""
+Request Coalescing (single-flight)
+
+Concurrent identical reads share one upstream call: the first caller starts
+it, later callers with the same key wait for the same result (or the same
+exception) instead of sending their own request. Nothing is cached; once
+the call finishes the next caller starts a fresh one.
+
+A caller that is cancelled only stops waiting. The shared call is cancelled
+when its last waiter goes away, so an abandoned burst does not keep using
+a connection and rate-limit budget.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Future[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls by key."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``fn()``, or the in-flight call already running under ``key``."""
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _, key=key, call=call: self._finish(key, call))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+                self.abandoned += 1
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _finish(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled():
+            call.task.exception()  # retrieved by the waiters; keep asyncio from warning when there are none
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._calls),
+            "upstream_calls": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / calls, 4) if calls else 0.0,
+            "abandoned": self.abandoned,
+        }
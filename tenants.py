@@ -0,0 +1,155 @@
+"""
+Multi-Tenant Client Routing
+
+One server process can serve several CustomGPT accounts. The API key of
+the caller is resolved per tool call (the X-CustomGPT-API-Key HTTP header,
+else the CUSTOMGPT_API_KEY default) and stored in a context variable, so
+concurrent calls from different tenants never see each other's key.
+
+Each tenant gets its own AsyncCustomGPT with a separate connection pool.
+Rate-limit budgets, cached reads and stored transcripts are already keyed
+by API key fingerprint. Idle tenants are evicted LRU-style and their pools
+closed after a grace period.
+"""
+
+import asyncio
+import contextvars
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from fastmcp.server.dependencies import get_http_headers
+from fastmcp.server.middleware import Middleware
+
+from cache import key_fingerprint
+from customgpt_http import AsyncCustomGPT
+
+API_KEY_HEADER = "x-customgpt-api-key"
+
+current_api_key: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar(
+    "customgpt_api_key", default=None)
+
+
+class MissingAPIKey(PermissionError):
+    """Raised when a call carries no API key and the server has no default one."""
+
+
+class TenantClients:
+    """Routes attribute access to the AsyncCustomGPT of the calling tenant.
+
+    ``customgpt.list_projects(...)`` etc. therefore behave exactly like the
+    single-client version, but use the key bound to the current tool call.
+    """
+
+    def __init__(self, default: AsyncCustomGPT, max_tenants: int = 100,
+                 idle_timeout: float = 900.0, pool_limit: int = 20,
+                 require_key: bool = False, close_grace: float = 60.0):
+        self.default = default
+        self.max_tenants = max_tenants
+        self.idle_timeout = idle_timeout
+        self.pool_limit = pool_limit
+        self.require_key = require_key
+        self.close_grace = close_grace
+        self._tenants: OrderedDict[str, Any] = OrderedDict()  # fingerprint -> [client, last_used]
+        self._retiring: set = set()
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "TenantClients":
+        """Read TENANT_* settings; the default client comes from CUSTOMGPT_* variables."""
+        return cls(
+            AsyncCustomGPT.from_env(),
+            max_tenants=int(os.getenv("TENANT_MAX_CLIENTS", "100")),
+            idle_timeout=float(os.getenv("TENANT_IDLE_SECONDS", "900")),
+            pool_limit=int(os.getenv("TENANT_POOL_LIMIT", "20")),
+            require_key=os.getenv("TENANT_REQUIRE_KEY", "false").lower() == "true",
+        )
+
+    @property
+    def default_api_key(self) -> Optional[str]:
+        return self.default.api_key
+
+    def current(self) -> AsyncCustomGPT:
+        """Client for the key bound to this call (the default client otherwise)."""
+        api_key = current_api_key.get()
+        if not api_key or api_key == self.default.api_key:
+            if self.require_key and api_key is None:
+                raise MissingAPIKey(
+                    "No CustomGPT API key supplied; send the X-CustomGPT-API-Key header")
+            return self.default
+        return self._client_for(api_key)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.current(), name)
+
+    def _client_for(self, api_key: str) -> AsyncCustomGPT:
+        now = time.monotonic()
+        tenant = key_fingerprint(api_key)
+        entry = self._tenants.get(tenant)
+        if entry is not None:
+            entry[1] = now
+            self._tenants.move_to_end(tenant)
+            return entry[0]
+
+        client = self.default.for_api_key(api_key, self.pool_limit)
+        self._tenants[tenant] = [client, now]
+        self._evict(now)
+        return client
+
+    def _evict(self, now: float) -> None:
+        while self._tenants:
+            tenant, (client, last_used) = next(iter(self._tenants.items()))
+            if len(self._tenants) <= self.max_tenants and now - last_used < self.idle_timeout:
+                break
+            del self._tenants[tenant]
+            self.evictions += 1
+            if client.rate_limiter is not None:
+                client.rate_limiter.forget(client.api_key)
+            self._close_later(client)
+
+    def _close_later(self, client: AsyncCustomGPT) -> None:
+        """Close an evicted pool once calls still holding it have had time to finish."""
+        self._retiring.add(client)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.call_later(self.close_grace, lambda: asyncio.ensure_future(self._retire(client)))
+
+    async def _retire(self, client: AsyncCustomGPT) -> None:
+        self._retiring.discard(client)
+        await client.close()
+
+    async def close(self) -> None:
+        for client in [entry[0] for entry in self._tenants.values()] + list(self._retiring):
+            await client.close()
+        self._tenants.clear()
+        self._retiring.clear()
+        await self.default.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"tenant_clients": len(self._tenants), "max_tenants": self.max_tenants,
+                "evictions": self.evictions, "require_key": self.require_key}
+
+
+class TenantMiddleware(Middleware):
+    """Binds the API key sent in the X-CustomGPT-API-Key header to each tool call,
+    resource read and prompt render."""
+
+    async def _with_tenant(self, context, call_next):
+        api_key = get_http_headers(include={API_KEY_HEADER}).get(API_KEY_HEADER)
+        token = current_api_key.set(api_key or None)
+        try:
+            return await call_next(context)
+        finally:
+            current_api_key.reset(token)
+
+    async def on_call_tool(self, context, call_next):
+        return await self._with_tenant(context, call_next)
+
+    async def on_read_resource(self, context, call_next):
+        return await self._with_tenant(context, call_next)
+
+    async def on_get_prompt(self, context, call_next):
+        return await self._with_tenant(context, call_next)
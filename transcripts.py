@@ -0,0 +1,312 @@
+"""
+Conversation Transcript Store
+
+Local SQLite copy of conversations and messages with an FTS5 index over
+questions and answers. Sync is incremental: conversations are listed
+newest-first and only sessions that are new or whose ``updated_at`` moved
+have their messages fetched, and those are read newest-first until the
+session's stored high-water message id is reached.
+
+Rows are scoped by API key fingerprint, so one database can serve several
+keys without leaking transcripts between them.
+"""
+
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from pagination import gather_bounded
+
+DEFAULT_DB_PATH = Path.home() / ".cache" / "customgpt-mcp" / "transcripts.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    tenant TEXT NOT NULL,
+    project_id INTEGER NOT NULL,
+    session_id TEXT NOT NULL,
+    conversation_id INTEGER,
+    name TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    last_message_id INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL,
+    PRIMARY KEY (tenant, project_id, session_id)
+);
+CREATE TABLE IF NOT EXISTS messages (
+    tenant TEXT NOT NULL,
+    prompt_id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    session_id TEXT NOT NULL,
+    user_query TEXT,
+    openai_response TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    raw TEXT NOT NULL,
+    PRIMARY KEY (tenant, prompt_id)
+);
+CREATE INDEX IF NOT EXISTS messages_session ON messages (tenant, project_id, session_id, prompt_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    user_query, openai_response, content='messages', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, user_query, openai_response)
+    VALUES (new.rowid, new.user_query, new.openai_response);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, user_query, openai_response)
+    VALUES ('delete', old.rowid, old.user_query, old.openai_response);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, user_query, openai_response)
+    VALUES ('delete', old.rowid, old.user_query, old.openai_response);
+    INSERT INTO messages_fts (rowid, user_query, openai_response)
+    VALUES (new.rowid, new.user_query, new.openai_response);
+END;
+CREATE TABLE IF NOT EXISTS sync_state (
+    tenant TEXT NOT NULL,
+    project_id INTEGER NOT NULL,
+    synced_at REAL,
+    conversations INTEGER,
+    messages INTEGER,
+    PRIMARY KEY (tenant, project_id)
+);
+"""
+
+FetchJSON = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+def fts_query(text: str, match_all: bool = True) -> str:
+    """Turn free text into an FTS5 query of quoted terms (AND, or OR when match_all is off)."""
+    terms = [f'"{term}"' for term in re.findall(r"\w+", text)]
+    return (" " if match_all else " OR ").join(terms)
+
+
+def _message_row(tenant: str, project_id: int, session_id: str, message: Dict[str, Any]) -> tuple:
+    return (tenant, int(message["id"]), project_id, session_id, message.get("user_query"),
+            message.get("openai_response"), message.get("created_at"), message.get("updated_at"),
+            json.dumps(message, default=str))
+
+
+class SQLiteStore:
+    """Thread-safe wrapper around one SQLite database file (opened on first use)."""
+
+    schema = ""
+    default_path: Path = DEFAULT_DB_PATH
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = str(path or self.default_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.schema)
+            self._conn = conn
+        return self._conn
+
+    def _run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                return fn(conn)
+
+    async def run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run a database callable off the event loop."""
+        return await asyncio.to_thread(self._run, fn)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class TranscriptStore(SQLiteStore):
+    """Conversations and messages of every synced project, searchable with FTS5."""
+
+    schema = SCHEMA
+
+    @classmethod
+    def from_env(cls) -> "TranscriptStore":
+        return cls(os.getenv("TRANSCRIPT_DB_PATH") or None)
+
+    # ===== WRITES =====
+
+    async def upsert_messages(self, tenant: str, project_id: int, session_id: str,
+                              messages: Iterable[Dict[str, Any]]) -> int:
+        rows = [_message_row(tenant, project_id, session_id, m) for m in messages if m.get("id") is not None]
+        if not rows:
+            return 0
+
+        def write(conn: sqlite3.Connection) -> int:
+            conn.executemany(
+                "INSERT INTO messages (tenant, prompt_id, project_id, session_id, user_query,"
+                " openai_response, created_at, updated_at, raw) VALUES (?,?,?,?,?,?,?,?,?)"
+                " ON CONFLICT (tenant, prompt_id) DO UPDATE SET user_query=excluded.user_query,"
+                " openai_response=excluded.openai_response, updated_at=excluded.updated_at,"
+                " raw=excluded.raw",
+                rows,
+            )
+            return len(rows)
+        return await self.run(write)
+
+    async def save_conversation(self, tenant: str, project_id: int, conversation: Dict[str, Any],
+                                last_message_id: Optional[int] = None) -> None:
+        def write(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                "INSERT INTO conversations (tenant, project_id, session_id, conversation_id, name,"
+                " created_at, updated_at, last_message_id, synced_at) VALUES (?,?,?,?,?,?,?,?,?)"
+                " ON CONFLICT (tenant, project_id, session_id) DO UPDATE SET"
+                " name=COALESCE(excluded.name, conversations.name),"
+                " updated_at=COALESCE(excluded.updated_at, conversations.updated_at),"
+                " last_message_id=MAX(conversations.last_message_id, excluded.last_message_id),"
+                " synced_at=excluded.synced_at",
+                (tenant, project_id, conversation["session_id"], conversation.get("id"),
+                 conversation.get("name"), conversation.get("created_at"),
+                 conversation.get("updated_at"), last_message_id or 0, time.time()),
+            )
+        await self.run(write)
+
+    # ===== READS =====
+
+    async def known_conversations(self, tenant: str, project_id: int) -> Dict[str, Dict[str, Any]]:
+        def read(conn: sqlite3.Connection) -> Dict[str, Dict[str, Any]]:
+            rows = conn.execute(
+                "SELECT session_id, updated_at, last_message_id FROM conversations"
+                " WHERE tenant = ? AND project_id = ?", (tenant, project_id))
+            return {row["session_id"]: dict(row) for row in rows}
+        return await self.run(read)
+
+    async def get_message(self, tenant: str, prompt_id: int) -> Optional[Dict[str, Any]]:
+        def read(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            row = conn.execute("SELECT raw FROM messages WHERE tenant = ? AND prompt_id = ?",
+                               (tenant, prompt_id)).fetchone()
+            return json.loads(row["raw"]) if row else None
+        return await self.run(read)
+
+    async def session_messages(self, tenant: str, project_id: int, session_id: str) -> List[Dict[str, Any]]:
+        def read(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+            rows = conn.execute(
+                "SELECT raw FROM messages WHERE tenant = ? AND project_id = ? AND session_id = ?"
+                " ORDER BY prompt_id", (tenant, project_id, session_id))
+            return [json.loads(row["raw"]) for row in rows]
+        return await self.run(read)
+
+    async def search(self, tenant: str, query: str, project_id: Optional[int] = None,
+                     session_id: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Full-text search (FTS5 query syntax) ranked by bm25."""
+        sql = ("SELECT m.prompt_id, m.project_id, m.session_id, m.created_at, c.name AS conversation_name,"
+               " snippet(messages_fts, 0, '[', ']', '…', 12) AS query_snippet,"
+               " snippet(messages_fts, 1, '[', ']', '…', 24) AS response_snippet"
+               " FROM messages_fts JOIN messages m ON m.rowid = messages_fts.rowid"
+               " LEFT JOIN conversations c ON c.tenant = m.tenant AND c.project_id = m.project_id"
+               " AND c.session_id = m.session_id"
+               " WHERE messages_fts MATCH ? AND m.tenant = ?")
+        args: List[Any] = [query, tenant]
+        if project_id is not None:
+            sql += " AND m.project_id = ?"
+            args.append(project_id)
+        if session_id is not None:
+            sql += " AND m.session_id = ?"
+            args.append(session_id)
+        sql += " ORDER BY bm25(messages_fts) LIMIT ?"
+        args.append(limit)
+        return await self.run(lambda conn: [dict(row) for row in conn.execute(sql, args)])
+
+    async def stats(self, tenant: str) -> Dict[str, Any]:
+        def read(conn: sqlite3.Connection) -> Dict[str, Any]:
+            projects = [dict(row) for row in conn.execute(
+                "SELECT project_id, synced_at, conversations, messages FROM sync_state WHERE tenant = ?",
+                (tenant,))]
+            messages = conn.execute("SELECT COUNT(*) FROM messages WHERE tenant = ?", (tenant,)).fetchone()[0]
+            conversations = conn.execute("SELECT COUNT(*) FROM conversations WHERE tenant = ?",
+                                         (tenant,)).fetchone()[0]
+            return {"path": self.path, "conversations": conversations, "messages": messages,
+                    "projects": projects}
+        return await self.run(read)
+
+    # ===== SYNC =====
+
+    async def sync_session(self, tenant: str, project_id: int, conversation: Dict[str, Any],
+                           list_messages: FetchJSON, last_message_id: int = 0) -> int:
+        """Fetch messages newer than ``last_message_id`` (newest-first) and store them."""
+        session_id = conversation["session_id"]
+        fresh: List[Dict[str, Any]] = []
+        page = 1
+        while True:
+            body = await list_messages(project_id, session_id, page=page, order="desc")
+            pager = ((body.get("data") or {}).get("messages") or {})
+            items = pager.get("data") or []
+            new = [m for m in items if int(m.get("id", 0)) > last_message_id]
+            fresh.extend(new)
+            if len(new) < len(items) or page >= int(pager.get("last_page") or 1) or not items:
+                break
+            page += 1
+        await self.upsert_messages(tenant, project_id, session_id, fresh)
+        newest = max([int(m["id"]) for m in fresh] + [last_message_id])
+        await self.save_conversation(tenant, project_id, conversation, newest)
+        return len(fresh)
+
+    async def sync_project(self, tenant: str, project_id: int, list_conversations: FetchJSON,
+                           list_messages: FetchJSON, full_scan: bool = False,
+                           max_concurrency: int = 4) -> Dict[str, Any]:
+        """Bring one project's transcripts up to date.
+
+        Conversations are read newest-first. Without ``full_scan`` listing
+        stops at the first page on which nothing is new or changed, which
+        covers the usual case of activity concentrated in recent sessions.
+        """
+        started = time.perf_counter()
+        known = await self.known_conversations(tenant, project_id)
+        stale: List[Dict[str, Any]] = []
+        scanned = 0
+        page = 1
+        while True:
+            body = await list_conversations(project_id, page=page, order="desc", orderBy="id")
+            pager = body.get("data") or {}
+            items = pager.get("data") or []
+            scanned += len(items)
+            changed = [c for c in items if c.get("session_id") and (
+                c["session_id"] not in known or known[c["session_id"]]["updated_at"] != c.get("updated_at"))]
+            stale.extend(changed)
+            if not items or page >= int(pager.get("last_page") or 1) or (not changed and not full_scan):
+                break
+            page += 1
+
+        counts = await gather_bounded(
+            [self.sync_session(tenant, project_id, c, list_messages,
+                               (known.get(c["session_id"]) or {}).get("last_message_id", 0))
+             for c in stale],
+            max_concurrency,
+        )
+
+        def record(conn: sqlite3.Connection) -> Dict[str, int]:
+            totals = conn.execute(
+                "SELECT (SELECT COUNT(*) FROM conversations WHERE tenant = ?1 AND project_id = ?2),"
+                " (SELECT COUNT(*) FROM messages WHERE tenant = ?1 AND project_id = ?2)",
+                (tenant, project_id)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_state (tenant, project_id, synced_at, conversations, messages)"
+                " VALUES (?,?,?,?,?)", (tenant, project_id, time.time(), totals[0], totals[1]))
+            return {"conversations": totals[0], "messages": totals[1]}
+        totals = await self.run(record)
+
+        return {
+            "conversations_scanned": scanned,
+            "sessions_synced": len(stale),
+            "messages_added": sum(counts),
+            "stored": totals,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }